@@ -1,9 +1,11 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 import os
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
+    client: Optional["AsyncIOMotorClient"] = None
     
 db = Database()
 
@@ -13,6 +15,8 @@ async def connect_to_mongo():
     if not mongodb_url:
         raise ValueError("MONGODB_URL environment variable is not set")
     
+    # Imported here so routes that never touch Mongo don't pay for motor/pymongo at cold start
+    from motor.motor_asyncio import AsyncIOMotorClient
     db.client = AsyncIOMotorClient(mongodb_url)
     print(f"✅ Connected to MongoDB")
     
@@ -1,17 +1,26 @@
 import os
 import json
-from openai import AsyncOpenAI
 from app.schemas import SearchRequest, TripPlan, RouteInfo, DayPlan, Sightseeing
 
-# Validate API key exists
-OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError(
-        "OPENAI_API_KEY environment variable is not set. "
-        "Please set it in your environment or .env file."
-    )
+_client = None
 
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+def get_openai_client():
+    """
+    AsyncOpenAI client, created on first use (the openai import is a large share of
+    cold start) and reused across warm invocations.
+    """
+    global _client
+    if _client is None:
+        # Validate API key exists
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError(
+                "OPENAI_API_KEY environment variable is not set. "
+                "Please set it in your environment or .env file."
+            )
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI(api_key=api_key)
+    return _client
 
 
 from app.services.media_service import fetch_destination_images, fetch_destination_videos
@@ -75,7 +84,7 @@ async def generate_trip_plan(request: SearchRequest) -> TripPlan:
         print(f"Analytics logging failed: {e}")
 
     try:
-        completion = await client.beta.chat.completions.parse(
+        completion = await get_openai_client().beta.chat.completions.parse(
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": "You are a travel assistant. Generate a structured trip plan."},
@@ -179,7 +188,7 @@ async def get_recommendations(lat: float, lng: float) -> RecommendationResponse:
     """
     
     try:
-        completion = await client.beta.chat.completions.parse(
+        completion = await get_openai_client().beta.chat.completions.parse(
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": "You are a local travel expert."},
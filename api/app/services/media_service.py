@@ -1,4 +1,4 @@
-import httpx
+import asyncio
 import os
 import random
 from typing import List, Optional, Dict
@@ -26,56 +26,72 @@ STATIC_FALLBACK_VIDEOS = [
     {"url": "https://videos.pexels.com/video-files/2169880/2169880-hd_1920_1080_30fps.mp4", "credit": "Pexels", "source": "Pexels"}
 ]
 
+_http_client = None
+_http_client_loop = None
+
+def get_http_client():
+    """
+    Shared httpx client, created on first use so cold starts skip the httpx import
+    and warm invocations reuse pooled connections. Recreated if the event loop changes.
+    """
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client_loop is not loop:
+        import httpx
+        _http_client = httpx.AsyncClient()
+        _http_client_loop = loop
+    return _http_client
+
 async def fetch_from_pexels(query: str, type: str = "photos", per_page: int = 3) -> List[Dict[str, str]]:
     """Fetch media from Pexels (best quality)."""
     if not PEXELS_API_KEY:
         return []
     
     try:
-        async with httpx.AsyncClient() as client:
-            endpoint = "search" if type == "photos" else "videos/search"
-            response = await client.get(
-                f"{PEXELS_BASE_URL}{endpoint}",
-                headers={"Authorization": PEXELS_API_KEY},
-                params={"query": query, "per_page": per_page, "orientation": "landscape"},
-                timeout=5.0
-            )
-            data = response.json()
-            
-            results = []
-            if type == "photos":
-                for photo in data.get("photos", []):
-                    results.append({
-                        "url": photo["src"]["large2x"],
-                        "credit": photo["photographer"],
-                        "source": "Pexels"
-                    })
-            else:
-                for vid in data.get("videos", []):
-                     # Smart Selection: Prioritize HD (1080p/720p) over 4K for better streaming
-                     video_files = vid.get("video_files", [])
-                     
-                     # 1. Try to find 1080p or 720p (Width between 1280 and 1920)
-                     hd_files = [v for v in video_files if 1280 <= v["width"] <= 1920]
+        client = get_http_client()
+        endpoint = "search" if type == "photos" else "videos/search"
+        response = await client.get(
+            f"{PEXELS_BASE_URL}{endpoint}",
+            headers={"Authorization": PEXELS_API_KEY},
+            params={"query": query, "per_page": per_page, "orientation": "landscape"},
+            timeout=5.0
+        )
+        data = response.json()
+        
+        results = []
+        if type == "photos":
+            for photo in data.get("photos", []):
+                results.append({
+                    "url": photo["src"]["large2x"],
+                    "credit": photo["photographer"],
+                    "source": "Pexels"
+                })
+        else:
+            for vid in data.get("videos", []):
+                 # Smart Selection: Prioritize HD (1080p/720p) over 4K for better streaming
+                 video_files = vid.get("video_files", [])
+                 
+                 # 1. Try to find 1080p or 720p (Width between 1280 and 1920)
+                 hd_files = [v for v in video_files if 1280 <= v["width"] <= 1920]
+                 
+                 selected_file = None
+                 if hd_files:
+                     # Sort by size to get the highest bitrate/quality within HD range
+                     hd_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
+                     selected_file = hd_files[0]
+                 elif video_files:
+                     # Fallback: If no HD found, unfortunately take the largest available (likely SD or UHD)
+                     # We sort to avoid picking tiny previews
+                     video_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
+                     selected_file = video_files[0]
                      
-                     selected_file = None
-                     if hd_files:
-                         # Sort by size to get the highest bitrate/quality within HD range
-                         hd_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
-                         selected_file = hd_files[0]
-                     elif video_files:
-                         # Fallback: If no HD found, unfortunately take the largest available (likely SD or UHD)
-                         # We sort to avoid picking tiny previews
-                         video_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
-                         selected_file = video_files[0]
-                         
-                     if selected_file:
-                         results.append({
-                             "url": selected_file["link"],
-                             "credit": vid["user"]["name"],
-                             "source": "Pexels"
-                         })
-            return results
+                 if selected_file:
+                     results.append({
+                         "url": selected_file["link"],
+                         "credit": vid["user"]["name"],
+                         "source": "Pexels"
+                     })
+        return results
     except Exception as e:
         print(f"Error fetching from Pexels for {query}: {e}")
         return []
@@ -86,22 +102,22 @@ async def fetch_from_unsplash(query: str, per_page: int = 3) -> List[Dict[str, s
         return []
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{UNSPLASH_BASE_URL}search/photos",
-                headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"},
-                params={"query": query, "per_page": per_page, "orientation": "landscape"},
-                timeout=5.0
-            )
-            data = response.json()
-            results = []
-            for result in data.get("results", []):
-                results.append({
-                    "url": result["urls"]["regular"],
-                    "credit": result["user"]["name"],
-                    "source": "Unsplash"
-                })
-            return results
+        client = get_http_client()
+        response = await client.get(
+            f"{UNSPLASH_BASE_URL}search/photos",
+            headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"},
+            params={"query": query, "per_page": per_page, "orientation": "landscape"},
+            timeout=5.0
+        )
+        data = response.json()
+        results = []
+        for result in data.get("results", []):
+            results.append({
+                "url": result["urls"]["regular"],
+                "credit": result["user"]["name"],
+                "source": "Unsplash"
+            })
+        return results
     except Exception as e:
         print(f"Error fetching from Unsplash for {query}: {e}")
         return []
@@ -112,49 +128,49 @@ async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3)
         return []
 
     try:
-        async with httpx.AsyncClient() as client:
-            # Photos
-            if type == "photo":
-                response = await client.get(
-                    PIXABAY_BASE_URL,
-                    params={
-                        "key": PIXABAY_API_KEY, "q": query, "image_type": "photo",
-                        "orientation": "horizontal", "per_page": per_page, "safesearch": "true"
-                    }, timeout=5.0
-                )
-                data = response.json()
-                results = []
-                for hit in data.get("hits", []):
-                    results.append({
-                        "url": hit["webformatURL"],
-                        "credit": hit["user"],
-                        "source": "Pixabay"
-                    })
-                return results
-            
-            # Videos
-            else:
-                 response = await client.get(
-                    f"{PIXABAY_BASE_URL}videos/",
-                    params={
-                        "key": PIXABAY_API_KEY, "q": query, "per_page": per_page, "safesearch": "true"
-                    }, timeout=5.0
-                )
-                 data = response.json()
-                 results = []
-                 for hit in data.get("hits", []):
-                     if "videos" in hit:
-                         video_url = None
-                         if "medium" in hit["videos"]: video_url = hit["videos"]["medium"]["url"]
-                         elif "large" in hit["videos"]: video_url = hit["videos"]["large"]["url"]
-                         
-                         if video_url:
-                             results.append({
-                                 "url": video_url,
-                                 "credit": hit["user"],
-                                 "source": "Pixabay"
-                             })
-                 return results
+        client = get_http_client()
+        # Photos
+        if type == "photo":
+            response = await client.get(
+                PIXABAY_BASE_URL,
+                params={
+                    "key": PIXABAY_API_KEY, "q": query, "image_type": "photo",
+                    "orientation": "horizontal", "per_page": per_page, "safesearch": "true"
+                }, timeout=5.0
+            )
+            data = response.json()
+            results = []
+            for hit in data.get("hits", []):
+                results.append({
+                    "url": hit["webformatURL"],
+                    "credit": hit["user"],
+                    "source": "Pixabay"
+                })
+            return results
+        
+        # Videos
+        else:
+             response = await client.get(
+                f"{PIXABAY_BASE_URL}videos/",
+                params={
+                    "key": PIXABAY_API_KEY, "q": query, "per_page": per_page, "safesearch": "true"
+                }, timeout=5.0
+            )
+             data = response.json()
+             results = []
+             for hit in data.get("hits", []):
+                 if "videos" in hit:
+                     video_url = None
+                     if "medium" in hit["videos"]: video_url = hit["videos"]["medium"]["url"]
+                     elif "large" in hit["videos"]: video_url = hit["videos"]["large"]["url"]
+                     
+                     if video_url:
+                         results.append({
+                             "url": video_url,
+                             "credit": hit["user"],
+                             "source": "Pixabay"
+                         })
+             return results
 
     except Exception as e:
         print(f"Error fetching from Pixabay for {query}: {e}")
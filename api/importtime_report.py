@@ -0,0 +1,102 @@
+"""
+Cold-start import benchmark for the serverless entrypoint.
+
+Imports the module in a fresh interpreter with `python -X importtime`, several
+times, and reports the median total plus a per-package breakdown of self time
+(and the slowest individual modules). Use it before/after changes to the import
+graph of api/index.py.
+
+Usage (from the api directory):
+    python importtime_report.py                 # import index, 5 runs
+    python importtime_report.py --module app.routers.trips --runs 10
+    python importtime_report.py --json > importtime.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+def measure(module: str) -> dict:
+    """One fresh-interpreter import; returns {module: (self_us, cumulative_us, depth)}."""
+    api_dir = Path(__file__).resolve().parent
+    env = dict(os.environ, PYTHONPATH=str(api_dir), PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=api_dir, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    return modules
+
+def summarize(runs: list, top: int) -> dict:
+    totals = [sum(self_us for self_us, _, _ in run.values()) for run in runs]
+    # Per-module medians across runs
+    per_module = defaultdict(list)
+    for run in runs:
+        for name, (self_us, cumulative_us, _) in run.items():
+            per_module[name].append((self_us, cumulative_us))
+    medians = {
+        name: (
+            statistics.median(s for s, _ in samples),
+            statistics.median(c for _, c in samples),
+        )
+        for name, samples in per_module.items()
+    }
+    packages = defaultdict(float)
+    for name, (self_us, _) in medians.items():
+        packages[name.split(".")[0]] += self_us
+
+    return {
+        "runs": len(runs),
+        "total_ms": round(statistics.median(totals) / 1000, 2),
+        "total_ms_min": round(min(totals) / 1000, 2),
+        "modules_imported": len(medians),
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 2)}
+            for name, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+        ],
+        "slowest_modules": [
+            {"module": name, "self_ms": round(s / 1000, 2), "cumulative_ms": round(c / 1000, 2)}
+            for name, (s, c) in sorted(medians.items(), key=lambda kv: -kv[1][0])[:top]
+        ],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import time report.")
+    parser.add_argument("--module", default="index")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args()
+
+    report = summarize([measure(args.module) for _ in range(args.runs)], args.top)
+    report["module"] = args.module
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"import {args.module}: {report['total_ms']} ms median "
+          f"(min {report['total_ms_min']} ms, {report['runs']} runs, {report['modules_imported']} modules)\n")
+    print(f"{'package':<32}{'self ms':>10}")
+    for row in report["packages"]:
+        print(f"{row['package']:<32}{row['self_ms']:>10}")
+    print(f"\n{'module':<48}{'self ms':>10}{'cumul ms':>10}")
+    for row in report["slowest_modules"]:
+        print(f"{row['module']:<48}{row['self_ms']:>10}{row['cumulative_ms']:>10}")
+
+if __name__ == "__main__":
+    main()
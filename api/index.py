@@ -1,16 +1,14 @@
-import os
-from fastapi import FastAPI
+import importlib
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
-from app.routers import search, trips
-from app.services.ai_service import get_recommendations
-from app.services.media_service import fetch_destination_videos
 from app.schemas import RecommendationResponse
-from app.config.database import connect_to_mongo, close_mongo_connection
+from app.config.database import connect_to_mongo
+from app.responses import FastJSONResponse, CompressionMiddleware
 
-app = FastAPI(title="Weekend Traveller AI Search Engine")
+app = FastAPI(title="Weekend Traveller AI Search Engine", default_response_class=FastJSONResponse)
 
-# MongoDB connection - Initialize on first request (serverless compatible)
+# MongoDB connection - Initialize on first request that needs it (serverless compatible)
 _db_initialized = False
 
 async def ensure_db_connection():
@@ -19,6 +17,46 @@ async def ensure_db_connection():
         await connect_to_mongo()
         _db_initialized = True
 
+# Routers are imported on the first request under their path prefix, so a cold
+# start only pays for the modules its route uses. (prefix, module, needs_db)
+LAZY_ROUTERS = [
+    ("/api/search", "app.routers.search", False),
+    ("/api/trips", "app.routers.trips", True),
+    ("/api/search-history", "app.routers.trips", True),
+]
+DOCS_PATHS = ("/docs", "/redoc", "/openapi.json")
+_loaded_routers = set()
+
+def load_router(module_name: str, needs_db: bool):
+    if module_name in _loaded_routers:
+        return
+    module = importlib.import_module(module_name)
+    dependencies = [Depends(ensure_db_connection)] if needs_db else []
+    app.include_router(module.router, prefix="/api", dependencies=dependencies)
+    _loaded_routers.add(module_name)
+    # Regenerate the OpenAPI schema with the new routes
+    app.openapi_schema = None
+
+def load_routers_for_path(path: str):
+    for prefix, module_name, needs_db in LAZY_ROUTERS:
+        if path in DOCS_PATHS or path == prefix or path.startswith(prefix + "/"):
+            load_router(module_name, needs_db)
+
+class LazyRouterMiddleware:
+    """Plain ASGI middleware: include a router just before its first request is routed."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            load_routers_for_path(scope["path"])
+        await self.app(scope, receive, send)
+
+app.add_middleware(LazyRouterMiddleware)
+
+# gzip/brotli for large JSON bodies (trip plans are 30-60 KB of prose)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 # CORS configuration - allow all origins for Vercel deployment
 app.add_middleware(
     CORSMiddleware,
@@ -30,24 +68,16 @@ app.add_middleware(
 
 @app.get("/")
 async def read_root():
-    await ensure_db_connection()
     return {"message": "Welcome to Weekend Traveller AI Search Engine API"}
 
 @app.get("/api/health")
 async def health_check():
-    await ensure_db_connection()
     return {"status": "ok", "mode": "serverless_fastapi", "database": "mongodb"}
 
-# Include search router
-app.include_router(search.router, prefix="/api")
-
-# Include trips router for MongoDB operations
-app.include_router(trips.router, prefix="/api")
-
 @app.get("/api/background-videos")
 async def get_background_videos():
     """Fetch cinematic background videos for the landing page."""
-    await ensure_db_connection()
+    from app.services.media_service import fetch_destination_videos
     try:
         videos = await fetch_destination_videos("Travel wanderlust nature cinematic", per_page=40)
         if not videos:
@@ -68,7 +98,7 @@ async def get_background_videos():
 @app.get("/api/recommendations", response_model=RecommendationResponse)
 async def fetch_recommendations(lat: float, lng: float):
     """Get AI recommendations based on user location."""
-    await ensure_db_connection()
+    from app.services.ai_service import get_recommendations
     return await get_recommendations(lat, lng)
 
 # Mangum handler for AWS Lambda/Vercel serverless
@@ -0,0 +1,58 @@
+"""
+Client hints used to size media for the device and network making the request.
+
+Display: Sec-CH-Viewport-Width / Sec-CH-DPR (legacy Viewport-Width / DPR).
+Network: ECT, Downlink and Save-Data.
+Browsers only send most of these after the server advertises them in Accept-CH,
+so responses that vary on them should set `ACCEPT_CH` and `VARY_HINTS`.
+"""
+from typing import Optional
+
+from fastapi import Request
+
+ACCEPT_CH = "Sec-CH-Viewport-Width, Sec-CH-DPR, Viewport-Width, DPR, ECT, Downlink"
+VARY_HINTS = "Sec-CH-Viewport-Width, Sec-CH-DPR, ECT, Downlink, Save-Data"
+
+VIDEO_QUALITIES = ("low", "medium", "high")
+SLOW_ECT = ("slow-2g", "2g", "3g")
+
+def header_float(request: Request, *names: str) -> Optional[float]:
+    """First of `names` present as a number."""
+    for name in names:
+        value = request.headers.get(name)
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return None
+
+def viewport_width(request: Request) -> Optional[float]:
+    return header_float(request, "sec-ch-viewport-width", "viewport-width")
+
+def device_pixel_ratio(request: Request) -> Optional[float]:
+    return header_float(request, "sec-ch-dpr", "dpr")
+
+def video_quality(request: Request) -> Optional[str]:
+    """
+    "low" / "medium" / "high" from the network hints, or None when the client sent
+    none (callers then keep their default rendition).
+    """
+    if request.headers.get("save-data", "").strip().lower() == "on":
+        return "low"
+    ect = request.headers.get("ect", "").strip().lower()
+    if ect in SLOW_ECT:
+        return "low"
+    downlink = header_float(request, "downlink")  # Mbps, rounded by the browser
+    if downlink is not None:
+        if downlink < 1.5:
+            return "low"
+        return "medium" if downlink < 5 else "high"
+    if ect == "4g":
+        return "high"
+    return None
+
+def set_hint_headers(response):
+    """Advertise the hints we use and mark the response as varying on them."""
+    response.headers["Accept-CH"] = ACCEPT_CH
+    response.headers["Vary"] = VARY_HINTS
@@ -1,7 +1,10 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     
@@ -14,13 +17,13 @@ async def connect_to_mongo():
         raise ValueError("MONGODB_URL environment variable is not set")
     
     db.client = AsyncIOMotorClient(mongodb_url)
-    print(f"✅ Connected to MongoDB")
+    logger.info("Connected to MongoDB")
     
 async def close_mongo_connection():
     """Close MongoDB connection"""
     if db.client:
         db.client.close()
-        print("❌ Closed MongoDB connection")
+        logger.info("Closed MongoDB connection")
     
 def get_database():
     """Get database instance"""
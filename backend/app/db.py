@@ -1,17 +1,95 @@
+import logging
+import os
 import sqlite3
 from pathlib import Path
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to one shard per pid
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 # DB Path
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR / "analytics.db"
 
+# Storage mode:
+#   "single"  - every process writes to analytics.db (fine for one uvicorn worker)
+#   "sharded" - each worker process appends to its own file in analytics_shards/,
+#               and read paths (dashboard, export) merge across all shards.
+#               Use this when running uvicorn/gunicorn with several workers.
+ANALYTICS_STORAGE = os.environ.get("ANALYTICS_STORAGE", "single").lower()
+SHARD_DIR = BASE_DIR / "analytics_shards"
+
+_initialized_paths = set()
+_shard_path: Optional[Path] = None
+_shard_pid: Optional[int] = None
+_shard_lock = None
+
+def _claim_shard_path() -> Path:
+    """
+    Claim a shard slot for this process by holding an exclusive lock on slot-N.lock.
+    Slots are reused after restarts, so the number of shard files stays bounded by
+    the number of concurrently running workers.
+    """
+    global _shard_lock
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        return SHARD_DIR / f"worker-{os.getpid()}.db"
+
+    slot = 0
+    while True:
+        lock_file = open(SHARD_DIR / f"slot-{slot}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            slot += 1
+            continue
+        # Keep the file open for the lifetime of the process to hold the slot
+        _shard_lock = lock_file
+        return SHARD_DIR / f"worker-{slot}.db"
+
+def get_write_path() -> Path:
+    """Database file this process should write analytics rows to."""
+    global _shard_path, _shard_pid
+    if ANALYTICS_STORAGE != "sharded":
+        return DB_PATH
+    # Re-claim after fork so pre-forked workers never share a shard
+    if _shard_path is None or _shard_pid != os.getpid():
+        _shard_path = _claim_shard_path()
+        _shard_pid = os.getpid()
+    return _shard_path
+
+def get_shard_paths() -> List[Path]:
+    """All database files holding analytics rows (read paths merge over these)."""
+    paths = [DB_PATH] if DB_PATH.exists() else []
+    if ANALYTICS_STORAGE == "sharded" and SHARD_DIR.exists():
+        paths.extend(sorted(SHARD_DIR.glob("worker-*.db")))
+    return paths
+
+def _connect(path: Path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    return conn
+
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+    path = get_write_path()
+    if path not in _initialized_paths:
+        init_db(path)
+    return _connect(path)
+
+def get_readonly_connection(path: Path = DB_PATH):
+    """Read-only connection; under WAL it never blocks (or is blocked by) the writer."""
+    conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
     conn.row_factory = sqlite3.Row
     return conn
 
-def init_db():
-    conn = get_db_connection()
+def init_db(path: Optional[Path] = None):
+    path = path or get_write_path()
+    conn = _connect(path)
     cursor = conn.cursor()
     
     # Enable Write Ahead Logging for better concurrency
@@ -58,9 +136,12 @@ def init_db():
     
     conn.commit()
     conn.close()
+    _initialized_paths.add(path)
 
-# Initialize on import (safe if already exists)
-try:
-    init_db()
-except Exception as e:
-    print(f"Database initialization error: {e}")
+# Initialize on import (safe if already exists). Sharded workers claim their shard
+# lazily on first write, so importing this module (e.g. for a read) holds no slot.
+if ANALYTICS_STORAGE != "sharded":
+    try:
+        init_db(DB_PATH)
+    except Exception as e:
+        logger.error("Database initialization error: %s", e)
@@ -0,0 +1,197 @@
+"""
+Structured, non-blocking logging.
+
+Request-path code only builds a LogRecord and puts it on an in-process queue; a
+QueueListener thread does the %-formatting, JSON encoding and the stdout write.
+Each record carries the id of the request that produced it (X-Request-ID, or a
+generated one), and RequestContextMiddleware logs one access line per request
+with its duration.
+
+Configuration (environment):
+    LOG_LEVEL=INFO                                       root level for app.* loggers
+    LOG_LEVELS=app.services.media_service=ERROR,app.services.ai_service=DEBUG
+    LOG_FORMAT=json | text
+    LOG_SAMPLE_BURST=5  LOG_SAMPLE_INTERVAL=60           per-message warning sampling
+
+Modules log through `logging.getLogger(__name__)` with %-style arguments, so the
+template is the sampling key and formatting happens off the request path.
+Structured fields go in `extra=`: logger.info("...", extra={"duration_ms": 12.5}).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "suppressed"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+access_logger = logging.getLogger("app.access")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id") or record.request_id is None:
+            record.request_id = "-"
+        text = super().format(record)
+        if getattr(record, "suppressed", 0):
+            text += f" (+{record.suppressed} similar suppressed)"
+        return text
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the current request id on the record while still on the request's task."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through at most `burst` WARNING records per (logger, message template)
+    every `interval` seconds; the next record that passes reports how many were
+    dropped. Other levels are never sampled.
+    """
+    def __init__(self, burst: int = 5, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window start, passed, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if len(self._windows) > 10000:
+                self._windows = {key: self._windows[key]}
+            record.suppressed = suppressed
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            record.suppressed = 0
+            return True
+        window[2] += 1
+        return False
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so skip the stock prepare() (which
+        # formats the message and traceback here, on the request path)
+        return record
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for part in spec.split(","):
+        name, _, level = part.strip().partition("=")
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging():
+    """Route app.* loggers through the background queue (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    fmt = os.getenv("LOG_FORMAT", "json").lower()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(
+        burst=int(os.getenv("LOG_SAMPLE_BURST", "5")),
+        interval=float(os.getenv("LOG_SAMPLE_INTERVAL", "60")),
+    ))
+    queue_handler.addFilter(RequestContextFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class RequestContextMiddleware:
+    """Plain ASGI middleware: assign a request id, echo it back, log one access record."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            access_logger.info(
+                "%s %s %s", scope["method"], scope["path"], status,
+                extra={"method": scope["method"], "path": scope["path"], "status": status,
+                       "duration_ms": round((time.perf_counter() - start) * 1000, 2)}
+            )
+            request_id_var.reset(token)
@@ -0,0 +1,196 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+Off by default; set LOOP_MONITOR_ENABLED=true to start it. /internal/loop is
+mounted as well when LOOP_MONITOR_TOKEN is set, and requires
+`X-Loop-Token: <token>`. While enabled, two probes run:
+    heartbeat - a task that sleeps LOOP_MONITOR_INTERVAL_MS and records how late
+                it woke up (scheduling lag); percentiles over the last
+                LOOP_MONITOR_WINDOW samples are logged every
+                LOOP_MONITOR_REPORT_SECONDS and served at /internal/loop
+    watchdog  - a thread that pings the loop with call_soon_threadsafe; if the
+                pong is not back within LOOP_BLOCK_THRESHOLD_MS, the loop is
+                blocked and the loop thread's stack is captured right then, so
+                the record names the code that is blocking, not its victim
+
+With LOOP_MONITOR_STRICT=true (which implies enabled), LoopMonitorMiddleware raises LoopBlockedError
+for any request whose task blocked the loop past the threshold, which fails the
+request under TestClient (debug/test use only).
+"""
+import asyncio
+import hmac
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from typing import List, Optional
+
+LOOP_MONITOR_STRICT = os.getenv("LOOP_MONITOR_STRICT", "false").lower() in ("1", "true", "yes")
+LOOP_MONITOR_ENABLED = LOOP_MONITOR_STRICT or os.getenv("LOOP_MONITOR_ENABLED", "false").lower() in ("1", "true", "yes")
+LOOP_MONITOR_TOKEN = os.getenv("LOOP_MONITOR_TOKEN", "")
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_MONITOR_WINDOW = int(os.getenv("LOOP_MONITOR_WINDOW", "600"))
+LOOP_MONITOR_REPORT_SECONDS = float(os.getenv("LOOP_MONITOR_REPORT_SECONDS", "60"))
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+SLOW_CALLBACKS_KEPT = 50
+STACK_DEPTH = 20
+
+logger = logging.getLogger(__name__)
+
+class LoopBlockedError(RuntimeError):
+    pass
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def token_matches(candidate: Optional[str]) -> bool:
+    return bool(LOOP_MONITOR_TOKEN and candidate) and hmac.compare_digest(candidate.encode(), LOOP_MONITOR_TOKEN.encode())
+
+class LoopMonitor:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.lags = deque(maxlen=LOOP_MONITOR_WINDOW)
+        self.slow_callbacks = deque(maxlen=SLOW_CALLBACKS_KEPT)
+        self.blocked_count = 0
+        self.blocked_ms_total = 0.0
+        # task -> block records, for strict mode
+        self.task_blocks: "weakref.WeakKeyDictionary[asyncio.Task, list]" = weakref.WeakKeyDictionary()
+        self._pong = threading.Event()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+
+    def start(self):
+        self._heartbeat = self.loop.create_task(self._beat())
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        self._pong.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self._watchdog.join)
+
+    async def _beat(self):
+        interval = LOOP_MONITOR_INTERVAL_MS / 1000
+        next_report = time.monotonic() + LOOP_MONITOR_REPORT_SECONDS
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self.lags.append(max(0.0, (now - started - interval) * 1000))
+            if now >= next_report:
+                next_report = now + LOOP_MONITOR_REPORT_SECONDS
+                stats = self.stats(include_callbacks=False)
+                logger.info("Event loop lag p99 %.1f ms", stats["lag_ms"]["p99"], extra={"loop_lag_ms": stats["lag_ms"], "loop_blocked": stats["blocked"]})
+
+    def _watch(self):
+        threshold = LOOP_BLOCK_THRESHOLD_MS / 1000
+        poll = min(threshold / 4, 0.05)
+        while not self._stop.is_set():
+            self._pong.clear()
+            pinged = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(self._pong.set)
+            except RuntimeError:  # loop closed
+                return
+            if self._pong.wait(threshold):
+                self._stop.wait(poll)
+                continue
+            record = self._capture(pinged)
+            self._pong.wait()
+            if self._stop.is_set():
+                return
+            record["blocked_ms"] = round((time.monotonic() - pinged) * 1000, 1)
+            self.blocked_ms_total += record["blocked_ms"]
+            logger.warning(
+                "Event loop blocked for %.0f ms in %s", record["blocked_ms"], record["where"],
+                extra={"blocked_ms": record["blocked_ms"], "task": record["task"], "stack": record["stack"]}
+            )
+
+    def _capture(self, pinged: float) -> dict:
+        """Snapshot the loop thread while it is still blocked."""
+        frame = sys._current_frames().get(self.thread_id)
+        stack = traceback.format_list(traceback.extract_stack(frame, limit=STACK_DEPTH)) if frame else []
+        # Watchdog thread: CPython keeps each loop's running task in a process-wide
+        # table, so current_task(loop) returns it from outside the loop thread too
+        task = asyncio.current_task(self.loop)
+        record = {
+            "at": time.time(),
+            "blocked_ms": round((time.monotonic() - pinged) * 1000, 1),
+            "task": task.get_name() if task is not None else None,
+            "where": stack[-1].strip().splitlines()[0] if stack else "?",
+            "stack": [line.rstrip() for line in stack],
+        }
+        self.blocked_count += 1
+        self.slow_callbacks.append(record)
+        if task is not None:
+            self.task_blocks.setdefault(task, []).append(record)
+        return record
+
+    def stats(self, include_callbacks: bool = True) -> dict:
+        lags = sorted(self.lags)
+        stats = {
+            "interval_ms": LOOP_MONITOR_INTERVAL_MS,
+            "threshold_ms": LOOP_BLOCK_THRESHOLD_MS,
+            "samples": len(lags),
+            "lag_ms": {
+                "p50": round(percentile(lags, 50), 2),
+                "p95": round(percentile(lags, 95), 2),
+                "p99": round(percentile(lags, 99), 2),
+                "max": round(lags[-1], 2) if lags else 0.0,
+            },
+            "blocked": self.blocked_count,
+            "blocked_ms_total": round(self.blocked_ms_total, 1),
+        }
+        if include_callbacks:
+            stats["slow_callbacks"] = list(reversed(self.slow_callbacks))
+        return stats
+
+_monitor: Optional[LoopMonitor] = None
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    return _monitor
+
+def start_loop_monitor():
+    """Start monitoring the running loop (call from startup)."""
+    global _monitor
+    if not LOOP_MONITOR_ENABLED or _monitor is not None:
+        return
+    _monitor = LoopMonitor(asyncio.get_running_loop())
+    _monitor.start()
+
+async def stop_loop_monitor():
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+
+class LoopMonitorMiddleware:
+    """Strict mode: fail a request whose own task blocked the loop past the threshold."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _monitor is None:
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        await self.app(scope, receive, send)
+        blocks = _monitor.task_blocks.pop(task, None)
+        if blocks:
+            worst = max(blocks, key=lambda b: b["blocked_ms"])
+            raise LoopBlockedError(
+                f"{scope['method']} {scope['path']} blocked the event loop for "
+                f"{worst['blocked_ms']:.0f} ms (threshold {LOOP_BLOCK_THRESHOLD_MS:.0f} ms) at:\n" + "\n".join(worst["stack"])
+            )
@@ -9,21 +9,44 @@ env_path = backend_dir / '.env'
 # Load environment variables from .env file
 load_dotenv(dotenv_path=env_path)
 
-from fastapi import FastAPI
+import logging
+from typing import Optional
+from fastapi import FastAPI, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import search, trips
 from app.config.database import connect_to_mongo, close_mongo_connection
+from app.services.trip_service import ensure_indexes, flush_trip_counts, refresh_place_index
+from app.services.write_buffer import flush_append_buffers
+from app.responses import FastJSONResponse, CompressionMiddleware
+from app.logging_config import setup_logging, stop_logging, RequestContextMiddleware
+from app.loop_monitor import LOOP_MONITOR_ENABLED, LOOP_MONITOR_STRICT, LOOP_MONITOR_TOKEN, LoopMonitorMiddleware, start_loop_monitor, stop_loop_monitor
 
-app = FastAPI(title="Weekend Traveller AI Search Engine")
+setup_logging()
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Weekend Traveller AI Search Engine", default_response_class=FastJSONResponse)
 
 # MongoDB connection lifecycle
 @app.on_event("startup")
 async def startup_db_client():
+    setup_logging()
+    start_loop_monitor()
     await connect_to_mongo()
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        # Listing still works without indexes, just slower
+        logger.warning("Could not ensure MongoDB indexes: %s", e)
+    # Warm the place index in the background; /search never waits for it
+    refresh_place_index()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await flush_append_buffers()
+    await flush_trip_counts()
     await close_mongo_connection()
+    await stop_loop_monitor()
+    stop_logging()
 
 # CORS configuration
 origins = [
@@ -36,6 +59,9 @@ origins = [
     "http://localhost:3005",
 ]
 
+# gzip/brotli for large JSON bodies (trip plans are 30-60 KB of prose)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -44,6 +70,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+from app.services.media_service import MEDIA_PROXY_BASE_URL, MEDIA_PROXY_ENABLED, MediaProxyBaseMiddleware
+if MEDIA_PROXY_ENABLED and not MEDIA_PROXY_BASE_URL:
+    app.add_middleware(MediaProxyBaseMiddleware)
+from app.profiler import PROFILER_TOKEN, ProfilerMiddleware
+if PROFILER_TOKEN:
+    app.add_middleware(ProfilerMiddleware)
+# Debug/test only: fail requests that block the event loop
+if LOOP_MONITOR_STRICT:
+    app.add_middleware(LoopMonitorMiddleware)
+
+# Outermost: the request id is set before any other middleware or route runs
+app.add_middleware(RequestContextMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Weekend Traveller AI Search Engine API"}
@@ -52,27 +91,50 @@ app.include_router(search.router)
 from app.routers import analytics
 app.include_router(analytics.router)
 app.include_router(trips.router)
+from app.routers import places
+app.include_router(places.router)
+
+if MEDIA_PROXY_ENABLED:
+    from app.routers import media
+    app.include_router(media.router)
+if PROFILER_TOKEN:
+    from app.routers import profiles
+    app.include_router(profiles.router)
+if LOOP_MONITOR_ENABLED and LOOP_MONITOR_TOKEN:
+    from app.routers import loop
+    app.include_router(loop.router)
+
+from app.client_hints import set_hint_headers, video_quality
+from app.services.media_service import fetch_destination_videos, select_video_quality
 
-from app.services.media_service import fetch_destination_videos
+BACKGROUND_FALLBACK_VIDEO = {"url": "https://videos.pexels.com/video-files/855018/855018-hd_1920_1080_30fps.mp4", "credit": "Pexels", "source": "Pexels"}
 
 @app.get("/background-videos")
-async def get_background_videos():
+async def get_background_videos(
+    request: Request,
+    response: Response,
+    quality: Optional[str] = Query(None, pattern="^(low|medium|high)$")
+):
     """Fetch cinematic background videos for the landing page."""
+    # Rendition follows ?quality=, else the ECT/Downlink/Save-Data hints
+    set_hint_headers(response)
+    quality = quality or video_quality(request)
     # We fetch a large pool and let the frontend randomise
     try:
         videos = await fetch_destination_videos("Travel wanderlust nature cinematic", per_page=40)
         if not videos:
             # Fallback to a working HD video URL
-            return [{"url": "https://videos.pexels.com/video-files/855018/855018-hd_1920_1080_30fps.mp4", "credit": "Pexels", "source": "Pexels"}]
-        return videos
+            return [BACKGROUND_FALLBACK_VIDEO]
+        return select_video_quality(videos, quality) if quality else videos
     except Exception as e:
-        print(f"Error fetching background videos: {e}")
-        return [{"url": "https://videos.pexels.com/video-files/855018/855018-hd_1920_1080_30fps.mp4", "credit": "Pexels", "source": "Pexels"}]
+        logger.error("Error fetching background videos: %s", e)
+        return [BACKGROUND_FALLBACK_VIDEO]
 
 from app.services.ai_service import get_recommendations
 from app.schemas import RecommendationResponse
+from app.rate_limit import rate_limit
 
-@app.get("/recommendations", response_model=RecommendationResponse)
+@app.get("/recommendations", response_model=RecommendationResponse, dependencies=[Depends(rate_limit("recommendations"))])
 async def fetch_recommendations(lat: float, lng: float):
     """Get AI recommendations based on user location."""
     return await get_recommendations(lat, lng)
@@ -0,0 +1,273 @@
+"""
+Opt-in sampling profiler for single requests.
+
+Set PROFILER_TOKEN to enable it; without it neither the middleware nor the
+/internal/profiles routes are mounted, so normal requests pay nothing. A request
+is profiled when it carries `X-Profile-Token: <token>` (or `?profile=<token>`).
+
+While the request runs, a background thread samples every PROFILER_INTERVAL_MS:
+    wall - the request task's stack at every tick: the live stack while it runs
+           on the loop, or its suspended await chain (ending in "(awaiting)")
+    cpu  - the event-loop thread's stack whenever it is executing the request
+           task or a task it spawned (gather/create_task children)
+Synchronous work that blocks the loop (SQLite, pydantic) shows up in both.
+Profiles are kept in memory (last PROFILER_MAX_STORED) and served as
+speedscope JSON or collapsed stacks.
+"""
+import asyncio
+import hmac
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "120"))
+PROFILER_MAX_STORED = int(os.getenv("PROFILER_MAX_STORED", "20"))
+PROFILE_HEADER = b"x-profile-token"
+
+AWAITING_FRAME = ("(awaiting)", "", 0)
+_ASYNCIO_EVENTS = asyncio.events.__file__
+
+_profiles: "OrderedDict[str, Profile]" = OrderedDict()
+_active_session: ContextVar[Optional["_Session"]] = ContextVar("profile_session", default=None)
+_active_count = 0
+_previous_factory = None
+
+def frame_key(code) -> Tuple[str, str, int]:
+    # co_qualname is 3.11+; older interpreters only have the bare function name
+    return getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno
+
+def token_matches(candidate: Optional[str]) -> bool:
+    return bool(PROFILER_TOKEN and candidate) and hmac.compare_digest(candidate.encode(), PROFILER_TOKEN.encode())
+
+class Profile:
+    """Samples for one request: interned frames plus weighted stacks per view."""
+    def __init__(self, profile_id: str, method: str, path: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.status = None
+        self.created = time.time()
+        self.wall_ms = 0.0
+        self.loop_cpu_ms = 0.0
+        self.frames: List[Tuple[str, str, int]] = []
+        self._frame_ids: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[str, List[List[int]]] = {"wall": [], "cpu": []}
+        self.weights: Dict[str, List[float]] = {"wall": [], "cpu": []}
+
+    def _frame_id(self, frame) -> int:
+        key = frame if isinstance(frame, tuple) else frame_key(frame.f_code)
+        frame_id = self._frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self._frame_ids[key] = len(self.frames)
+            self.frames.append(key)
+        return frame_id
+
+    def add(self, view: str, stack: list, weight_ms: float):
+        """Record a root-first stack (frames or (name, file, line) tuples)."""
+        if stack:
+            self.samples[view].append([self._frame_id(frame) for frame in stack])
+            self.weights[view].append(weight_ms)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "created": self.created,
+            "wall_ms": round(self.wall_ms, 1),
+            "loop_cpu_ms": round(self.loop_cpu_ms, 1),
+            "samples": {view: len(samples) for view, samples in self.samples.items()},
+        }
+
+    def speedscope(self) -> dict:
+        """https://www.speedscope.app/file-format-schema.json (sampled profiles)."""
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "weekendt-profiler",
+            "shared": {"frames": [{"name": name, "file": file, "line": line} for name, file, line in self.frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{view} ({self.method} {self.path})",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(self.weights[view]), 3),
+                    "samples": self.samples[view],
+                    "weights": [round(w, 3) for w in self.weights[view]],
+                }
+                for view in ("wall", "cpu")
+            ],
+        }
+
+    def collapsed(self, view: str = "wall") -> str:
+        """Brendan Gregg's folded format, weighted in microseconds."""
+        totals: Dict[Tuple[int, ...], float] = {}
+        for stack, weight in zip(self.samples[view], self.weights[view]):
+            totals[tuple(stack)] = totals.get(tuple(stack), 0.0) + weight
+        labels = [f"{name} ({os.path.basename(file)}:{line})" if file else name for name, file, line in self.frames]
+        return "".join(
+            ";".join(labels[i].replace(";", ":") for i in stack) + f" {int(round(weight * 1000))}\n"
+            for stack, weight in totals.items()
+        )
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    return _profiles.get(profile_id)
+
+def list_profiles() -> List[dict]:
+    return [profile.summary() for profile in reversed(_profiles.values())]
+
+def _store(profile: Profile):
+    _profiles[profile.id] = profile
+    _profiles.move_to_end(profile.id)
+    while len(_profiles) > PROFILER_MAX_STORED:
+        _profiles.popitem(last=False)
+
+def _loop_stack(frame) -> list:
+    """Root-first stack of the loop thread, minus the event loop's own frames."""
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    for i, f in enumerate(stack):
+        # Handle._run is where the loop steps into a task; everything above is the loop
+        if f.f_code.co_name == "_run" and f.f_code.co_filename == _ASYNCIO_EVENTS:
+            return stack[i + 1:]
+    return stack
+
+def _await_chain(coro) -> list:
+    """Frames of a suspended coroutine chain, outermost first, ending at what it awaits."""
+    stack = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    stack.append(AWAITING_FRAME)
+    return stack
+
+class _Session:
+    def __init__(self, profile: Profile, task: asyncio.Task, loop: asyncio.AbstractEventLoop):
+        self.profile = profile
+        self.task = task
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.tasks = weakref.WeakSet([task])
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{profile.id}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        interval = PROFILER_INTERVAL_MS / 1000
+        deadline = time.perf_counter() + PROFILER_MAX_SECONDS
+        last = time.perf_counter()
+        while not self._stop.wait(interval):
+            now = time.perf_counter()
+            if now > deadline:
+                break
+            self._sample((now - last) * 1000)
+            last = now
+
+    def _sample(self, weight_ms: float):
+        # Called from the sampler thread: CPython (3.9-3.13) keeps the running task
+        # per loop in one process-wide table, so current_task(loop) sees it from here
+        running = asyncio.current_task(self.loop)
+        live = None
+        if running is not None and running in self.tasks:
+            live = _loop_stack(sys._current_frames().get(self.thread_id))
+            self.profile.add("cpu", live, weight_ms)
+        if running is self.task:
+            self.profile.add("wall", live, weight_ms)
+        elif not self.task.done():
+            self.profile.add("wall", _await_chain(self.task.get_coro()), weight_ms)
+
+def _tracking_task_factory(loop, coro, **kwargs):
+    """Remember tasks spawned from inside a profiled request."""
+    if _previous_factory is not None:
+        task = _previous_factory(loop, coro, **kwargs)
+    else:
+        task = asyncio.Task(coro, loop=loop, **kwargs)
+    session = _active_session.get()
+    if session is not None:
+        session.tasks.add(task)
+    return task
+
+def _begin(loop):
+    global _active_count, _previous_factory
+    if _active_count == 0:
+        _previous_factory = loop.get_task_factory()
+        loop.set_task_factory(_tracking_task_factory)
+    _active_count += 1
+
+def _end(loop):
+    global _active_count, _previous_factory
+    _active_count -= 1
+    if _active_count == 0:
+        loop.set_task_factory(_previous_factory)
+        _previous_factory = None
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == PROFILE_HEADER:
+            return token_matches(value.decode("latin-1"))
+    if b"profile=" in scope.get("query_string", b""):
+        values = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+        return bool(values) and token_matches(values[0])
+    return False
+
+class ProfilerMiddleware:
+    """Plain ASGI middleware: sample the request when it carries the profiler token."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        from app.logging_config import request_id_var
+        loop = asyncio.get_running_loop()
+        profile_id = request_id_var.get() or os.urandom(8).hex()
+        profile = Profile(profile_id, scope["method"], scope["path"])
+        session = _Session(profile, asyncio.current_task(), loop)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile_id
+                headers["X-Profile-Url"] = f"/internal/profiles/{profile_id}"
+            await send(message)
+
+        _begin(loop)
+        token = _active_session.set(session)
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        session.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session.stop()
+            profile.wall_ms = (time.perf_counter() - started) * 1000
+            profile.loop_cpu_ms = (time.thread_time() - cpu_started) * 1000
+            _active_session.reset(token)
+            _end(loop)
+            _store(profile)
@@ -0,0 +1,170 @@
+"""
+Per-client token-bucket admission control for the LLM-backed endpoints.
+
+Each (route class, client IP) pair gets a bucket of `capacity` tokens refilled at
+`per_minute` tokens per minute. A request that finds the bucket empty is rejected
+with 429 + Retry-After before any LLM or media work starts.
+
+Configuration (environment):
+    RATE_LIMIT_<CLASS>=capacity:per_minute   e.g. RATE_LIMIT_SEARCH=5:6
+    RATE_LIMIT_STATE_FILE=/path/ratelimit.db  share buckets across worker processes
+                                              (fails open if the file stays locked)
+    TRUSTED_PROXY_HOPS=1                      proxies that append to X-Forwarded-For
+    RATE_LIMIT_ENABLED=false                  disable entirely
+"""
+import logging
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+# Route class -> (capacity, tokens per minute)
+DEFAULT_LIMITS = {
+    "search": (5, 6),
+    "recommendations": (10, 20),
+    # On-demand item descriptions: one short completion each, generated once per item
+    "details": (20, 30),
+    # Trip edits: a partial plan generation plus media for the new items
+    "edits": (5, 6),
+}
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))
+RATE_LIMIT_STATE_FILE = os.getenv("RATE_LIMIT_STATE_FILE")
+# Full buckets are indistinguishable from new ones; both stores drop them this often
+PRUNE_INTERVAL_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+def get_limit(route_class: str) -> Tuple[int, float]:
+    """(capacity, refill tokens per second) for a route class."""
+    capacity, per_minute = DEFAULT_LIMITS[route_class]
+    override = os.getenv(f"RATE_LIMIT_{route_class.upper()}")
+    if override:
+        capacity, _, per_minute = override.partition(":")
+        capacity, per_minute = int(capacity), float(per_minute or capacity)
+    return capacity, per_minute / 60.0
+
+def client_ip(request: Request) -> str:
+    """
+    Client address, honouring X-Forwarded-For. Only the entries appended by our
+    own proxies are trusted, so a client can't pick its bucket by spoofing the header.
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and TRUSTED_PROXY_HOPS > 0:
+        hops = [ip.strip() for ip in forwarded.split(",") if ip.strip()]
+        if hops:
+            return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+def _take(tokens: float, updated: float, capacity: int, rate: float, now: float) -> Tuple[bool, float, float]:
+    """Refill then try to take one token. Returns (allowed, tokens_left, retry_after_seconds)."""
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / rate
+
+class MemoryBucketStore:
+    """Buckets in this process only."""
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        # key -> (tokens, updated, time at which the bucket is full again)
+        self.buckets: Dict[str, Tuple[float, float, float]] = {}
+        self.next_prune = time.time() + PRUNE_INTERVAL_SECONDS
+        # Grows with the live bucket count, so a burst of clients costs amortized O(1) per call
+        self.prune_size = self.MAX_BUCKETS
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float, float]:
+        now = time.time()
+        tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+        allowed, tokens, retry_after = _take(tokens, updated, capacity, rate, now)
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        if now >= self.next_prune or len(self.buckets) > self.prune_size:
+            self.prune(now)
+        return allowed, tokens, retry_after
+
+    def prune(self, now: float):
+        for stale in [k for k, (_, _, full_at) in self.buckets.items() if full_at <= now]:
+            del self.buckets[stale]
+        self.next_prune = now + PRUNE_INTERVAL_SECONDS
+        self.prune_size = max(self.MAX_BUCKETS, 2 * len(self.buckets))
+
+class FileBucketStore:
+    """Buckets in a shared SQLite file, so every worker process enforces the same limits."""
+    BUSY_TIMEOUT_SECONDS = 5
+
+    def __init__(self, path: str):
+        self.path = path
+        self.next_prune = time.time() + PRUNE_INTERVAL_SECONDS
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_full_at ON buckets(full_at)")
+        conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT_SECONDS, isolation_level=None)
+
+    def take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float, float]:
+        try:
+            return self._take(key, capacity, rate)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            # Admission control must not take the endpoint down with it
+            logger.warning("Rate limit state file busy, admitting %s: %s", key, e)
+            return True, 0.0, 0.0
+
+    def _take(self, key: str, capacity: int, rate: float) -> Tuple[bool, float, float]:
+        conn = self._connect()
+        try:
+            # IMMEDIATE: read-modify-write of the bucket is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            allowed, tokens, retry_after = _take(tokens, updated, capacity, rate, now)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, full_at = excluded.full_at",
+                (key, tokens, now, now + (capacity - tokens) / rate)
+            )
+            if now >= self.next_prune:
+                conn.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+                self.next_prune = now + PRUNE_INTERVAL_SECONDS
+            conn.execute("COMMIT")
+            return allowed, tokens, retry_after
+        finally:
+            conn.close()
+
+_store = FileBucketStore(RATE_LIMIT_STATE_FILE) if RATE_LIMIT_STATE_FILE else MemoryBucketStore()
+
+def rate_limit(route_class: str):
+    """FastAPI dependency enforcing the `route_class` bucket for the calling client."""
+    capacity, rate = get_limit(route_class)
+
+    async def dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        key = f"{route_class}:{client_ip(request)}"
+        if isinstance(_store, FileBucketStore):
+            allowed, _, retry_after = await run_in_threadpool(_store.take, key, capacity, rate)
+        else:
+            allowed, _, retry_after = _store.take(key, capacity, rate)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down.",
+                headers={
+                    "Retry-After": str(max(1, math.ceil(retry_after))),
+                    "X-RateLimit-Limit": str(capacity),
+                    "X-RateLimit-Remaining": "0",
+                }
+            )
+
+    return dependency
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Request, BackgroundTasks
-from app.services.analytics_service import log_page_view_to_db, get_dashboard_stats_service, log_event_to_db
+from fastapi import APIRouter, Request, BackgroundTasks, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.db import get_shard_paths
+from app.services.analytics_service import (
+    log_page_view_to_db, get_dashboard_stats_service, log_event_to_db, log_batch_to_db,
+    stream_export
+)
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
+from datetime import datetime
 import json
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+# Upper bound on items per /batch request (client flushes well below this)
+MAX_BATCH_ITEMS = 500
+
 class PageView(BaseModel):
     url: str
     referrer: Optional[str] = None
@@ -15,6 +24,19 @@ class EventTrack(BaseModel):
     event_data: Optional[Dict[str, Any]] = None
     url: str
 
+class BatchPageView(BaseModel):
+    type: Literal["pageview"]
+    url: str
+    referrer: Optional[str] = None
+
+class BatchEvent(BaseModel):
+    type: Literal["event"]
+    event_name: str
+    event_data: Optional[Dict[str, Any]] = None
+    url: str
+
+BATCH_ITEM_MODELS = {"pageview": BatchPageView, "event": BatchEvent}
+
 @router.post("/track")
 async def track_page_view(payload: PageView, request: Request, background_tasks: BackgroundTasks):
     data = {
@@ -43,6 +65,75 @@ async def track_event(payload: EventTrack, request: Request, background_tasks: B
     )
     return {"status": "ok"}
 
+@router.post("/batch")
+async def track_batch(request: Request, background_tasks: BackgroundTasks):
+    """
+    Ingest a mixed array of page views and events in one request.
+    The body is read raw so navigator.sendBeacon text/plain payloads are accepted too.
+    """
+    body = await request.body()
+    try:
+        raw_items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid analytics batch: body is not JSON")
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=422, detail="Invalid analytics batch: expected a JSON array")
+    if len(raw_items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_ITEMS} items)")
+    
+    # Validate the whole array in one pass, dispatching on each item's "type"
+    try:
+        items = [BATCH_ITEM_MODELS[raw["type"]](**raw) for raw in raw_items]
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid analytics batch item: {e}")
+    
+    user_agent = request.headers.get("user-agent") or "Unknown"
+    ip_address = request.client.host if request.client else None
+    
+    page_views = []
+    events = []
+    for item in items:
+        if item.type == "pageview":
+            page_views.append({
+                "url": item.url,
+                "referrer": item.referrer,
+                "user_agent": user_agent,
+                "ip_address": ip_address,
+                "country": "Unknown"
+            })
+        else:
+            events.append({
+                "event_name": item.event_name,
+                "event_data": json.dumps(item.event_data) if item.event_data else None,
+                "url": item.url,
+                "user_agent": user_agent
+            })
+    
+    # One background write for the whole batch
+    if page_views or events:
+        background_tasks.add_task(log_batch_to_db, page_views, events)
+    return {"status": "ok", "accepted": len(items)}
+
 @router.get("/dashboard")
 async def get_dashboard_stats():
     return await get_dashboard_stats_service()
+
+@router.get("/export")
+def export_analytics(
+    table: str = Query(..., pattern="^(page_views|searches|events)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+):
+    """Stream raw rows for a time range as NDJSON or CSV (constant memory)."""
+    if not get_shard_paths():
+        raise HTTPException(status_code=404, detail="No analytics data")
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{table}.{'csv' if format == 'csv' else 'ndjson'}"
+    # Sync generator: Starlette iterates it in the threadpool, off the event loop
+    return StreamingResponse(
+        stream_export(table, format, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,17 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.loop_monitor import get_loop_monitor, token_matches
+
+def require_loop_token(x_loop_token: Optional[str] = Header(None)):
+    if not token_matches(x_loop_token):
+        raise HTTPException(status_code=403, detail="Loop monitor token required")
+
+router = APIRouter(prefix="/internal/loop", tags=["internal"], dependencies=[Depends(require_loop_token)])
+
+@router.get("")
+async def get_loop_stats():
+    """Event-loop lag percentiles over the recent window plus the latest slow callbacks with their stacks."""
+    monitor = get_loop_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=503, detail="Loop monitor not running")
+    return monitor.stats()
@@ -0,0 +1,111 @@
+import logging
+import mmap
+import os
+import re
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.services.media_cache import fetch_and_store, lookup
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Content-addressed: the bytes behind a key never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+RANGE_CHUNK_SIZE = 256 * 1024
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single-range `Range` header, None to serve the
+    whole file (absent/multi-range headers). Raises ValueError if unsatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+def _open_blob(path):
+    """(open file, size), or None if the blob is gone. The handle outlives a later eviction."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    return f, os.fstat(f.fileno()).st_size
+
+def _iter_mapped(f, start: int, end: int):
+    """Yield bytes [start, end] of an open file through a read-only memory map, then close it."""
+    with f:
+        if end < start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            position = start
+            while position <= end:
+                chunk_end = min(position + RANGE_CHUNK_SIZE, end + 1)
+                yield mapped[position:chunk_end]
+                position = chunk_end
+
+@router.get("/media/{key}")
+async def get_media(key: str, request: Request):
+    """Serve a provider image/video from the local cache, fetching it on first use."""
+    cached = await run_in_threadpool(lookup, key)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Unknown media key")
+    url, path, digest, content_type = cached
+    opened = None
+    for _ in range(2):
+        if path is None:
+            try:
+                path, digest, content_type = await fetch_and_store(key, url)
+            except Exception as e:
+                logger.warning("Error fetching media %s: %s", url, e)
+                raise HTTPException(status_code=502, detail="Upstream media unavailable")
+        # Served from this handle only, so eviction after this point can't fail the response
+        opened = await run_in_threadpool(_open_blob, path)
+        if opened is not None:
+            break
+        # Evicted between lookup() and now: fetch it again
+        path = None
+    if opened is None:
+        raise HTTPException(status_code=503, detail="Media cache is evicting faster than it fills")
+    f, size = opened
+
+    etag = f'"{digest}"'
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+    }
+    if etag in request.headers.get("if-none-match", ""):
+        f.close()
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError:
+        f.close()
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    status_code = 206
+    if byte_range is None or byte_range == (0, size - 1):
+        byte_range, status_code = (0, size - 1), 200
+    else:
+        headers["Content-Range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{size}"
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(_iter_mapped(f, start, end), status_code=status_code, media_type=content_type, headers=headers)
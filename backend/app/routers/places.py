@@ -0,0 +1,23 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.services.place_index import MAX_RADIUS_KM, PLACE_KINDS
+from app.services.trip_service import nearby_places
+
+router = APIRouter()
+
+@router.get("/places/nearby")
+async def get_nearby_places(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(2.0, gt=0, le=MAX_RADIUS_KM, description="Radius in km"),
+    limit: int = Query(20, ge=1, le=100),
+    kind: Optional[str] = Query(None, description="One of: " + ", ".join(PLACE_KINDS))
+):
+    """Places from saved trips within `radius` km of a point, nearest first."""
+    if kind is not None and kind not in PLACE_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(PLACE_KINDS)}")
+    try:
+        places = await nearby_places(lat, lng, radius, limit, kind)
+        return {"places": places, "count": len(places)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,29 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.profiler import get_profile, list_profiles, token_matches
+
+def require_profiler_token(x_profile_token: Optional[str] = Header(None)):
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiler token required")
+
+router = APIRouter(prefix="/internal/profiles", tags=["internal"], dependencies=[Depends(require_profiler_token)])
+
+@router.get("")
+async def get_profiles():
+    """Most recent request profiles, newest first."""
+    return {"profiles": list_profiles()}
+
+@router.get("/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    format: Literal["speedscope", "collapsed"] = Query("speedscope"),
+    view: Literal["wall", "cpu"] = Query("wall", description="Samples to fold (collapsed format only)")
+):
+    """A stored profile as speedscope JSON (open at speedscope.app) or folded stacks."""
+    profile = get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed(view))
+    return profile.speedscope()
@@ -1,13 +1,35 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
+from app.client_hints import VIDEO_QUALITIES, device_pixel_ratio, set_hint_headers, video_quality, viewport_width
+from app.rate_limit import rate_limit
 from app.schemas import SearchRequest, TripPlan
 from app.services.ai_service import generate_trip_plan
+from app.services.media_service import select_plan_images, select_plan_video
 
 router = APIRouter()
 
-@router.post("/search", response_model=TripPlan)
-async def search_trips(request: SearchRequest):
+@router.post("/search", response_model=TripPlan, dependencies=[Depends(rate_limit("search"))])
+async def search_trips(
+    request: SearchRequest,
+    http_request: Request,
+    response: Response,
+    vw: Optional[int] = Query(None, gt=0, le=8192, description="Viewport width in CSS pixels"),
+    dpr: Optional[float] = Query(None, gt=0, le=4, description="Device pixel ratio"),
+    quality: Optional[str] = Query(None, pattern="^(low|medium|high)$", description="Video quality: " + "/".join(VIDEO_QUALITIES))
+):
+    set_hint_headers(response)
     try:
         trip_plan = await generate_trip_plan(request)
-        return trip_plan
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    # Explicit query params win over client hints; with neither, keep the default sizes
+    width = vw or viewport_width(http_request)
+    if width:
+        select_plan_images(trip_plan, int(width), dpr or device_pixel_ratio(http_request) or 1.0)
+    video = quality or video_quality(http_request)
+    if video:
+        select_plan_video(trip_plan, video)
+    return trip_plan
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.responses import FastJSONResponse
+from app.rate_limit import rate_limit
 from app.services.trip_service import (
-    save_trip, get_trip, get_all_trips, delete_trip, 
-    save_search_history, get_search_history, get_trip_count
+    save_trip, get_cached_trip, get_all_trips, delete_trip, 
+    save_search_history, get_search_history, get_trip_count, next_cursor, search_trips,
+    get_item_details, edit_trip, public_trip
 )
 from app.schemas import TripPlan
+from app.services.ai_service import PlanPatchError
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 
 router = APIRouter()
 
@@ -18,6 +25,11 @@ class SaveTripResponse(BaseModel):
     trip_id: str
     message: str
 
+class EditTripRequest(BaseModel):
+    change: Optional[str] = None # Free text, e.g. "swap the museum on day 2 for something outdoors"
+    days: Optional[int] = Field(None, ge=1, le=14)
+    budget: Optional[str] = None
+
 @router.post("/trips", response_model=SaveTripResponse)
 async def create_trip(request: SaveTripRequest):
     """Save a generated trip to the database"""
@@ -30,7 +42,7 @@ async def create_trip(request: SaveTripRequest):
         }
         trip_id = await save_trip(trip_data)
         
-        # Also save to search history
+        # Also save to search history (queued, like the trip counter update)
         await save_search_history(
             query=request.trip_plan.destination,
             origin=request.origin,
@@ -47,28 +59,90 @@ async def create_trip(request: SaveTripRequest):
 @router.get("/trips")
 async def list_trips(
     limit: int = Query(50, ge=1, le=100),
-    skip: int = Query(0, ge=0)
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque `next` token from the previous page"),
+    view: str = Query("summary", pattern="^(summary|full)$"),
+    exact: bool = Query(False, description="Force an exact count_documents total")
 ):
-    """Get all saved trips with pagination"""
+    """
+    Get all saved trips with pagination (pass `cursor` for constant-time deep pages).
+    Returns compact summaries by default; use view=full for complete trip plans.
+    """
     try:
-        trips = await get_all_trips(limit=limit, skip=skip)
-        total = await get_trip_count()
+        trips = await get_all_trips(limit=limit, skip=skip, cursor=cursor, view=view)
+        total = await get_trip_count(exact=exact)
         return {
             "trips": trips,
             "total": total,
             "limit": limit,
-            "skip": skip
+            "skip": skip,
+            "next": next_cursor(trips, limit, "created_at")
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching trips: {str(e)}")
 
+@router.get("/trips/search")
+async def search_saved_trips(
+    q: str = Query(..., min_length=1, max_length=200),
+    days: Optional[int] = Query(None, ge=1),
+    currency: Optional[str] = None,
+    origin: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search saved trips by destination, origin or activity, with facets on days, currency and origin"""
+    try:
+        return await search_trips(q, {"days": days, "currency": currency, "origin": origin}, limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching trips: {str(e)}")
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+def _not_modified_since(if_modified_since: str, last_modified: Optional[datetime]) -> bool:
+    if not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        # A "-0000" zone parses as naive; HTTP dates are always UTC
+        since = since.replace(tzinfo=timezone.utc)
+    try:
+        return last_modified.replace(microsecond=0) <= since
+    except TypeError:
+        return False
+
 @router.get("/trips/{trip_id}")
-async def get_trip_by_id(trip_id: str):
-    """Get a specific trip by ID"""
-    trip = await get_trip(trip_id)
+async def get_trip_by_id(trip_id: str, request: Request):
+    """Get a specific trip by ID (cached; supports If-None-Match / If-Modified-Since)"""
+    trip = await get_cached_trip(trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    return trip
+
+    etag = f'"{trip["etag"]}"'
+    last_modified = trip.get("updated_at") or trip.get("created_at")
+    if last_modified:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since and _not_modified_since(if_modified_since, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse(jsonable_encoder(public_trip(trip)), headers=headers)
 
 @router.delete("/trips/{trip_id}")
 async def remove_trip(trip_id: str):
@@ -79,10 +153,55 @@ async def remove_trip(trip_id: str):
     return {"message": "Trip deleted successfully"}
 
 @router.get("/search-history")
-async def get_recent_searches(limit: int = Query(20, ge=1, le=100)):
+async def get_recent_searches(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque `next` token from the previous page")
+):
     """Get recent search history"""
     try:
-        history = await get_search_history(limit=limit)
-        return {"history": history}
+        history = await get_search_history(limit=limit, cursor=cursor)
+        return {"history": history, "next": next_cursor(history, limit, "timestamp")}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching search history: {str(e)}")
+
+@router.get("/trips/{trip_id}/items/{path}/details", dependencies=[Depends(rate_limit("details"))])
+async def get_trip_item_details(trip_id: str, path: str):
+    """
+    Full description of one item (e.g. itinerary.0.activities.2, destination_info,
+    origin_info.top_attractions.1). Summary-level trips generate it on first request.
+    """
+    try:
+        details = await get_item_details(trip_id, path)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No item at {path}")
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Generating details timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating details: {str(e)}")
+    if details is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return details
+
+@router.patch("/trips/{trip_id}", dependencies=[Depends(rate_limit("edits"))])
+async def edit_saved_trip(trip_id: str, request: EditTripRequest):
+    """
+    Edit a saved trip (more/fewer days, swap an activity, new budget, ...). Only the
+    affected days and sections are regenerated; the rest of the plan is kept as is.
+    """
+    try:
+        result = await edit_trip(trip_id, request.change, request.days, request.budget)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Editing the trip timed out")
+    except PlanPatchError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error editing trip: {str(e)}")
+    if result is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    return result
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class SearchRequest(BaseModel):
     query: str
@@ -8,28 +8,52 @@ class SearchRequest(BaseModel):
     budget: Optional[str] = None
     days: Optional[int] = 2
     travel_mode: Optional[str] = "flight" # flight, drive, train
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=120) # Overrides SEARCH_DEADLINE_SECONDS
+    detail_level: Optional[Literal["full", "summary"]] = None # "summary": one-line descriptions, expanded on demand (defaults to SEARCH_DETAIL_LEVEL)
 
 class Coordinates(BaseModel):
     lat: float
     lng: float
 
+class ImageRendition(BaseModel):
+    url: str
+    width: int
+
+class VideoRendition(BaseModel):
+    url: str
+    width: int
+    height: Optional[int] = None
+    fps: Optional[float] = None
+
 class Sightseeing(BaseModel):
     time: str
     activity: str
     description: str
     coordinates: Optional[Coordinates] = None
     image_url: Optional[str] = None
+    image_srcset: Optional[List[ImageRendition]] = None
     media_credit: Optional[str] = None
     nearby_attractions: Optional[List[str]] = None
 
+class Leg(BaseModel):
+    from_activity: str
+    to_activity: str
+    mode: str # walk, taxi
+    distance_km: float
+    duration_minutes: int
+
 class DayPlan(BaseModel):
     day: int
     activities: List[Sightseeing]
+    legs: Optional[List[Leg]] = None # Computed from coordinates (app.services.geo)
 
 class RouteInfo(BaseModel):
     distance: str
     duration: str
     map_url: Optional[str] = None
+    mode: Optional[str] = None
+    distance_km: Optional[float] = None
+    duration_minutes: Optional[int] = None
 
 class Hotel(BaseModel):
     name: str
@@ -42,6 +66,7 @@ class Attraction(BaseModel):
     description: str
     coordinates: Optional[Coordinates] = None
     image_url: Optional[str] = None
+    image_srcset: Optional[List[ImageRendition]] = None
     media_credit: Optional[str] = None
 
 class OriginInfo(BaseModel):
@@ -58,16 +83,28 @@ class TripPlan(BaseModel):
     estimated_budget: str
     currency: str = "USD"
     currency_symbol: str = "$"
-    route_info: RouteInfo
+    route_info: Optional[RouteInfo] = None # Computed from coordinates after generation (app.services.geo)
     itinerary: List[DayPlan]
     hotels: Optional[List[Hotel]] = None
     origin_info: Optional[OriginInfo] = None
     destination_info: Optional[OriginInfo] = None
     hero_image: Optional[str] = None
+    hero_image_srcset: Optional[List[ImageRendition]] = None
     hero_video: Optional[str] = None
+    hero_video_poster: Optional[str] = None
+    hero_video_renditions: Optional[List[VideoRendition]] = None
     media_credit: Optional[str] = None # For Hero Image
     coordinates: Optional[Coordinates] = None
     origin_coordinates: Optional[Coordinates] = None
+    partial_fields: Optional[List[str]] = None # Media fields left unresolved when the search deadline hit
+    detail_level: Optional[str] = None # "summary" when descriptions are one-liners (see /trips/{trip_id}/items/{path}/details)
+
+class TripPlanPatch(BaseModel):
+    """The sections of a TripPlan that an edit changes; unchanged sections stay null."""
+    days: Optional[List[DayPlan]] = None # New or rewritten days, with their `day` numbers
+    removed_days: Optional[List[int]] = None
+    estimated_budget: Optional[str] = None
+    hotels: Optional[List[Hotel]] = None
 
 class Recommendation(BaseModel):
     name: str
@@ -1,9 +1,15 @@
 import os
 import json
+import asyncio
+import logging
+import time
+from typing import List, Optional
 from openai import AsyncOpenAI
-from app.schemas import SearchRequest, TripPlan, RouteInfo, DayPlan, Sightseeing
+from app.schemas import SearchRequest, TripPlan, TripPlanPatch, RouteInfo, DayPlan, Sightseeing, Attraction, ImageRendition, VideoRendition
 
 # Validate API key exists
+logger = logging.getLogger(__name__)
+
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError(
@@ -13,10 +19,68 @@ if not OPENAI_API_KEY:
 
 client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
+# End-to-end budget for /search (LLM call + media enrichment); SearchRequest.deadline_seconds overrides
+SEARCH_DEADLINE_SECONDS = float(os.environ.get("SEARCH_DEADLINE_SECONDS", "45"))
+# Per-lookup cap and how many media lookups run at once
+MEDIA_LOOKUP_TIMEOUT_SECONDS = 5.0
+MEDIA_CONCURRENCY = 6
+# "full" asks for long descriptions up front; "summary" asks for one-liners and
+# generates the long text per item on demand (GET /trips/{trip_id}/items/{path}/details)
+SEARCH_DETAIL_LEVEL = os.environ.get("SEARCH_DETAIL_LEVEL", "full").lower()
+# Minimum description length per item kind, for full plans and on-demand details
+DETAIL_MIN_CHARS = {"activity": 400, "city": 400, "attraction": 200}
+DETAILS_TIMEOUT_SECONDS = 30.0
+
+# nearby_attractions from the place index: how far counts as "walking distance", and how many
+WALKING_RADIUS_KM = 1.5
+NEARBY_ATTRACTIONS_COUNT = 3
+
+class Deadline:
+    """Absolute point in time that a request's work must finish by."""
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def media_timeout(self) -> float:
+        # Never wait on a provider longer than the request has left
+        return max(0.1, min(MEDIA_LOOKUP_TIMEOUT_SECONDS, self.remaining()))
+
 
 from app.services.media_service import fetch_destination_images, fetch_destination_videos
+from app.services.geo import apply_route_metrics
+
+def _description_rules(detail_level: str):
+    """Prompt wording for (activity, city, attraction) descriptions at a detail level."""
+    if detail_level == "summary":
+        return (
+            "a ONE-SENTENCE `description` (max 120 characters) summarizing the activity",
+            "A one-sentence description (max 150 characters)",
+            "a one-sentence description (max 120 characters)",
+        )
+    return (
+        f"a `description` that is AT LEAST {DETAIL_MIN_CHARS['activity']} characters long (approx 5-6 sentences), offering rich historical, cultural, and practical context",
+        f"A {DETAIL_MIN_CHARS['city']}+ character description",
+        f"descriptions ({DETAIL_MIN_CHARS['attraction']}+ chars each)",
+    )
 
 async def generate_trip_plan(request: SearchRequest) -> TripPlan:
+    budget = request.deadline_seconds or SEARCH_DEADLINE_SECONDS
+    deadline = Deadline(budget)
+    detail_level = request.detail_level or SEARCH_DETAIL_LEVEL
+    activity_description, city_description, attraction_description = _description_rules(detail_level)
+
+    # When our saved trips already map the destination, nearby_attractions come from
+    # the place index instead of the model
+    place_index = _get_place_index()
+    nearby_from_index = bool(place_index and request.destination and place_index.covers(request.destination))
+    if nearby_from_index:
+        nearby_instruction = "2. Leave `nearby_attractions` empty for every activity; it is filled in separately."
+    else:
+        nearby_instruction = "2. For each activity, include a `nearby_attractions` list with 2-3 other interesting places within walking distance."
+
     # Construct the prompt
     prompt = f"""
     You are an expert travel planner. The user has sent the following request:
@@ -33,21 +97,22 @@ async def generate_trip_plan(request: SearchRequest) -> TripPlan:
     Budget: {request.budget or 'Moderate'}
     Travel Mode: {request.travel_mode or 'flight'}
     
-    Provide a realistic itinerary with specific activities, timings, best time to visit, estimated budget, and route info.
+    Provide a realistic itinerary with specific activities, timings, best time to visit, and estimated budget.
+    Leave `route_info` and each day's `legs` null; travel distances and times are computed from your coordinates.
     Important: Identify the local currency of the destination (e.g., 'EUR' for Paris, 'GBP' for London, 'INR' for India). Provide the `currency` code and the `currency_symbol` (e.g., '€', '£', '₹').
     
     CRITICAL REQUIREMENTS:
-    1. For each 'Sightseeing' activity, provide a `description` that is AT LEAST 400 characters long (approx 5-6 sentences), offering rich historical, cultural, and practical context.
-    2. For each activity, include a `nearby_attractions` list with 2-3 other interesting places within walking distance.
+    1. For each 'Sightseeing' activity, provide {activity_description}.
+    {nearby_instruction}
     3. Provide a `hotels` list with 3-4 recommended hotels at the DESTINATION, each with name, description, price_range (Budget/Mid-Range/Luxury), and GPS coordinates.
     4. Provide `origin_info` with details about the ORIGIN city including:
-       - A 400+ character description of the origin city
-       - `top_attractions`: 3-4 must-visit places in the origin city with descriptions (200+ chars each) and coordinates
+       - {city_description} of the origin city
+       - `top_attractions`: 3-4 must-visit places in the origin city with {attraction_description} and coordinates
        - `hotels`: 2-3 recommended hotels in the origin city with the same format as destination hotels
     5. Provide `destination_info` with:
        - `city_name`: Name of the destination
-       - `description`: A 400+ character description of the destination
-       - `top_attractions`: 3-4 MUST-VISIT top attractions at the destination. These should be distinct from the daily itinerary activities if possible, or the absolute highlights. Include description (200+ chars) and coordinates.
+       - `description`: {city_description} of the destination
+       - `top_attractions`: 3-4 MUST-VISIT top attractions at the destination. These should be distinct from the daily itinerary activities if possible, or the absolute highlights. Include {attraction_description} and coordinates.
     6. You MUST provide valid GPS coordinates (lat/lng) for:
        - The main destination
        - The ORIGIN city (as 'origin_coordinates')
@@ -58,7 +123,7 @@ async def generate_trip_plan(request: SearchRequest) -> TripPlan:
     Ensure the response is strictly in the simplified JSON format required.
     """
 
-    print(f"DEBUG: Generating plan for {request.destination}...")
+    logger.debug("Generating plan for %s", request.destination)
     
     # Log Search for Analytics
     from app.services.analytics_service import log_search_to_db
@@ -72,97 +137,329 @@ async def generate_trip_plan(request: SearchRequest) -> TripPlan:
             user_agent="AI_Service"
         )
     except Exception as e:
-        print(f"Analytics logging failed: {e}")
+        logger.warning("Analytics logging failed: %s", e)
 
+    llm_started = time.monotonic()
     try:
-        completion = await client.beta.chat.completions.parse(
-            model="gpt-4o-2024-08-06",
-            messages=[
-                {"role": "system", "content": "You are a travel assistant. Generate a structured trip plan."},
-                {"role": "user", "content": prompt},
-            ],
-            response_format=TripPlan,
+        # The LLM call is bounded by whatever budget is left; enrichment gets the rest
+        completion = await asyncio.wait_for(
+            client.beta.chat.completions.parse(
+                model="gpt-4o-2024-08-06",
+                messages=[
+                    {"role": "system", "content": "You are a travel assistant. Generate a structured trip plan."},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=TripPlan,
+                timeout=deadline.remaining(),
+            ),
+            timeout=deadline.remaining()
         )
-        print("DEBUG: OpenAI response received and parsed.")
+        logger.info("OpenAI plan parsed", extra={"duration_ms": round((time.monotonic() - llm_started) * 1000, 1)})
+    except asyncio.TimeoutError:
+        logger.error("OpenAI API exceeded the %gs search deadline", budget)
+        raise TimeoutError(f"Trip generation exceeded its {budget:g}s time budget")
     except Exception as e:
-        print(f"ERROR: OpenAI API failed: {e}")
+        logger.error("OpenAI API failed: %s", e)
         raise e
 
     trip_plan = completion.choices[0].message.parsed
+    trip_plan.detail_level = detail_level
+    apply_route_metrics(trip_plan, request.travel_mode)
+    if place_index:
+        _fill_nearby_attractions(trip_plan, place_index, replace=nearby_from_index)
     
-    # Enrichment with Media
+    # Enrichment with Media: every lookup runs concurrently under the same deadline.
+    # Whatever hasn't resolved when the budget runs out is cancelled and flagged.
+    jobs = {
+        "hero_image": _enrich_hero_image(trip_plan, deadline),
+        "hero_video": _enrich_hero_video(trip_plan, deadline),
+    }
+    for d, day in enumerate(trip_plan.itinerary):
+        for a, activity in enumerate(day.activities):
+            jobs[f"itinerary[{d}].activities[{a}].image_url"] = _enrich_activity(trip_plan, activity, deadline)
+    if trip_plan.destination_info and trip_plan.destination_info.top_attractions:
+        for a, attraction in enumerate(trip_plan.destination_info.top_attractions):
+            jobs[f"destination_info.top_attractions[{a}].image_url"] = _enrich_attraction(trip_plan, attraction, deadline)
+    if trip_plan.origin_coordinates and trip_plan.origin_info:
+        jobs["origin_info.image_url"] = _enrich_origin(trip_plan, request.origin or "Delhi", deadline)
+
+    pending = await _run_enrichment(jobs, deadline)
+    if pending:
+        trip_plan.partial_fields = pending
+        logger.warning("Search deadline reached, %d media lookups skipped", len(pending))
+
+    return trip_plan
+
+async def _run_enrichment(jobs: dict, deadline: Deadline) -> List[str]:
+    """Run {field path: coroutine} lookups concurrently; returns the paths left unresolved at the deadline."""
+    if not jobs:
+        return []
+    semaphore = asyncio.Semaphore(MEDIA_CONCURRENCY)
+
+    async def run_limited(coro):
+        async with semaphore:
+            await coro
+
+    tasks = {asyncio.create_task(run_limited(coro)): path for path, coro in jobs.items()}
+    done, pending = await asyncio.wait(tasks, timeout=deadline.remaining())
+    for task in pending:
+        task.cancel()
+    for task in done:
+        if task.exception():
+            logger.warning("Media enrichment failed for %s: %s", tasks[task], task.exception())
+    return sorted(tasks[task] for task in pending)
+
+def _get_place_index():
+    """The already-built place index, or None; never waits for a rebuild."""
+    from app.services.trip_service import current_place_index
+    try:
+        return current_place_index()
+    except Exception as e:
+        logger.warning("Place index unavailable, nearby attractions come from the model: %s", e)
+        return None
+
+def _fill_nearby_attractions(trip_plan: TripPlan, place_index, replace: bool):
+    """Fill activities' nearby_attractions with known places within walking distance."""
+    for day in trip_plan.itinerary:
+        for activity in day.activities:
+            if not activity.coordinates or (activity.nearby_attractions and not replace):
+                continue
+            places = place_index.nearby(
+                activity.coordinates.lat, activity.coordinates.lng, WALKING_RADIUS_KM,
+                limit=NEARBY_ATTRACTIONS_COUNT * 3, exclude=activity.activity
+            )
+            names = [p["name"] for p in places if p["kind"] in ("activity", "attraction")][:NEARBY_ATTRACTIONS_COUNT]
+            if names:
+                activity.nearby_attractions = names
+
+def _srcset(image: dict):
+    renditions = image.get("renditions")
+    return [ImageRendition(**r) for r in renditions] if renditions else None
+
+async def _enrich_hero_image(trip_plan: TripPlan, deadline: Deadline):
+    images = await fetch_destination_images(trip_plan.destination, timeout=deadline.media_timeout())
+    if images:
+        # images[0] is now a dict {url, credit, source}
+        trip_plan.hero_image = images[0]["url"]
+        trip_plan.hero_image_srcset = _srcset(images[0])
+        trip_plan.media_credit = f"Photo by {images[0]['credit']} on {images[0]['source']}"
+
+async def _enrich_hero_video(trip_plan: TripPlan, deadline: Deadline):
+    videos = await fetch_destination_videos(trip_plan.destination, timeout=deadline.media_timeout())
+    if videos:
+        trip_plan.hero_video = videos[0]["url"]
+        trip_plan.hero_video_poster = videos[0].get("poster")
+        if videos[0].get("renditions"):
+            trip_plan.hero_video_renditions = [VideoRendition(**r) for r in videos[0]["renditions"]]
+        # Video credit logic could be added here if schema supported it,
+        # but currently we only added media_credit for the image mostly.
+
+async def _enrich_activity(trip_plan: TripPlan, activity: Sightseeing, deadline: Deadline):
+    # Search for "Destination + Activity" to get relevant photos
     try:
-        # Fetch Hero Media
-        images = await fetch_destination_images(trip_plan.destination)
-        videos = await fetch_destination_videos(trip_plan.destination)
+        # heuristic to clean activity names for better search
+        clean_activity = activity.activity.replace("Visit", "").replace("Explore", "").replace("Tour", "").replace("See", "").replace("Walk around", "").strip()
+        query = f"{trip_plan.destination} {clean_activity}"
         
-        if images:
-            # images[0] is now a dict {url, credit, source}
-            trip_plan.hero_image = images[0]["url"]
-            trip_plan.media_credit = f"Photo by {images[0]['credit']} on {images[0]['source']}"
-            
-        if videos:
-            trip_plan.hero_video = videos[0]["url"]
-            # Video credit logic could be added here if schema supported it,
-            # but currently we only added media_credit for the image mostly.
-            
-        # Fetch Activity Images
-        for day in trip_plan.itinerary:
-            for activity in day.activities:
-                # Search for "Destination + Activity" to get relevant photos
-                try:
-                    # heuristic to clean activity names for better search
-                    clean_activity = activity.activity.replace("Visit", "").replace("Explore", "").replace("Tour", "").replace("See", "").replace("Walk around", "").strip()
-                    query = f"{trip_plan.destination} {clean_activity}"
-                    
-                    activity_images = await fetch_destination_images(query, per_page=3)
-                    if activity_images:
-                        activity.image_url = activity_images[0]["url"]
-                        activity.media_credit = f"Photo by {activity_images[0]['credit']}"
-                    else:
-                        # Fallback
-                        if len(clean_activity) > 5:
-                             activity_images = await fetch_destination_images(clean_activity, per_page=3)
-                             if activity_images:
-                                 activity.image_url = activity_images[0]["url"]
-                                 activity.media_credit = f"Photo by {activity_images[0]['credit']}"
-
-                except Exception as e:
-                    print(f"WARNING: Failed to fetch image for activity {activity.activity}: {e}")
-                    continue
-
-        # Fetch Destination Top Attractions Images
-        if trip_plan.destination_info and trip_plan.destination_info.top_attractions:
-            for attraction in trip_plan.destination_info.top_attractions:
-                try:
-                    query = f"{trip_plan.destination} {attraction.name}"
-                    attr_images = await fetch_destination_images(query, per_page=1)
-                    if not attr_images:
-                         attr_images = await fetch_destination_images(attraction.name, per_page=1)
-                    
-                    if attr_images:
-                        attraction.image_url = attr_images[0]["url"]
-                        attraction.media_credit = f"Photo by {attr_images[0]['credit']}"
-                except Exception as e:
-                    print(f"WARNING: Failed to fetch image for top attraction {attraction.name}: {e}")
-
-        # Fetch Origin City Image
-        if trip_plan.origin_coordinates:
-            try:
-                origin_city = request.origin or "Delhi"
-                origin_images = await fetch_destination_images(f"{origin_city} travel landmarks", per_page=1)
-                if origin_images and trip_plan.origin_info:
-                    trip_plan.origin_info.image_url = origin_images[0]["url"]
-                    trip_plan.origin_info.media_credit = f"Photo by {origin_images[0]['credit']}"
-            except Exception as e:
-                print(f"WARNING: Failed to fetch image for origin city: {e}")
+        activity_images = await fetch_destination_images(query, per_page=3, timeout=deadline.media_timeout())
+        if activity_images:
+            activity.image_url = activity_images[0]["url"]
+            activity.image_srcset = _srcset(activity_images[0])
+            activity.media_credit = f"Photo by {activity_images[0]['credit']}"
+        else:
+            # Fallback
+            if len(clean_activity) > 5:
+                 activity_images = await fetch_destination_images(clean_activity, per_page=3, timeout=deadline.media_timeout())
+                 if activity_images:
+                     activity.image_url = activity_images[0]["url"]
+                     activity.image_srcset = _srcset(activity_images[0])
+                     activity.media_credit = f"Photo by {activity_images[0]['credit']}"
 
     except Exception as e:
-        print(f"ERROR: Media enrichment failed completely: {e}")
-        # We process without media rather than failing the request
-        pass
+        logger.warning("Failed to fetch image for activity %s: %s", activity.activity, e)
 
-    return trip_plan
+async def _enrich_attraction(trip_plan: TripPlan, attraction: Attraction, deadline: Deadline):
+    # Fetch Destination Top Attractions Images
+    try:
+        query = f"{trip_plan.destination} {attraction.name}"
+        attr_images = await fetch_destination_images(query, per_page=1, timeout=deadline.media_timeout())
+        if not attr_images:
+             attr_images = await fetch_destination_images(attraction.name, per_page=1, timeout=deadline.media_timeout())
+        
+        if attr_images:
+            attraction.image_url = attr_images[0]["url"]
+            attraction.image_srcset = _srcset(attr_images[0])
+            attraction.media_credit = f"Photo by {attr_images[0]['credit']}"
+    except Exception as e:
+        logger.warning("Failed to fetch image for top attraction %s: %s", attraction.name, e)
+
+async def _enrich_origin(trip_plan: TripPlan, origin_city: str, deadline: Deadline):
+    # Fetch Origin City Image
+    try:
+        origin_images = await fetch_destination_images(f"{origin_city} travel landmarks", per_page=1, timeout=deadline.media_timeout())
+        if origin_images:
+            trip_plan.origin_info.image_url = origin_images[0]["url"]
+            trip_plan.origin_info.media_credit = f"Photo by {origin_images[0]['credit']}"
+    except Exception as e:
+        logger.warning("Failed to fetch image for origin city: %s", e)
+
+async def generate_item_details(destination: str, kind: str, name: str, summary: str) -> str:
+    """Long-form description for one plan item (activity, city or attraction) of a summary plan."""
+    min_chars = DETAIL_MIN_CHARS[kind]
+    subject = {
+        "activity": f"the activity \"{name}\" on a trip to {destination}",
+        "city": f"the city of {name}",
+        "attraction": f"the attraction \"{name}\" in or near {destination}",
+    }[kind]
+    prompt = f"""
+    Write a description of {subject} for a travel itinerary.
+    Current one-line summary: "{summary}"
+
+    The description must be AT LEAST {min_chars} characters long (approx {max(3, min_chars // 70)} sentences),
+    offering rich historical, cultural, and practical context. Return only the description text.
+    """
+    try:
+        completion = await asyncio.wait_for(
+            client.chat.completions.create(
+                model="gpt-4o-2024-08-06",
+                messages=[
+                    {"role": "system", "content": "You are an expert travel writer."},
+                    {"role": "user", "content": prompt},
+                ],
+                timeout=DETAILS_TIMEOUT_SECONDS,
+            ),
+            timeout=DETAILS_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Details for {name} exceeded {DETAILS_TIMEOUT_SECONDS:g}s")
+    return completion.choices[0].message.content.strip()
+
+class PlanPatchError(RuntimeError):
+    """The model's patch doesn't produce the plan that was asked for."""
+
+def _plan_outline(trip_plan: TripPlan) -> str:
+    """One line per day/section: enough context for an edit without the full plan."""
+    origin = trip_plan.origin_info.city_name if trip_plan.origin_info and trip_plan.origin_info.city_name else "unknown"
+    lines = [
+        f"Destination: {trip_plan.destination} (from {origin})",
+        f"Estimated budget: {trip_plan.estimated_budget} ({trip_plan.currency})",
+    ]
+    for day in trip_plan.itinerary:
+        lines.append(f"Day {day.day}: " + "; ".join(f"{a.time} {a.activity}" for a in day.activities))
+    if trip_plan.hotels:
+        lines.append("Hotels: " + "; ".join(f"{h.name} ({h.price_range})" for h in trip_plan.hotels))
+    return "\n    ".join(lines)
+
+async def _generate_plan_patch(trip_plan: TripPlan, change: Optional[str], target_days: int, budget: Optional[str], deadline: Deadline) -> TripPlanPatch:
+    activity_description, _, _ = _description_rules(trip_plan.detail_level or "full")
+    place_index = _get_place_index()
+    if place_index and place_index.covers(trip_plan.destination):
+        nearby_instruction = "leave `nearby_attractions` empty; it is filled in separately"
+    else:
+        nearby_instruction = "a `nearby_attractions` list with 2-3 other interesting places within walking distance"
+    budget_instruction = f"\n    New budget: {budget}. Return an updated `estimated_budget`." if budget else ""
+
+    prompt = f"""
+    You are editing an existing trip plan. Current plan (outline):
+    {_plan_outline(trip_plan)}
+
+    Requested change: "{change or 'none'}"
+    The trip must have exactly {target_days} days.{budget_instruction}
+
+    Return ONLY what changes, and leave everything else null:
+    - `days`: the complete plan for every day that is added or whose activities change, keeping its `day` number. Omit days that stay the same. In a rewritten day, keep unaffected activities with exactly the same name.
+    - `removed_days`: day numbers to drop, if any.
+    - `estimated_budget`: only if the change affects the cost, in {trip_plan.currency}.
+    - `hotels`: only if the change affects where to stay (3-4 hotels with name, description, price_range and GPS coordinates).
+
+    For every activity in `days`, provide {activity_description}, valid GPS coordinates,
+    and {nearby_instruction}. Leave each day's `legs` null.
+    """
+
+    llm_started = time.monotonic()
+    try:
+        completion = await asyncio.wait_for(
+            client.beta.chat.completions.parse(
+                model="gpt-4o-2024-08-06",
+                messages=[
+                    {"role": "system", "content": "You are a travel assistant. Edit the trip plan, returning only the changed sections."},
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=TripPlanPatch,
+                timeout=deadline.remaining(),
+            ),
+            timeout=deadline.remaining()
+        )
+        logger.info("OpenAI plan patch parsed", extra={"duration_ms": round((time.monotonic() - llm_started) * 1000, 1)})
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Trip edit exceeded its {deadline.seconds:g}s time budget")
+    return completion.choices[0].message.parsed
+
+async def edit_trip_plan(trip_plan: TripPlan, change: Optional[str], days: Optional[int] = None, budget: Optional[str] = None) -> List[str]:
+    """
+    Apply an edit to a plan in place. The model only writes the days/sections the
+    change affects (given the rest as a one-line-per-day outline), and only new
+    activities are enriched with media. Returns the changed paths.
+    """
+    target_days = days or len(trip_plan.itinerary)
+    if not change and not budget and target_days == len(trip_plan.itinerary):
+        raise ValueError("Describe a change, or set days or budget")
+    deadline = Deadline(SEARCH_DEADLINE_SECONDS)
+
+    # Dropping trailing days needs no model call
+    if change or budget or target_days > len(trip_plan.itinerary):
+        patch = await _generate_plan_patch(trip_plan, change, target_days, budget, deadline)
+    else:
+        patch = TripPlanPatch()
+
+    # Activities the model carried over keep their media
+    known = {a.activity.strip().lower(): a for day in trip_plan.itinerary for a in day.activities}
+    by_day = {day.day: day for day in trip_plan.itinerary}
+    rewritten = set()
+    for day in patch.days or []:
+        for activity in day.activities:
+            old = known.get(activity.activity.strip().lower())
+            if old is not None and old.image_url:
+                activity.image_url, activity.image_srcset, activity.media_credit = old.image_url, old.image_srcset, old.media_credit
+                activity.nearby_attractions = activity.nearby_attractions or old.nearby_attractions
+        by_day[day.day] = day
+        rewritten.add(id(day))
+    for number in patch.removed_days or []:
+        by_day.pop(number, None)
+    itinerary = [by_day[number] for number in sorted(by_day) if number <= target_days]
+    if len(itinerary) != target_days:
+        raise PlanPatchError(f"Edited plan has {len(itinerary)} days, expected {target_days}")
+
+    trip_plan.itinerary = itinerary
+    changed = []
+    for d, day in enumerate(itinerary):
+        day.day = d + 1
+        if id(day) in rewritten:
+            changed.append(f"itinerary.{d}")
+    if patch.estimated_budget:
+        trip_plan.estimated_budget = patch.estimated_budget
+        changed.append("estimated_budget")
+    if patch.hotels:
+        trip_plan.hotels = patch.hotels
+        changed.append("hotels")
+
+    apply_route_metrics(trip_plan, trip_plan.route_info.mode if trip_plan.route_info else None)
+    place_index = _get_place_index()
+    if place_index:
+        _fill_nearby_attractions(trip_plan, place_index, replace=False)
+
+    jobs = {}
+    for d, day in enumerate(itinerary):
+        if id(day) not in rewritten:
+            continue
+        for a, activity in enumerate(day.activities):
+            if not activity.image_url:
+                jobs[f"itinerary[{d}].activities[{a}].image_url"] = _enrich_activity(trip_plan, activity, deadline)
+    pending = await _run_enrichment(jobs, deadline)
+    # Earlier itinerary paths may have shifted with the day numbers
+    partial = [p for p in trip_plan.partial_fields or [] if not p.startswith("itinerary[")]
+    trip_plan.partial_fields = sorted(partial + pending) or None
+    return changed
 
 from app.schemas import RecommendationResponse, Recommendation
 
@@ -197,11 +494,11 @@ async def get_recommendations(lat: float, lng: float) -> RecommendationResponse:
                     dest.image_url = images[0]["url"]
                     dest.media_credit = f"Photo by {images[0]['credit']}"
             except Exception as e:
-                print(f"Failed to fetch image for rec {dest.name}: {e}")
+                logger.warning("Failed to fetch image for rec %s: %s", dest.name, e)
                 
         return recommendations
         
     except Exception as e:
-        print(f"Error getting recommendations: {e}")
+        logger.error("Error getting recommendations: %s", e)
         # Fallback
         return RecommendationResponse(destinations=[])
@@ -1,13 +1,27 @@
 import datetime
-from app.db import get_db_connection
+from app.db import get_db_connection, get_readonly_connection, get_shard_paths
+from collections import Counter
+from typing import List, Optional, Iterator, Tuple
+import csv
+import io
+import json
+import logging
 import re
 
-async def log_page_view_to_db(data: dict):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Simple User Agent parsing
-    ua = data.get("user_agent", "")
+logger = logging.getLogger(__name__)
+
+# Columns exposed by the raw export, per table (id first: it drives keyset pagination)
+EXPORT_COLUMNS = {
+    "page_views": ["id", "url", "referrer", "user_agent", "ip_address", "country", "device_type", "os", "timestamp"],
+    "searches": ["id", "query", "origin", "destination", "user_agent", "timestamp"],
+    "events": ["id", "event_name", "event_data", "url", "user_agent", "timestamp"],
+}
+EXPORT_CHUNK_SIZE = 1000
+# Row ids restart in every shard file, so exported rows are keyed by (shard, id)
+EXPORT_KEY_COLUMN = "shard"
+
+def _classify_user_agent(ua: str):
+    """Simple User Agent parsing into (device_type, os)."""
     os = "Unknown"
     device = "Desktop"
     
@@ -19,11 +33,12 @@ async def log_page_view_to_db(data: dict):
     elif "Linux" in ua: os = "Linux"
     elif "Android" in ua: os = "Android"
     elif "iOS" in ua or "iPhone" in ua: os = "iOS"
-        
-    cursor.execute("""
-        INSERT INTO page_views (url, referrer, user_agent, ip_address, country, device_type, os)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
+    return device, os
+
+def _page_view_row(data: dict) -> tuple:
+    ua = data.get("user_agent") or ""
+    device, os = _classify_user_agent(ua)
+    return (
         data.get("url"),
         data.get("referrer"),
         ua,
@@ -31,10 +46,39 @@ async def log_page_view_to_db(data: dict):
         data.get("country", "Unknown"),
         device,
         os
-    ))
+    )
+
+async def log_page_view_to_db(data: dict):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO page_views (url, referrer, user_agent, ip_address, country, device_type, os)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, _page_view_row(data))
     conn.commit()
     conn.close()
 
+async def log_batch_to_db(page_views: List[dict], events: List[dict]):
+    """Write a whole analytics batch (page views + events) in a single transaction."""
+    conn = get_db_connection()
+    try:
+        with conn:
+            if page_views:
+                conn.executemany("""
+                    INSERT INTO page_views (url, referrer, user_agent, ip_address, country, device_type, os)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [_page_view_row(data) for data in page_views])
+            if events:
+                conn.executemany("""
+                    INSERT INTO events (event_name, event_data, url, user_agent)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (e["event_name"], e.get("event_data"), e.get("url"), e.get("user_agent"))
+                    for e in events
+                ])
+    finally:
+        conn.close()
+
 async def log_search_to_db(query: str, origin: str, destination: str, user_agent: str):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -56,28 +100,29 @@ async def log_event_to_db(event_name: str, event_data: str, url: str, user_agent
     conn.commit()
     conn.close()
 
-async def get_dashboard_stats_service():
-    conn = get_db_connection()
+def _collect_shard_stats(conn, stats: dict):
+    """Accumulate mergeable partial aggregates from one database file into `stats`."""
     cursor = conn.cursor()
     
     # 1. Total Searches
-    total_searches = cursor.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+    stats["total_searches"] += cursor.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
     
     # 2. Active Users (Last 30 mins) - Approximation based on unique IPs or sessions
-    cursor.execute("SELECT COUNT(DISTINCT ip_address) FROM page_views WHERE timestamp >= datetime('now', '-30 minutes')")
-    active_users = cursor.fetchone()[0]
+    # Distinct IPs are collected as a set so they can be unioned across shards
+    cursor.execute("SELECT DISTINCT ip_address FROM page_views WHERE timestamp >= datetime('now', '-30 minutes') AND ip_address IS NOT NULL")
+    stats["active_ips"].update(row[0] for row in cursor.fetchall())
     
     # 3. Top Keywords (Destinations from searches)
-    cursor.execute("SELECT destination, COUNT(*) as count FROM searches WHERE destination IS NOT NULL GROUP BY destination ORDER BY count DESC LIMIT 5")
-    top_destinations = [{"name": row[0], "count": row[1]} for row in cursor.fetchall()]
+    cursor.execute("SELECT destination, COUNT(*) as count FROM searches WHERE destination IS NOT NULL GROUP BY destination")
+    stats["destinations"].update(dict(cursor.fetchall()))
 
     # 4. Device Breakdown
     cursor.execute("SELECT device_type, COUNT(*) as count FROM page_views GROUP BY device_type")
-    device_stats = [{"name": row[0], "value": row[1]} for row in cursor.fetchall()]
+    stats["devices"].update(dict(cursor.fetchall()))
     
     # 5. OS Breakdown
     cursor.execute("SELECT os, COUNT(*) as count FROM page_views GROUP BY os")
-    os_stats = [{"name": row[0], "value": row[1]} for row in cursor.fetchall()]
+    stats["os"].update(dict(cursor.fetchall()))
 
     # 6. Hourly Traffic (Last 24h)
     cursor.execute("""
@@ -85,28 +130,105 @@ async def get_dashboard_stats_service():
         FROM page_views 
         WHERE timestamp >= datetime('now', '-1 day') 
         GROUP BY hour
-        ORDER BY hour
     """)
-    traffic_data = [{"hour": row[0], "visits": row[1]} for row in cursor.fetchall()]
-    
-    traffic_data = [{"hour": row[0], "visits": row[1]} for row in cursor.fetchall()]
+    stats["hours"].update(dict(cursor.fetchall()))
 
     # 7. Top Events
     try:
-        cursor.execute("SELECT event_name, COUNT(*) as count FROM events GROUP BY event_name ORDER BY count DESC LIMIT 5")
-        top_events = [{"name": row[0], "count": row[1]} for row in cursor.fetchall()]
+        cursor.execute("SELECT event_name, COUNT(*) as count FROM events GROUP BY event_name")
+        stats["events"].update(dict(cursor.fetchall()))
     except Exception as e:
-        print(f"Error fetching top events: {e}")
-        top_events = []
+        logger.error("Error fetching top events: %s", e)
+
+async def get_dashboard_stats_service():
+    stats = {
+        "total_searches": 0,
+        "active_ips": set(),
+        "destinations": Counter(),
+        "devices": Counter(),
+        "os": Counter(),
+        "hours": Counter(),
+        "events": Counter(),
+    }
     
-    conn.close()
+    # In sharded mode every worker has its own file; merge the partials
+    for path in get_shard_paths():
+        conn = get_readonly_connection(path)
+        try:
+            _collect_shard_stats(conn, stats)
+        finally:
+            conn.close()
     
     return {
-        "total_searches": total_searches,
-        "active_users": active_users,
-        "top_keywords": top_destinations,
-        "device_stats": device_stats,
-        "os_stats": os_stats,
-        "traffic_data": traffic_data,
-        "top_events": top_events
+        "total_searches": stats["total_searches"],
+        "active_users": len(stats["active_ips"]),
+        "top_keywords": [{"name": name, "count": count} for name, count in stats["destinations"].most_common(5)],
+        "device_stats": [{"name": name, "value": value} for name, value in sorted(stats["devices"].items(), key=lambda kv: str(kv[0]))],
+        "os_stats": [{"name": name, "value": value} for name, value in sorted(stats["os"].items(), key=lambda kv: str(kv[0]))],
+        "traffic_data": [{"hour": hour, "visits": visits} for hour, visits in sorted(stats["hours"].items())],
+        "top_events": [{"name": name, "count": count} for name, count in stats["events"].most_common(5)]
     }
+
+def _to_sqlite_timestamp(value: Optional[datetime.datetime]) -> Optional[str]:
+    # Rows use CURRENT_TIMESTAMP, i.e. 'YYYY-MM-DD HH:MM:SS' in UTC
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+def iter_export_rows(
+    table: str,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[Tuple[str, list]]:
+    """
+    Yield (shard name, rows) for `table` in chunks using keyset pagination on id,
+    shard by shard. Each chunk is its own short read, so a long export never pins the WAL.
+    """
+    columns = EXPORT_COLUMNS[table]
+    where = ["id > ?"]
+    params = []
+    if start is not None:
+        where.append("timestamp >= ?")
+        params.append(_to_sqlite_timestamp(start))
+    if end is not None:
+        where.append("timestamp < ?")
+        params.append(_to_sqlite_timestamp(end))
+    sql = f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+
+    for path in get_shard_paths():
+        conn = get_readonly_connection(path)
+        try:
+            last_id = 0
+            while True:
+                rows = conn.execute(sql, (last_id, *params, chunk_size)).fetchall()
+                if not rows:
+                    break
+                yield path.stem, rows
+                last_id = rows[-1]["id"]
+        finally:
+            conn.close()
+
+def stream_export(
+    table: str,
+    fmt: str = "ndjson",
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None
+) -> Iterator[str]:
+    """Render an export as NDJSON or CSV text, one chunk of rows at a time."""
+    columns = [EXPORT_KEY_COLUMN, *EXPORT_COLUMNS[table]]
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        for shard, rows in iter_export_rows(table, start, end):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows((shard, *row) for row in rows)
+            yield buffer.getvalue()
+    else:
+        for shard, rows in iter_export_rows(table, start, end):
+            yield "".join(json.dumps(dict(zip(columns, (shard, *row)))) + "\n" for row in rows)
@@ -0,0 +1,133 @@
+"""
+Route and leg metrics computed from a plan's coordinates (instead of asking the model).
+
+All distances in a plan - origin to destination plus every consecutive pair of
+activities on each day - go through one vectorized haversine call. Durations are
+estimates: great-circle distance times a per-mode detour factor, divided by a
+typical door-to-door speed, plus fixed overhead (airport time for flights).
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# mode -> (detour factor over great-circle, average km/h, fixed overhead in minutes)
+TRAVEL_MODES = {
+    "flight": (1.0, 750.0, 30.0),
+    "drive": (1.3, 60.0, 0.0),
+    "train": (1.25, 65.0, 15.0),
+}
+# Legs between activities: walk below this distance, otherwise take a taxi/cab
+WALK_MAX_KM = 1.5
+LOCAL_MODES = {
+    "walk": (1.3, 4.5, 0.0),
+    "taxi": (1.4, 25.0, 5.0),
+}
+MAPS_TRAVEL_MODES = {"drive": "driving", "train": "transit"}
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distances (km) between arrays of points, element-wise."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def estimate_minutes(great_circle_km: np.ndarray, detour: float, speed_kmh: float, overhead_min: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(travel distance km, duration minutes) for a mode."""
+    distance = great_circle_km * detour
+    return distance, distance / speed_kmh * 60 + overhead_min
+
+def format_distance(km: float) -> str:
+    if km < 1:
+        return f"{round(km * 1000, -1):.0f} m"
+    return f"{km:,.0f} km" if km >= 10 else f"{km:.1f} km"
+
+def format_duration(minutes: float) -> str:
+    minutes = max(1, int(round(minutes)))
+    hours, minutes = divmod(minutes, 60)
+    if not hours:
+        return f"{minutes} min"
+    return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+
+def _point(coords) -> Optional[Tuple[float, float]]:
+    if coords is None or (coords.lat == 0 and coords.lng == 0):
+        return None
+    return coords.lat, coords.lng
+
+def maps_url(origin: Tuple[float, float], destination: Tuple[float, float], travel_mode: str) -> str:
+    url = (
+        "https://www.google.com/maps/dir/?api=1"
+        f"&origin={origin[0]:.6f},{origin[1]:.6f}&destination={destination[0]:.6f},{destination[1]:.6f}"
+    )
+    if travel_mode in MAPS_TRAVEL_MODES:
+        url += f"&travelmode={MAPS_TRAVEL_MODES[travel_mode]}"
+    return url
+
+def apply_route_metrics(trip_plan, travel_mode: Optional[str] = None):
+    """
+    Fill trip_plan.route_info (origin -> destination) and each day's legs
+    (consecutive activities) from coordinates. Pairs with missing coordinates are skipped;
+    without origin and destination coordinates the route is "Unknown".
+    """
+    from app.schemas import Leg, RouteInfo
+
+    travel_mode = travel_mode if travel_mode in TRAVEL_MODES else "flight"
+    # Pair 0 is the trip itself; the rest are (day, from, to) activity legs
+    starts: List[Tuple[float, float]] = []
+    ends: List[Tuple[float, float]] = []
+    legs: List[Tuple[int, int]] = []
+
+    origin, destination = _point(trip_plan.origin_coordinates), _point(trip_plan.coordinates)
+    has_route = origin is not None and destination is not None
+    if has_route:
+        starts.append(origin)
+        ends.append(destination)
+    for d, day in enumerate(trip_plan.itinerary):
+        points = [_point(activity.coordinates) for activity in day.activities]
+        for a in range(1, len(points)):
+            if points[a - 1] is not None and points[a] is not None:
+                starts.append(points[a - 1])
+                ends.append(points[a])
+                legs.append((d, a))
+
+    if not has_route:
+        # Never keep a model-written route: without both endpoints it can't be checked
+        trip_plan.route_info = RouteInfo(distance="Unknown", duration="Unknown")
+    if not starts:
+        return trip_plan
+
+    start, end = np.array(starts), np.array(ends)
+    great_circle = haversine_km(start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+
+    offset = 0
+    if has_route:
+        distance, minutes = estimate_minutes(great_circle[:1], *TRAVEL_MODES[travel_mode])
+        trip_plan.route_info = RouteInfo(
+            distance=format_distance(distance[0]),
+            duration=f"{format_duration(minutes[0])} {'drive' if travel_mode == 'drive' else travel_mode}",
+            map_url=maps_url(origin, destination, travel_mode),
+            mode=travel_mode,
+            distance_km=round(float(distance[0]), 1),
+            duration_minutes=int(round(minutes[0])),
+        )
+        offset = 1
+
+    if legs:
+        local = great_circle[offset:]
+        walk = local <= WALK_MAX_KM
+        walk_km, walk_min = estimate_minutes(local, *LOCAL_MODES["walk"])
+        taxi_km, taxi_min = estimate_minutes(local, *LOCAL_MODES["taxi"])
+        leg_km = np.where(walk, walk_km, taxi_km)
+        leg_min = np.where(walk, walk_min, taxi_min)
+        for day in trip_plan.itinerary:
+            day.legs = []
+        for i, (d, a) in enumerate(legs):
+            day = trip_plan.itinerary[d]
+            day.legs.append(Leg(
+                from_activity=day.activities[a - 1].activity,
+                to_activity=day.activities[a].activity,
+                mode="walk" if walk[i] else "taxi",
+                distance_km=round(float(leg_km[i]), 2),
+                duration_minutes=int(round(leg_min[i])),
+            ))
+    return trip_plan
@@ -0,0 +1,30 @@
+"""
+Per-key asyncio locks (one trip, one media key, ...).
+
+An entry counts the tasks holding or waiting on its lock and is dropped only when
+that count reaches zero, so a waiter and a newcomer always share the same lock.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List
+
+class KeyedLocks:
+    def __init__(self):
+        self._entries: Dict[Hashable, List] = {}  # key -> [lock, holders + waiters]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._entries[key]
@@ -0,0 +1,227 @@
+"""
+On-disk cache behind the optional /media/{key} proxy.
+
+- A *source* is a provider URL we have handed out as a proxy URL. Its key is
+  the URL itself (base64url) signed with an HMAC, so the proxy only ever fetches
+  URLs that media_service produced (it is not an open proxy), and any key can be
+  refilled from upstream even after its cache entry or index.db is gone.
+- A *blob* is the fetched bytes, stored content-addressed as blobs/ab/<sha256>.
+  Sources that resolve to identical bytes share one file.
+- When the cache grows past MEDIA_CACHE_MAX_BYTES, the least recently served
+  blobs are evicted; their sources are re-fetched on the next request.
+
+Configuration (environment):
+    MEDIA_CACHE_DIR=/var/cache/weekendt-media   (default: app/media_cache)
+    MEDIA_CACHE_MAX_BYTES=2147483648            (2 GB)
+    MEDIA_MAX_ASSET_BYTES=209715200             (largest single asset, 200 MB)
+    MEDIA_PROXY_SECRET=...                      (key signing secret; default: a random
+                                                 one kept in MEDIA_CACHE_DIR/secret)
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from app.services.keyed_locks import KeyedLocks
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MEDIA_CACHE_DIR = Path(os.environ.get("MEDIA_CACHE_DIR", BASE_DIR / "media_cache"))
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get("MEDIA_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+MEDIA_MAX_ASSET_BYTES = int(os.environ.get("MEDIA_MAX_ASSET_BYTES", 200 * 1024 ** 2))
+MEDIA_PROXY_SECRET = os.environ.get("MEDIA_PROXY_SECRET", "")
+SIGNATURE_BYTES = 12
+FETCH_TIMEOUT_SECONDS = 30.0
+# last_access is only rewritten when older than this, so hot hits stay read-only
+ACCESS_RESOLUTION_SECONDS = 60
+
+_initialized = False
+_secret: Optional[bytes] = None
+_fetch_locks = KeyedLocks()
+
+def _signing_secret() -> bytes:
+    """MEDIA_PROXY_SECRET, else a random secret shared by every worker through the cache dir."""
+    global _secret
+    if _secret is None:
+        if MEDIA_PROXY_SECRET:
+            _secret = MEDIA_PROXY_SECRET.encode("utf-8")
+        else:
+            MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            path = MEDIA_CACHE_DIR / "secret"
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            except FileExistsError:
+                _secret = path.read_bytes()
+            else:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(os.urandom(32))
+                _secret = path.read_bytes()
+    return _secret
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_signing_secret(), payload.encode("ascii"), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+def source_key(url: str) -> str:
+    """`<signature>.<base64url of the URL>`: names the URL and proves we issued it."""
+    payload = _b64encode(url.encode("utf-8"))
+    return f"{_sign(payload)}.{payload}"
+
+def source_url(key: str) -> Optional[str]:
+    """The URL a key was issued for, or None if the signature doesn't match."""
+    signature, _, payload = key.partition(".")
+    if not payload or not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        return _b64decode(payload).decode("utf-8")
+    except ValueError:
+        return None
+
+def blob_path(digest: str) -> Path:
+    return MEDIA_CACHE_DIR / "blobs" / digest[:2] / digest
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    if not _initialized:
+        MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(MEDIA_CACHE_DIR / "index.db", timeout=10)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS sources (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                digest TEXT
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs(last_access);
+        ''')
+        conn.commit()
+        _initialized = True
+    return conn
+
+def source_keys(urls: Iterable[str]) -> Dict[str, str]:
+    """Proxy keys for provider URLs. Returns {url: key}."""
+    return {url: source_key(url) for url in urls}
+
+def lookup(key: str) -> Optional[Tuple[str, Optional[Path], Optional[str], Optional[str]]]:
+    """(url, blob path or None if not cached, digest, content type) for a key, or None if unknown."""
+    signed_url = source_url(key)
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT s.url, s.digest, b.content_type, b.last_access FROM sources s "
+            "LEFT JOIN blobs b ON b.digest = s.digest WHERE s.key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            # Never fetched here (or index.db was reset): the key itself names the URL
+            return (signed_url, None, None, None) if signed_url else None
+        url, digest, content_type, last_access = row
+        if last_access is None:
+            return url, None, None, None
+        path = blob_path(digest)
+        if not path.exists():
+            return url, None, None, None
+        now = time.time()
+        if now - last_access > ACCESS_RESOLUTION_SECONDS:
+            conn.execute("UPDATE blobs SET last_access = ? WHERE digest = ?", (now, digest))
+            conn.commit()
+        return url, path, digest, content_type
+    finally:
+        conn.close()
+
+def _store(key: str, url: str, tmp_path: Path, digest: str, size: int, content_type: str) -> Path:
+    path = blob_path(digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_path, path)
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO blobs (digest, size, content_type, last_access) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(digest) DO UPDATE SET last_access = excluded.last_access",
+            (digest, size, content_type, time.time())
+        )
+        conn.execute(
+            "INSERT INTO sources (key, url, digest) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET digest = excluded.digest",
+            (key, url, digest)
+        )
+        conn.commit()
+        _evict(conn)
+    finally:
+        conn.close()
+    return path
+
+def _evict(conn: sqlite3.Connection):
+    """Drop least recently served blobs until the cache fits MEDIA_CACHE_MAX_BYTES."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+    if total <= MEDIA_CACHE_MAX_BYTES:
+        return
+    evicted = []
+    for digest, size in conn.execute("SELECT digest, size FROM blobs ORDER BY last_access"):
+        if total <= MEDIA_CACHE_MAX_BYTES:
+            break
+        evicted.append(digest)
+        total -= size
+    conn.executemany("DELETE FROM blobs WHERE digest = ?", [(d,) for d in evicted])
+    conn.commit()
+    for digest in evicted:
+        try:
+            blob_path(digest).unlink()
+        except FileNotFoundError:
+            pass
+    logger.info("Media cache: evicted %d blobs", len(evicted))
+
+async def fetch_and_store(key: str, url: str) -> Tuple[Path, str, str]:
+    """Download `url` into the cache. Returns (path, digest, content type)."""
+    async with _fetch_locks.hold(key):
+        # Another request may have fetched it while we waited
+        cached = await run_in_threadpool(lookup, key)
+        if cached and cached[1] is not None:
+            return cached[1], cached[2], cached[3]
+
+        tmp_dir = MEDIA_CACHE_DIR / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=tmp_dir)
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async with httpx.AsyncClient(follow_redirects=True) as client:
+                    async with client.stream("GET", url, timeout=FETCH_TIMEOUT_SECONDS) as response:
+                        response.raise_for_status()
+                        content_type = response.headers.get("content-type", "application/octet-stream")
+                        async for chunk in response.aiter_bytes():
+                            size += len(chunk)
+                            if size > MEDIA_MAX_ASSET_BYTES:
+                                raise ValueError(f"Asset larger than {MEDIA_MAX_ASSET_BYTES} bytes")
+                            sha.update(chunk)
+                            out.write(chunk)
+            digest = sha.hexdigest()
+            path = await run_in_threadpool(_store, key, url, tmp_path, digest, size, content_type)
+            return path, digest, content_type
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
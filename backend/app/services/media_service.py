@@ -1,8 +1,12 @@
 import httpx
+import logging
 import os
 import random
+from contextvars import ContextVar
 from typing import List, Optional, Dict
 
+logger = logging.getLogger(__name__)
+
 PIXABAY_API_KEY = os.environ.get("PIXABAY_API_KEY")
 PEXELS_API_KEY = os.environ.get("PEXELS_API_KEY")
 UNSPLASH_ACCESS_KEY = os.environ.get("UNSPLASH_ACCESS_KEY")
@@ -11,6 +15,19 @@ PIXABAY_BASE_URL = "https://pixabay.com/api/"
 PEXELS_BASE_URL = "https://api.pexels.com/v1/"
 UNSPLASH_BASE_URL = "https://api.unsplash.com/"
 
+# Optional local proxy (see app/services/media_cache.py): hand out /media/{key}
+# URLs instead of provider CDN URLs. MEDIA_PROXY_BASE_URL is the public prefix the
+# frontend can reach, e.g. https://api.example.com/media; unset, it is the origin
+# the current request came in on (MediaProxyBaseMiddleware) plus /media; behind a
+# TLS-terminating proxy that uvicorn doesn't trust for X-Forwarded-Proto, set it.
+MEDIA_PROXY_ENABLED = os.getenv("MEDIA_PROXY_ENABLED", "false").lower() in ("1", "true", "yes")
+MEDIA_PROXY_BASE_URL = os.getenv("MEDIA_PROXY_BASE_URL", "").rstrip("/")
+_request_origin: ContextVar[Optional[str]] = ContextVar("media_request_origin", default=None)
+
+# Widest CSS sizes images are rendered at (TripResult: attraction cards, itinerary thumbnails)
+CARD_MAX_CSS_WIDTH = 640
+THUMBNAIL_CSS_WIDTH = 96
+
 # Robust Static Fallbacks for when APIs fail
 STATIC_FALLBACK_IMAGES = [
     {"url": "https://images.unsplash.com/photo-1476514525535-07fb3b4ae5f1", "credit": "Unsplash", "source": "Static"},
@@ -26,7 +43,197 @@ STATIC_FALLBACK_VIDEOS = [
     {"url": "https://videos.pexels.com/video-files/2169880/2169880-hd_1920_1080_30fps.mp4", "credit": "Pexels", "source": "Pexels"}
 ]
 
-async def fetch_from_pexels(query: str, type: str = "photos", per_page: int = 3) -> List[Dict[str, str]]:
+# Responsive image variants: every size a provider returns, as [{"url", "width"}] ascending
+
+def _renditions(candidates) -> List[Dict]:
+    by_width = {}
+    for url, width in candidates:
+        if url and width:
+            by_width.setdefault(int(width), url)
+    return [{"url": url, "width": width} for width, url in sorted(by_width.items())]
+
+def pexels_photo_renditions(photo: dict) -> List[Dict]:
+    src = photo.get("src", {})
+    width, height = photo.get("width") or 0, photo.get("height") or 0
+    aspect = width / height if width and height else 1.5
+    # Pexels sizes are bounding boxes (see API docs); derive the rendered widths
+    large = min(940, round(650 * aspect))
+    return _renditions([
+        (src.get("tiny"), 280),
+        (src.get("small"), round(130 * aspect)),
+        (src.get("medium"), round(350 * aspect)),
+        (src.get("large"), large),
+        (src.get("large2x"), large * 2),
+        (src.get("original"), width),
+    ])
+
+def unsplash_photo_renditions(result: dict) -> List[Dict]:
+    urls = result.get("urls", {})
+    return _renditions([
+        (urls.get("thumb"), 200),
+        (urls.get("small"), 400),
+        (urls.get("regular"), 1080),
+        (urls.get("full"), result.get("width")),
+    ])
+
+def pixabay_photo_renditions(hit: dict) -> List[Dict]:
+    return _renditions([
+        (hit.get("previewURL"), hit.get("previewWidth")),
+        (hit.get("webformatURL"), hit.get("webformatWidth")),
+        (hit.get("largeImageURL"), min(1280, hit.get("imageWidth") or 1280)),
+    ])
+
+def pick_rendition(renditions, target_width: float) -> Optional[str]:
+    """Smallest rendition at least `target_width` px wide (else the largest)."""
+    if not renditions:
+        return None
+    ordered = sorted(renditions, key=lambda r: r.width)
+    for rendition in ordered:
+        if rendition.width >= target_width:
+            return rendition.url
+    return ordered[-1].url
+
+def select_plan_images(trip_plan, viewport_width: int, dpr: float = 1.0):
+    """
+    Point image_url / hero_image of a plan at the rendition that fits the client's
+    display: the hero spans the viewport, attraction cards are at most
+    CARD_MAX_CSS_WIDTH wide and itinerary activities are thumbnails.
+    """
+    dpr = min(max(dpr, 1.0), 3.0)
+    card_width = min(viewport_width, CARD_MAX_CSS_WIDTH) * dpr
+
+    if trip_plan.hero_image_srcset:
+        trip_plan.hero_image = pick_rendition(trip_plan.hero_image_srcset, viewport_width * dpr) or trip_plan.hero_image
+    for day in trip_plan.itinerary:
+        for activity in day.activities:
+            if activity.image_srcset:
+                activity.image_url = pick_rendition(activity.image_srcset, THUMBNAIL_CSS_WIDTH * dpr) or activity.image_url
+    if trip_plan.destination_info and trip_plan.destination_info.top_attractions:
+        for attraction in trip_plan.destination_info.top_attractions:
+            if attraction.image_srcset:
+                attraction.image_url = pick_rendition(attraction.image_srcset, card_width) or attraction.image_url
+
+# Video ladders: [{"url", "width", "height", "fps"}] ascending by width
+
+# Widest rendition served for each quality level
+VIDEO_QUALITY_MAX_WIDTH = {"low": 640, "medium": 1280, "high": 1920}
+# 720p when the client gives no hints: plays everywhere without a 1080p/4K download
+DEFAULT_VIDEO_QUALITY = "medium"
+
+def _video_ladder(files) -> List[Dict]:
+    by_width = {}
+    for f in files:
+        if f.get("url") and f.get("width"):
+            # Keep the higher frame rate when a provider lists the same width twice
+            current = by_width.get(f["width"])
+            if current is None or (f.get("fps") or 0) > (current.get("fps") or 0):
+                by_width[f["width"]] = f
+    return [by_width[width] for width in sorted(by_width)]
+
+def pexels_video_renditions(vid: dict) -> List[Dict]:
+    # HLS entries have no width; progressive MP4s only
+    return _video_ladder(
+        {"url": f.get("link"), "width": f.get("width"), "height": f.get("height"), "fps": f.get("fps")}
+        for f in vid.get("video_files", [])
+        if f.get("file_type", "video/mp4") == "video/mp4"
+    )
+
+def pixabay_video_renditions(hit: dict) -> List[Dict]:
+    # tiny/small/medium/large; sizes Pixabay doesn't have come back with an empty url
+    return _video_ladder(
+        {"url": f.get("url"), "width": f.get("width"), "height": f.get("height"), "fps": None}
+        for f in hit.get("videos", {}).values()
+    )
+
+def pixabay_video_poster(hit: dict) -> Optional[str]:
+    for size in ("medium", "large", "small", "tiny"):
+        thumbnail = hit.get("videos", {}).get(size, {}).get("thumbnail")
+        if thumbnail:
+            return thumbnail
+    if hit.get("picture_id"):
+        return f"https://i.vimeocdn.com/video/{hit['picture_id']}_640x360.jpg"
+    return None
+
+def pick_video_rendition(renditions: List[Dict], quality: str = DEFAULT_VIDEO_QUALITY) -> Optional[str]:
+    """Widest rendition allowed at `quality` (the smallest one if all are wider)."""
+    if not renditions:
+        return None
+    max_width = VIDEO_QUALITY_MAX_WIDTH[quality]
+    ordered = sorted(renditions, key=lambda r: r["width"])
+    fitting = [r for r in ordered if r["width"] <= max_width]
+    return (fitting[-1] if fitting else ordered[0])["url"]
+
+def select_video_quality(videos: List[Dict], quality: str) -> List[Dict]:
+    """Copies of `videos` pointing at the rendition for `quality`."""
+    selected = []
+    for video in videos:
+        url = pick_video_rendition(video.get("renditions"), quality)
+        selected.append({**video, "url": url} if url else video)
+    return selected
+
+def select_plan_video(trip_plan, quality: str):
+    """Point hero_video at the rendition for `quality`."""
+    if trip_plan.hero_video_renditions:
+        renditions = [r.dict() for r in trip_plan.hero_video_renditions]
+        trip_plan.hero_video = pick_video_rendition(renditions, quality) or trip_plan.hero_video
+
+class MediaProxyBaseMiddleware:
+    """Plain ASGI middleware: remember the request's origin so proxy URLs can be absolute."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        from starlette.requests import Request
+        token = _request_origin.set(str(Request(scope).base_url).rstrip("/"))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_origin.reset(token)
+
+def media_proxy_base_url() -> str:
+    if MEDIA_PROXY_BASE_URL:
+        return MEDIA_PROXY_BASE_URL
+    return f"{_request_origin.get() or ''}/media"
+
+async def proxy_media_urls(results: List[Dict]) -> List[Dict]:
+    """Rewrite url/poster/rendition URLs of media results to the local proxy (if enabled)."""
+    if not MEDIA_PROXY_ENABLED or not results:
+        return results
+    from starlette.concurrency import run_in_threadpool
+    from app.services.media_cache import source_keys
+
+    urls = set()
+    for item in results:
+        urls.add(item["url"])
+        if item.get("poster"):
+            urls.add(item["poster"])
+        urls.update(r["url"] for r in item.get("renditions", []))
+    try:
+        # Off the loop: the first call may create the signing secret on disk
+        keys = await run_in_threadpool(source_keys, urls)
+    except Exception as e:
+        logger.warning("Media proxy unavailable, serving provider URLs: %s", e)
+        return results
+
+    base_url = media_proxy_base_url()
+
+    def proxied(url):
+        return f"{base_url}/{keys[url]}"
+
+    rewritten = []
+    for item in results:
+        item = {**item, "url": proxied(item["url"])}
+        if item.get("poster"):
+            item["poster"] = proxied(item["poster"])
+        if item.get("renditions"):
+            item["renditions"] = [{**r, "url": proxied(r["url"])} for r in item["renditions"]]
+        rewritten.append(item)
+    return rewritten
+
+async def fetch_from_pexels(query: str, type: str = "photos", per_page: int = 3, timeout: float = 5.0) -> List[Dict[str, str]]:
     """Fetch media from Pexels (best quality)."""
     if not PEXELS_API_KEY:
         return []
@@ -38,7 +245,7 @@ async def fetch_from_pexels(query: str, type: str = "photos", per_page: int = 3)
                 f"{PEXELS_BASE_URL}{endpoint}",
                 headers={"Authorization": PEXELS_API_KEY},
                 params={"query": query, "per_page": per_page, "orientation": "landscape"},
-                timeout=5.0
+                timeout=timeout
             )
             data = response.json()
             
@@ -48,39 +255,26 @@ async def fetch_from_pexels(query: str, type: str = "photos", per_page: int = 3)
                     results.append({
                         "url": photo["src"]["large2x"],
                         "credit": photo["photographer"],
-                        "source": "Pexels"
+                        "source": "Pexels",
+                        "renditions": pexels_photo_renditions(photo)
                     })
             else:
                 for vid in data.get("videos", []):
-                     # Smart Selection: Prioritize HD (1080p/720p) over 4K for better streaming
-                     video_files = vid.get("video_files", [])
-                     
-                     # 1. Try to find 1080p or 720p (Width between 1280 and 1920)
-                     hd_files = [v for v in video_files if 1280 <= v["width"] <= 1920]
-                     
-                     selected_file = None
-                     if hd_files:
-                         # Sort by size to get the highest bitrate/quality within HD range
-                         hd_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
-                         selected_file = hd_files[0]
-                     elif video_files:
-                         # Fallback: If no HD found, unfortunately take the largest available (likely SD or UHD)
-                         # We sort to avoid picking tiny previews
-                         video_files.sort(key=lambda x: x["width"] * x["height"], reverse=True)
-                         selected_file = video_files[0]
-                         
-                     if selected_file:
+                     renditions = pexels_video_renditions(vid)
+                     if renditions:
                          results.append({
-                             "url": selected_file["link"],
+                             "url": pick_video_rendition(renditions),
                              "credit": vid["user"]["name"],
-                             "source": "Pexels"
+                             "source": "Pexels",
+                             "poster": vid.get("image"),
+                             "renditions": renditions
                          })
             return results
     except Exception as e:
-        print(f"Error fetching from Pexels for {query}: {e}")
+        logger.warning("Error fetching from Pexels for %s: %s", query, e)
         return []
 
-async def fetch_from_unsplash(query: str, per_page: int = 3) -> List[Dict[str, str]]:
+async def fetch_from_unsplash(query: str, per_page: int = 3, timeout: float = 5.0) -> List[Dict[str, str]]:
     """Fetch high-quality photos from Unsplash."""
     if not UNSPLASH_ACCESS_KEY:
         return []
@@ -91,7 +285,7 @@ async def fetch_from_unsplash(query: str, per_page: int = 3) -> List[Dict[str, s
                 f"{UNSPLASH_BASE_URL}search/photos",
                 headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"},
                 params={"query": query, "per_page": per_page, "orientation": "landscape"},
-                timeout=5.0
+                timeout=timeout
             )
             data = response.json()
             results = []
@@ -99,14 +293,15 @@ async def fetch_from_unsplash(query: str, per_page: int = 3) -> List[Dict[str, s
                 results.append({
                     "url": result["urls"]["regular"],
                     "credit": result["user"]["name"],
-                    "source": "Unsplash"
+                    "source": "Unsplash",
+                    "renditions": unsplash_photo_renditions(result)
                 })
             return results
     except Exception as e:
-        print(f"Error fetching from Unsplash for {query}: {e}")
+        logger.warning("Error fetching from Unsplash for %s: %s", query, e)
         return []
 
-async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3) -> List[Dict[str, str]]:
+async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3, timeout: float = 5.0) -> List[Dict[str, str]]:
     """Fetch from Pixabay (Fallback)."""
     if not PIXABAY_API_KEY:
         return []
@@ -120,7 +315,7 @@ async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3)
                     params={
                         "key": PIXABAY_API_KEY, "q": query, "image_type": "photo",
                         "orientation": "horizontal", "per_page": per_page, "safesearch": "true"
-                    }, timeout=5.0
+                    }, timeout=timeout
                 )
                 data = response.json()
                 results = []
@@ -128,7 +323,8 @@ async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3)
                     results.append({
                         "url": hit["webformatURL"],
                         "credit": hit["user"],
-                        "source": "Pixabay"
+                        "source": "Pixabay",
+                        "renditions": pixabay_photo_renditions(hit)
                     })
                 return results
             
@@ -138,53 +334,57 @@ async def fetch_from_pixabay(query: str, type: str = "photo", per_page: int = 3)
                     f"{PIXABAY_BASE_URL}videos/",
                     params={
                         "key": PIXABAY_API_KEY, "q": query, "per_page": per_page, "safesearch": "true"
-                    }, timeout=5.0
+                    }, timeout=timeout
                 )
                  data = response.json()
                  results = []
                  for hit in data.get("hits", []):
-                     if "videos" in hit:
-                         video_url = None
-                         if "medium" in hit["videos"]: video_url = hit["videos"]["medium"]["url"]
-                         elif "large" in hit["videos"]: video_url = hit["videos"]["large"]["url"]
-                         
-                         if video_url:
-                             results.append({
-                                 "url": video_url,
-                                 "credit": hit["user"],
-                                 "source": "Pixabay"
-                             })
+                     renditions = pixabay_video_renditions(hit)
+                     if renditions:
+                         results.append({
+                             "url": pick_video_rendition(renditions),
+                             "credit": hit["user"],
+                             "source": "Pixabay",
+                             "poster": pixabay_video_poster(hit),
+                             "renditions": renditions
+                         })
                  return results
 
     except Exception as e:
-        print(f"Error fetching from Pixabay for {query}: {e}")
+        logger.warning("Error fetching from Pixabay for %s: %s", query, e)
         return []
 
-async def fetch_destination_images(query: str, per_page: int = 3) -> List[Dict[str, str]]:
+async def fetch_destination_images(query: str, per_page: int = 3, timeout: float = 5.0) -> List[Dict[str, str]]:
     """Aggegated Image Fetcher: Pexels -> Unsplash -> Pixabay"""
+    return await proxy_media_urls(await _fetch_destination_images(query, per_page, timeout))
+
+async def _fetch_destination_images(query: str, per_page: int, timeout: float) -> List[Dict[str, str]]:
     # 1. Try Pexels (Best Quality)
-    images = await fetch_from_pexels(query, type="photos", per_page=per_page)
+    images = await fetch_from_pexels(query, type="photos", per_page=per_page, timeout=timeout)
     if images: return images
     
     # 2. Try Unsplash (Great Quality)
-    images = await fetch_from_unsplash(query, per_page=per_page)
+    images = await fetch_from_unsplash(query, per_page=per_page, timeout=timeout)
     if images: return images
     
     # 3. Fallback to Pixabay
-    pixabay_results = await fetch_from_pixabay(query, type="photo", per_page=per_page)
+    pixabay_results = await fetch_from_pixabay(query, type="photo", per_page=per_page, timeout=timeout)
     if pixabay_results: return pixabay_results
 
     # 4. Ultimate Fallback: Static Images
     return [random.choice(STATIC_FALLBACK_IMAGES)]
 
-async def fetch_destination_videos(query: str, per_page: int = 3) -> List[Dict[str, str]]:
+async def fetch_destination_videos(query: str, per_page: int = 3, timeout: float = 5.0) -> List[Dict[str, str]]:
     """Aggregated Video Fetcher: Pexels -> Pixabay"""
+    return await proxy_media_urls(await _fetch_destination_videos(query, per_page, timeout))
+
+async def _fetch_destination_videos(query: str, per_page: int, timeout: float) -> List[Dict[str, str]]:
     # 1. Try Pexels (Best Quality)
-    videos = await fetch_from_pexels(query, type="videos", per_page=per_page)
+    videos = await fetch_from_pexels(query, type="videos", per_page=per_page, timeout=timeout)
     if videos: return videos
     
     # 2. Fallback to Pixabay
-    pixabay_results = await fetch_from_pixabay(query, type="video", per_page=per_page)
+    pixabay_results = await fetch_from_pixabay(query, type="video", per_page=per_page, timeout=timeout)
     if pixabay_results: return pixabay_results
 
     # 3. Ultimate Fallback: Static Videos
@@ -0,0 +1,172 @@
+"""
+In-process spatial index over every place mentioned in saved trips.
+
+Points (activities, attractions, hotels, destinations) are deduplicated by name
+and proximity and kept in parallel arrays; a fixed-size lat/lng grid (a geohash
+at constant precision) maps each cell to the point ids inside it. A radius query
+only scans the cells overlapping the query's bounding box, so lookups stay in
+the microsecond range regardless of how many trips are stored.
+"""
+import math
+import re
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+# Grid cell edge in degrees (~5.5 km of latitude)
+CELL_DEGREES = 0.05
+# Same name within this distance is the same place
+DEDUP_KM = 0.3
+MAX_RADIUS_KM = 50.0
+PLACE_KINDS = ("destination", "activity", "attraction", "hotel")
+
+NAME_RE = re.compile(r"[^a-z0-9]+")
+
+def normalize_name(name: str) -> str:
+    return NAME_RE.sub(" ", name.lower()).strip()
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def _cell(lat: float, lng: float) -> Tuple[int, int]:
+    return math.floor(lat / CELL_DEGREES), math.floor(lng / CELL_DEGREES)
+
+def _coords(item: Optional[dict]) -> Optional[Tuple[float, float]]:
+    coords = (item or {}).get("coordinates") or {}
+    lat, lng = coords.get("lat"), coords.get("lng")
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    if lat == 0 and lng == 0:  # the model's placeholder for "unknown"
+        return None
+    return float(lat), float(lng)
+
+def extract_places(plan: dict) -> Iterator[Tuple[str, str, float, float, Optional[str]]]:
+    """(name, kind, lat, lng, image_url) for every located place in a trip plan."""
+    if _coords(plan):
+        yield (plan.get("destination") or "", "destination", *_coords(plan), plan.get("hero_image"))
+    for day in plan.get("itinerary") or []:
+        for activity in day.get("activities") or []:
+            if _coords(activity):
+                yield (activity.get("activity") or "", "activity", *_coords(activity), activity.get("image_url"))
+    for hotel in plan.get("hotels") or []:
+        if _coords(hotel):
+            yield (hotel.get("name") or "", "hotel", *_coords(hotel), None)
+    for field in ("origin_info", "destination_info"):
+        info = plan.get(field) or {}
+        for attraction in info.get("top_attractions") or []:
+            if _coords(attraction):
+                yield (attraction.get("name") or "", "attraction", *_coords(attraction), attraction.get("image_url"))
+        for hotel in info.get("hotels") or []:
+            if _coords(hotel):
+                yield (hotel.get("name") or "", "hotel", *_coords(hotel), None)
+
+class PlaceIndex:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.lats = array("d")
+        self.lngs = array("d")
+        self.kinds = array("b")
+        self.mentions = array("I")
+        self.names: List[str] = []
+        self.keys: List[str] = []
+        self.images: List[Optional[str]] = []
+        self.cells: Dict[Tuple[int, int], array] = defaultdict(lambda: array("I"))
+        self.destinations: Dict[str, int] = {}  # normalized destination name -> place id
+        self.built = False
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str, kind: str, lat: float, lng: float, image_url: Optional[str] = None) -> int:
+        """Insert a place (or merge it into an existing one nearby). Returns its id."""
+        key = normalize_name(name)
+        if not key:
+            return -1
+        cell = _cell(lat, lng)
+        for place_id in self._ids_near(lat, lng, DEDUP_KM):
+            if self.keys[place_id] == key and haversine_km(lat, lng, self.lats[place_id], self.lngs[place_id]) <= DEDUP_KM:
+                self.mentions[place_id] += 1
+                if image_url and not self.images[place_id]:
+                    self.images[place_id] = image_url
+                return place_id
+
+        place_id = len(self.names)
+        self.lats.append(lat)
+        self.lngs.append(lng)
+        self.kinds.append(PLACE_KINDS.index(kind))
+        self.mentions.append(1)
+        self.names.append(name.strip())
+        self.keys.append(key)
+        self.images.append(image_url)
+        self.cells[cell].append(place_id)
+        if kind == "destination":
+            self.destinations.setdefault(key, place_id)
+        return place_id
+
+    def add_plan(self, plan: dict):
+        for place in extract_places(plan):
+            self.add(*place)
+
+    def covers(self, destination: str, min_places: int = 10, radius_km: float = 15.0) -> bool:
+        """Whether we already know at least `min_places` places around a destination."""
+        place_id = self.destinations.get(normalize_name(destination or ""))
+        if place_id is None:
+            return False
+        lat, lng = self.lats[place_id], self.lngs[place_id]
+        return len(self.nearby(lat, lng, radius_km, limit=min_places + 1)) > min_places
+
+    def _ids_near(self, lat: float, lng: float, radius_km: float) -> Iterator[int]:
+        """Ids of points in every grid cell overlapping the radius' bounding box."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlng = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        row_min, col_min = _cell(lat - dlat, lng - dlng)
+        row_max, col_max = _cell(lat + dlat, lng + dlng)
+        for row in range(row_min, row_max + 1):
+            for col in range(col_min, col_max + 1):
+                ids = self.cells.get((row, col))
+                if ids:
+                    yield from ids
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float = 2.0,
+        limit: int = 20,
+        kind: Optional[str] = None,
+        exclude: Optional[str] = None
+    ) -> List[dict]:
+        """Places within `radius_km`, nearest first."""
+        radius_km = min(radius_km, MAX_RADIUS_KM)
+        kind_code = PLACE_KINDS.index(kind) if kind else None
+        exclude_key = normalize_name(exclude) if exclude else None
+        hits = []
+        for place_id in self._ids_near(lat, lng, radius_km):
+            if kind_code is not None and self.kinds[place_id] != kind_code:
+                continue
+            if exclude_key and self.keys[place_id] == exclude_key:
+                continue
+            distance = haversine_km(lat, lng, self.lats[place_id], self.lngs[place_id])
+            if distance <= radius_km:
+                hits.append((distance, place_id))
+        hits.sort()
+        return [
+            {
+                "name": self.names[place_id],
+                "kind": PLACE_KINDS[self.kinds[place_id]],
+                "lat": self.lats[place_id],
+                "lng": self.lngs[place_id],
+                "image_url": self.images[place_id],
+                "mentions": self.mentions[place_id],
+                "distance_km": round(distance, 3),
+            }
+            for distance, place_id in hits[:limit]
+        ]
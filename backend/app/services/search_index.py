@@ -0,0 +1,92 @@
+"""
+In-process inverted index over saved trips.
+
+Fallback for deployments where the Mongo text index is unavailable. Mirrors the
+text index: same fields, same weights, any-term matching ranked by score.
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+# Keep in sync with the weights of the "trip_text" Mongo index
+FIELD_WEIGHTS = {
+    "destination": 10,
+    "origin": 3,
+    "activity": 1,
+}
+FACET_FIELDS = ("days", "currency", "origin")
+
+STOPWORDS = {"a", "an", "and", "at", "by", "for", "in", "of", "on", "the", "to", "trip", "trips", "with"}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+def searchable_fields(doc: dict) -> Dict[str, List[str]]:
+    """Text per weighted field for a trip document (raw or summary-projected)."""
+    plan = doc.get("trip_plan") or {}
+    activities = [
+        activity.get("activity")
+        for day in plan.get("itinerary") or []
+        for activity in day.get("activities") or []
+    ]
+    return {
+        "destination": [doc.get("destination")],
+        "origin": [doc.get("origin")],
+        "activity": activities,
+    }
+
+class TripSearchIndex:
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # token -> {trip_id: weight}
+        self.tokens: Dict[str, List[str]] = {}  # trip_id -> tokens (for removal)
+        self.docs: Dict[str, dict] = {}  # trip_id -> listing summary + facet values
+        self.built = False
+
+    def add(self, trip_id: str, doc: dict, summary: dict):
+        self.remove(trip_id)
+        weights = Counter()
+        for field, texts in searchable_fields(doc).items():
+            for text in texts:
+                for token in tokenize(text):
+                    weights[token] += FIELD_WEIGHTS[field]
+        for token, weight in weights.items():
+            self.postings[token][trip_id] = weight
+        self.tokens[trip_id] = list(weights)
+        self.docs[trip_id] = summary
+
+    def remove(self, trip_id: str):
+        for token in self.tokens.pop(trip_id, []):
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(trip_id, None)
+                if not posting:
+                    del self.postings[token]
+        self.docs.pop(trip_id, None)
+
+    def clear(self):
+        self.postings.clear()
+        self.tokens.clear()
+        self.docs.clear()
+        self.built = False
+
+    def search(self, query: str, filters: dict, limit: int) -> dict:
+        scores = Counter()
+        for token in set(tokenize(query)):
+            for trip_id, weight in self.postings.get(token, {}).items():
+                scores[trip_id] += weight
+
+        matches = [
+            trip_id for trip_id in scores
+            if all(self.docs[trip_id].get(field) == value for field, value in filters.items())
+        ]
+        facets = {}
+        for field in FACET_FIELDS:
+            counts = Counter(self.docs[trip_id].get(field) for trip_id in matches)
+            facets[field] = [{"value": value, "count": count} for value, count in counts.most_common()]
+
+        matches.sort(key=lambda trip_id: (-scores[trip_id], trip_id))
+        results = [{**self.docs[trip_id], "score": scores[trip_id]} for trip_id in matches[:limit]]
+        return {"results": results, "total": len(matches), "facets": facets}
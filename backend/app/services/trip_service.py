@@ -1,15 +1,224 @@
 from app.config.database import get_database
 from app.models.trip import TripDB, SearchHistoryDB
+from app.services.trip_storage import pack_trip_document, unpack_trip, unpack_trips
+from app.services.search_index import TripSearchIndex, FIELD_WEIGHTS
+from app.services.place_index import PlaceIndex
+from app.services.write_buffer import get_append_buffer
+from app.services.keyed_locks import KeyedLocks
 from bson import ObjectId
-from typing import List, Optional
+from pymongo.errors import OperationFailure
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from collections import OrderedDict
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Read-through LRU for /trips/{trip_id} (shared links make it hot and read-mostly).
+# The TTL bounds staleness across worker processes, which invalidate independently.
+TRIP_CACHE_SIZE = int(os.getenv("TRIP_CACHE_SIZE", "512"))
+TRIP_CACHE_TTL_SECONDS = int(os.getenv("TRIP_CACHE_TTL_SECONDS", "300"))
+_trip_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+# Trip search: "auto" uses the Mongo text index and falls back to the in-process
+# inverted index if the deployment can't run $text queries; "mongo" / "memory" force one.
+TRIP_SEARCH_BACKEND = os.getenv("TRIP_SEARCH_BACKEND", "auto").lower()
+# The in-process index only sees this worker's writes; rebuild periodically to pick up others
+SEARCH_INDEX_TTL_SECONDS = 600
+_search_index = TripSearchIndex()
+_search_index_built_at = 0.0
+_search_index_task: Optional["asyncio.Task"] = None
+# Writes that land while a rebuild is scanning, replayed onto the new index before the swap
+_search_index_journal: Optional[List[Tuple[str, Optional[dict], Optional[dict]]]] = None
+# "auto" switches to the in-process index for good only when the text index is missing;
+# any other $text failure falls back for a while and then tries Mongo again
+_use_memory_search = TRIP_SEARCH_BACKEND == "memory"
+MONGO_SEARCH_RETRY_SECONDS = 60
+_mongo_search_failed_at = float("-inf")
+INDEX_NOT_FOUND = 27
+# Facet name -> document path
+SEARCH_FACET_PATHS = {"days": "days", "currency": "trip_plan.currency", "origin": "origin"}
+
+# Items of a summary-level plan whose long description can be generated on demand:
+# itinerary.<day>.activities.<n>, origin_info / destination_info, <city>.top_attractions.<n>
+ITEM_PATH_RE = re.compile(r"^(?:itinerary\.(\d+)\.activities\.(\d+)|(origin_info|destination_info)(?:\.top_attractions\.(\d+))?)$")
+# Serializes whole-plan rewrites of one trip (detail expansion, edits) within this worker
+_trip_locks = KeyedLocks()
+
+# Spatial index of every located place in saved trips (/places/nearby, nearby_attractions).
+# Like the search index it only sees this worker's writes between rebuilds.
+PLACE_INDEX_TTL_SECONDS = 600
+PLACE_INDEX_BATCH_SIZE = 200
+PLACE_INDEX_RETRY_SECONDS = 60
+_place_index = PlaceIndex()
+_place_index_built_at = 0.0
+_place_index_failed_at = float("-inf")
+_place_index_task: Optional["asyncio.Task"] = None
+# Trip counter updates run off the request path; strong refs keep them from being collected
+_counter_tasks: set = set()
+
+async def ensure_indexes():
+    """Create the indexes the listing queries rely on (idempotent, run at startup)."""
+    db = get_database()
+    # Keyset pagination sorts on (created_at, _id) / (timestamp, _id), newest first
+    await db.trips.create_index([("created_at", -1), ("_id", -1)], name="created_at_id")
+    await db.search_history.create_index([("timestamp", -1), ("_id", -1)], name="timestamp_id")
+    # Seed the trip counter once for collections that predate it
+    if not await db.counters.find_one({"_id": "trips"}):
+        total = await db.trips.count_documents({})
+        await db.counters.update_one({"_id": "trips"}, {"$setOnInsert": {"count": total}}, upsert=True)
+    # Only one text index is allowed per collection; weights mirror search_index.FIELD_WEIGHTS
+    try:
+        await db.trips.create_index(
+            [("destination", "text"), ("origin", "text"), ("trip_plan.itinerary.activities.activity", "text")],
+            name="trip_text",
+            weights={
+                "destination": FIELD_WEIGHTS["destination"],
+                "origin": FIELD_WEIGHTS["origin"],
+                "trip_plan.itinerary.activities.activity": FIELD_WEIGHTS["activity"],
+            }
+        )
+    except Exception as e:
+        logger.warning("Could not create trip text index, search will use the in-process index: %s", e)
+
+def encode_cursor(sort_value: datetime, doc_id) -> str:
+    """Opaque pagination token for the position just after (sort_value, doc_id)."""
+    raw = json.dumps({"t": sort_value.isoformat(), "id": str(doc_id)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_cursor; raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def next_cursor(items: List[dict], limit: int, field: str) -> Optional[str]:
+    """Token for the page after `items`, or None when this was the last page."""
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last[field], last["_id"])
+
+# Fields needed by listing pages; the full trip_plan stays behind /trips/{trip_id}
+SUMMARY_PROJECTION = {
+    "summary": 1,
+    "destination": 1,
+    "origin": 1,
+    "days": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    # Fallback for documents saved before `summary` existed
+    "trip_plan.hero_image": 1,
+}
+
+def build_trip_summary(trip_data: dict) -> dict:
+    """Denormalized listing view of a trip, stored alongside the full plan"""
+    plan = trip_data.get("trip_plan") or {}
+    return {
+        "destination": trip_data.get("destination") or plan.get("destination"),
+        "origin": trip_data.get("origin"),
+        "days": trip_data.get("days"),
+        "hero_image": plan.get("hero_image"),
+        "estimated_budget": plan.get("estimated_budget"),
+        "currency_symbol": plan.get("currency_symbol"),
+    }
+
+def _summary_from_doc(doc: dict) -> dict:
+    summary = doc.get("summary") or build_trip_summary(doc)
+    return {
+        "_id": doc["_id"],
+        **summary,
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+    }
+
+# Stored alongside the plan for listings and revalidation; never part of a trip response
+INTERNAL_TRIP_FIELDS = ("summary", "etag")
+
+def public_trip(trip: dict) -> dict:
+    """Copy of a stored trip without its internal fields (safe on cached documents)."""
+    return {key: value for key, value in trip.items() if key not in INTERNAL_TRIP_FIELDS}
+
+def content_hash(data) -> str:
+    """Stable hash of a JSON-able structure, used as the trip ETag"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+def invalidate_trip_cache(trip_id: str):
+    _trip_cache.pop(trip_id, None)
+
+SEARCH_PROJECTION = {
+    **SUMMARY_PROJECTION,
+    "trip_plan.currency": 1,
+    "trip_plan.itinerary.activities.activity": 1,
+}
+
+def _search_entry(doc: dict) -> dict:
+    entry = _summary_from_doc(doc)
+    entry["currency"] = (doc.get("trip_plan") or {}).get("currency")
+    return entry
+
+def _index_trip(trip_id: str, doc: dict):
+    if _search_index.built or _search_index_journal is not None:
+        entry = _search_entry({**doc, "_id": trip_id})
+        if _search_index.built:
+            _search_index.add(trip_id, doc, entry)
+        if _search_index_journal is not None:
+            _search_index_journal.append((trip_id, doc, entry))
+
+def _unindex_trip(trip_id: str):
+    _search_index.remove(trip_id)
+    if _search_index_journal is not None:
+        _search_index_journal.append((trip_id, None, None))
+
+def _keyset_filter(field: str, cursor: str) -> dict:
+    value, oid = decode_cursor(cursor)
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": oid}}
+    ]}
+
+async def _bump_trip_count(db, delta: int):
+    try:
+        await db.counters.update_one({"_id": "trips"}, {"$inc": {"count": delta}}, upsert=delta > 0)
+    except Exception as e:
+        logger.error("Error updating trip counter: %s", e)
+
+def _queue_trip_count(db, delta: int):
+    """Apply a counter change in the background; the listing total may lag a write briefly."""
+    task = asyncio.get_running_loop().create_task(_bump_trip_count(db, delta))
+    _counter_tasks.add(task)
+    task.add_done_callback(_counter_tasks.discard)
+
+async def flush_trip_counts():
+    """Wait for queued counter updates (shutdown, tests)."""
+    if _counter_tasks:
+        await asyncio.gather(*list(_counter_tasks))
 
 async def save_trip(trip_data: dict) -> str:
     """Save a trip to the database"""
     db = get_database()
     trip_data["created_at"] = datetime.utcnow()
     trip_data["updated_at"] = datetime.utcnow()
+    trip_data["summary"] = build_trip_summary(trip_data)
+    trip_data["etag"] = content_hash(trip_data["trip_plan"])
+    plan = trip_data["trip_plan"]
+    await pack_trip_document(db, trip_data)
     result = await db.trips.insert_one(trip_data)
+    _queue_trip_count(db, 1)
+    _index_trip(str(result.inserted_id), trip_data)
+    if _place_index.built:
+        _place_index.add_plan(plan)
     return str(result.inserted_id)
 
 async def get_trip(trip_id: str) -> Optional[dict]:
@@ -19,19 +228,58 @@ async def get_trip(trip_id: str) -> Optional[dict]:
         trip = await db.trips.find_one({"_id": ObjectId(trip_id)})
         if trip:
             trip["_id"] = str(trip["_id"])
+            await unpack_trip(db, trip)
         return trip
     except Exception as e:
-        print(f"Error fetching trip {trip_id}: {e}")
+        logger.error("Error fetching trip %s: %s", trip_id, e)
+        return None
+
+async def get_cached_trip(trip_id: str) -> Optional[dict]:
+    """
+    get_trip through the in-process LRU cache. The returned document is shared
+    with the cache and must be treated as read-only; it always carries an `etag`.
+    """
+    now = time.monotonic()
+    cached = _trip_cache.get(trip_id)
+    if cached and cached[0] > now:
+        _trip_cache.move_to_end(trip_id)
+        return cached[1]
+
+    trip = await get_trip(trip_id)
+    if not trip:
         return None
+    if not trip.get("etag"):
+        # Trips saved before ETags were stored
+        trip["etag"] = content_hash(trip.get("trip_plan"))
+    _trip_cache[trip_id] = (now + TRIP_CACHE_TTL_SECONDS, trip)
+    _trip_cache.move_to_end(trip_id)
+    while len(_trip_cache) > TRIP_CACHE_SIZE:
+        _trip_cache.popitem(last=False)
+    return trip
 
-async def get_all_trips(limit: int = 50, skip: int = 0) -> List[dict]:
-    """Get all trips with pagination"""
+async def get_all_trips(
+    limit: int = 50,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    view: str = "full"
+) -> List[dict]:
+    """
+    Get all trips with pagination (keyset when `cursor` is given, else skip/limit).
+    view="summary" projects only the listing fields instead of whole trip plans.
+    """
     db = get_database()
     trips = []
-    cursor = db.trips.find().sort("created_at", -1).skip(skip).limit(limit)
-    async for trip in cursor:
+    query = _keyset_filter("created_at", cursor) if cursor else {}
+    projection = SUMMARY_PROJECTION if view == "summary" else None
+    db_cursor = db.trips.find(query, projection).sort([("created_at", -1), ("_id", -1)])
+    if not query and skip:
+        db_cursor = db_cursor.skip(skip)
+    async for trip in db_cursor.limit(limit):
         trip["_id"] = str(trip["_id"])
-        trips.append(trip)
+        trips.append(_summary_from_doc(trip) if view == "summary" else trip)
+    if view != "summary":
+        await unpack_trips(db, trips)
+        trips = [public_trip(trip) for trip in trips]
     return trips
 
 async def delete_trip(trip_id: str) -> bool:
@@ -39,9 +287,13 @@ async def delete_trip(trip_id: str) -> bool:
     db = get_database()
     try:
         result = await db.trips.delete_one({"_id": ObjectId(trip_id)})
+        invalidate_trip_cache(trip_id)
+        _unindex_trip(trip_id)
+        if result.deleted_count > 0:
+            _queue_trip_count(db, -1)
         return result.deleted_count > 0
     except Exception as e:
-        print(f"Error deleting trip {trip_id}: {e}")
+        logger.error("Error deleting trip %s: %s", trip_id, e)
         return False
 
 async def update_trip(trip_id: str, update_data: dict) -> bool:
@@ -49,38 +301,337 @@ async def update_trip(trip_id: str, update_data: dict) -> bool:
     db = get_database()
     try:
         update_data["updated_at"] = datetime.utcnow()
+        # Partial updates can't hash the whole document; the timestamped patch is unique per write
+        update_data["etag"] = content_hash({"trip_id": trip_id, "update": update_data})
+        # Keep the denormalized listing summary in step with the fields it mirrors
+        if "trip_plan" in update_data:
+            plan = update_data["trip_plan"]
+            update_data["summary.hero_image"] = plan.get("hero_image")
+            update_data["summary.estimated_budget"] = plan.get("estimated_budget")
+            update_data["summary.currency_symbol"] = plan.get("currency_symbol")
+        for field in ("destination", "origin", "days"):
+            if field in update_data:
+                update_data[f"summary.{field}"] = update_data[field]
+        if "trip_plan" in update_data:
+            await pack_trip_document(db, update_data)
         result = await db.trips.update_one(
             {"_id": ObjectId(trip_id)},
             {"$set": update_data}
         )
+        invalidate_trip_cache(trip_id)
+        if _search_index.built or _search_index_journal is not None:
+            doc = await db.trips.find_one({"_id": ObjectId(trip_id)}, SEARCH_PROJECTION)
+            if doc:
+                _index_trip(trip_id, doc)
         return result.modified_count > 0
     except Exception as e:
-        print(f"Error updating trip {trip_id}: {e}")
+        logger.error("Error updating trip %s: %s", trip_id, e)
         return False
 
 async def save_search_history(query: str, origin: Optional[str] = None, days: Optional[int] = None) -> str:
-    """Save search history"""
-    db = get_database()
+    """Queue a search history record (written in batches off the request path)"""
     search_data = {
+        "_id": ObjectId(),
         "query": query,
         "origin": origin,
         "days": days,
         "timestamp": datetime.utcnow()
     }
-    result = await db.search_history.insert_one(search_data)
-    return str(result.inserted_id)
+    get_append_buffer("search_history").add(search_data)
+    return str(search_data["_id"])
 
-async def get_search_history(limit: int = 20) -> List[dict]:
-    """Get recent search history"""
+async def get_search_history(limit: int = 20, cursor: Optional[str] = None) -> List[dict]:
+    """Get recent search history (keyset paginated via `cursor`)"""
     db = get_database()
     history = []
-    cursor = db.search_history.find().sort("timestamp", -1).limit(limit)
-    async for item in cursor:
+    query = _keyset_filter("timestamp", cursor) if cursor else {}
+    db_cursor = db.search_history.find(query).sort([("timestamp", -1), ("_id", -1)]).limit(limit)
+    async for item in db_cursor:
         item["_id"] = str(item["_id"])
         history.append(item)
     return history
 
-async def get_trip_count() -> int:
-    """Get total number of trips"""
+async def get_trip_count(exact: bool = False) -> int:
+    """
+    Get total number of trips.
+    - exact=True: count_documents, always precise
+    - otherwise: counter document maintained by save/delete, else estimated_document_count
+    """
+    db = get_database()
+    if exact:
+        return await db.trips.count_documents({})
+    counter = await db.counters.find_one({"_id": "trips"})
+    if counter:
+        return max(counter["count"], 0)
+    return await db.trips.estimated_document_count()
+
+async def _search_trips_mongo(db, query: str, filters: dict, limit: int) -> dict:
+    match = {"$text": {"$search": query}}
+    for field, value in filters.items():
+        match[SEARCH_FACET_PATHS[field]] = value
+    facet_stages = {
+        field: [{"$sortByCount": f"${path}"}] for field, path in SEARCH_FACET_PATHS.items()
+    }
+    pipeline = [
+        {"$match": match},
+        {"$facet": {
+            "results": [
+                {"$sort": {"score": {"$meta": "textScore"}, "_id": -1}},
+                {"$limit": limit},
+                {"$project": {**SEARCH_PROJECTION, "score": {"$meta": "textScore"}}},
+            ],
+            "total": [{"$count": "count"}],
+            **facet_stages,
+        }},
+    ]
+    data = (await db.trips.aggregate(pipeline).to_list(1))[0]
+
+    results = []
+    for doc in data["results"]:
+        doc["_id"] = str(doc["_id"])
+        results.append({**_search_entry(doc), "score": doc.get("score")})
+    return {
+        "results": results,
+        "total": data["total"][0]["count"] if data["total"] else 0,
+        "facets": {
+            field: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in data[field]]
+            for field in SEARCH_FACET_PATHS
+        },
+    }
+
+async def _build_search_index(db):
+    """Rebuild the in-process search index from all stored trips and swap it in."""
+    global _search_index, _search_index_built_at, _search_index_journal
+    index = TripSearchIndex()
+    _search_index_journal = journal = []
+    try:
+        async for doc in db.trips.find({}, SEARCH_PROJECTION):
+            trip_id = str(doc["_id"])
+            doc["_id"] = trip_id
+            index.add(trip_id, doc, _search_entry(doc))
+        for trip_id, doc, entry in journal:
+            if doc is None:
+                index.remove(trip_id)
+            else:
+                index.add(trip_id, doc, entry)
+    finally:
+        _search_index_journal = None
+    # Swap in one step so concurrent searches never see a half-built index
+    index.built = True
+    _search_index = index
+    _search_index_built_at = time.monotonic()
+
+def _search_index_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Search index build failed: %s", task.exception())
+
+def _refresh_search_index(db) -> asyncio.Task:
+    """Start a background rebuild of the search index unless one is running (single flight)."""
+    global _search_index_task
+    loop = asyncio.get_running_loop()
+    task = _search_index_task
+    if task is None or task.done() or task.get_loop() is not loop:
+        task = _search_index_task = loop.create_task(_build_search_index(db))
+        task.add_done_callback(_search_index_done)
+    return task
+
+async def _ensure_search_index(db) -> TripSearchIndex:
+    """The search index; a stale one is served while it rebuilds, only a cold start waits."""
+    if _search_index.built:
+        if time.monotonic() - _search_index_built_at >= SEARCH_INDEX_TTL_SECONDS:
+            _refresh_search_index(db)
+        return _search_index
+    # Shielded: a cancelled request must not cancel the build other requests share
+    await asyncio.shield(_refresh_search_index(db))
+    return _search_index
+
+async def search_trips(query: str, filters: Optional[dict] = None, limit: int = 20) -> dict:
+    """
+    Full-text search over saved trips (destination, origin, activity names),
+    with facet counts on days, currency and origin.
+    """
+    global _use_memory_search, _mongo_search_failed_at
     db = get_database()
-    return await db.trips.count_documents({})
+    filters = {field: value for field, value in (filters or {}).items() if value is not None}
+
+    if not _use_memory_search and time.monotonic() - _mongo_search_failed_at >= MONGO_SEARCH_RETRY_SECONDS:
+        try:
+            result = await _search_trips_mongo(db, query, filters, limit)
+            result["backend"] = "mongo"
+            return result
+        except Exception as e:
+            if TRIP_SEARCH_BACKEND == "mongo":
+                raise
+            if isinstance(e, OperationFailure) and e.code == INDEX_NOT_FOUND:
+                logger.warning("Mongo text index missing, using in-process index: %s", e)
+                _use_memory_search = True
+            else:
+                logger.warning("Mongo text search failed, using in-process index for %ss: %s", MONGO_SEARCH_RETRY_SECONDS, e)
+                _mongo_search_failed_at = time.monotonic()
+
+    index = await _ensure_search_index(db)
+    result = index.search(query, filters, limit)
+    result["backend"] = "memory"
+    return result
+
+async def _build_place_index():
+    """Rebuild the place index from all stored trips and swap it in."""
+    global _place_index, _place_index_built_at
+    db = get_database()
+    index = PlaceIndex()
+    batch = []
+    async for doc in db.trips.find({}, {"trip_plan": 1, "city_refs": 1, "storage_version": 1}):
+        batch.append(doc)
+        if len(batch) >= PLACE_INDEX_BATCH_SIZE:
+            for trip in await unpack_trips(db, batch):
+                index.add_plan(trip.get("trip_plan") or {})
+            batch = []
+    for trip in await unpack_trips(db, batch):
+        index.add_plan(trip.get("trip_plan") or {})
+    # Swap in one step so concurrent readers never see a half-built index
+    index.built = True
+    _place_index = index
+    _place_index_built_at = time.monotonic()
+
+def _place_index_done(task: asyncio.Task):
+    global _place_index_failed_at
+    if not task.cancelled() and task.exception() is not None:
+        _place_index_failed_at = time.monotonic()
+        logger.warning("Place index build failed: %s", task.exception())
+
+def refresh_place_index() -> Optional[asyncio.Task]:
+    """Start a background rebuild unless one is running (single flight) or one just failed."""
+    global _place_index_task
+    loop = asyncio.get_running_loop()
+    task = _place_index_task
+    if task is not None and not task.done() and task.get_loop() is loop:
+        return task
+    if time.monotonic() - _place_index_failed_at < PLACE_INDEX_RETRY_SECONDS:
+        return None
+    _place_index_task = loop.create_task(_build_place_index())
+    _place_index_task.add_done_callback(_place_index_done)
+    return _place_index_task
+
+def current_place_index() -> Optional[PlaceIndex]:
+    """
+    The index as built right now, or None while cold; never waits, so request
+    paths (/search, edits) can use it freely. Schedules a rebuild when stale.
+    """
+    if not _place_index.built or time.monotonic() - _place_index_built_at >= PLACE_INDEX_TTL_SECONDS:
+        refresh_place_index()
+    return _place_index if _place_index.built else None
+
+async def get_place_index() -> PlaceIndex:
+    """The place index, waiting for the shared build only when none exists yet."""
+    index = current_place_index()
+    if index is not None:
+        return index
+    task = refresh_place_index()
+    if task is None:
+        raise RuntimeError("Place index unavailable")
+    # Shielded: a cancelled request must not cancel the build other requests share
+    await asyncio.shield(task)
+    return _place_index
+
+async def nearby_places(lat: float, lng: float, radius_km: float = 2.0, limit: int = 20, kind: Optional[str] = None) -> List[dict]:
+    """Known places within `radius_km` of a point, nearest first."""
+    index = await get_place_index()
+    return index.nearby(lat, lng, radius_km, limit, kind)
+
+def resolve_trip_item(plan: dict, path: str) -> Tuple[str, dict, str]:
+    """
+    (kind, item, name) for an item path of a trip plan. Raises ValueError for a
+    malformed path and KeyError if it points past the plan's contents.
+    """
+    match = ITEM_PATH_RE.match(path)
+    if not match:
+        raise ValueError(f"Invalid item path: {path}")
+    day, activity, city_field, attraction = match.groups()
+    try:
+        if day is not None:
+            item = plan["itinerary"][int(day)]["activities"][int(activity)]
+            return "activity", item, item["activity"]
+        info = plan[city_field]
+        if info is None:
+            raise KeyError(city_field)
+        if attraction is not None:
+            item = info["top_attractions"][int(attraction)]
+            return "attraction", item, item["name"]
+        return "city", info, info.get("city_name") or plan.get("destination")
+    except (IndexError, TypeError):
+        raise KeyError(path)
+
+async def get_item_details(trip_id: str, path: str) -> Optional[dict]:
+    """
+    Full description of one item of a stored trip. For summary-level plans it is
+    generated on first request and written back to the trip, so later requests
+    (and GET /trips/{trip_id}) return the stored text. None if the trip doesn't exist.
+    """
+    from app.services.ai_service import generate_item_details
+
+    trip = await get_trip(trip_id)
+    if not trip:
+        return None
+    plan = trip["trip_plan"]
+    kind, item, name = resolve_trip_item(plan, path)
+    if plan.get("detail_level") != "summary" or path in (trip.get("expanded_items") or []):
+        return {"path": path, "description": item.get("description"), "generated": False}
+
+    # The model call runs unlocked; only the read-modify-write of the plan is serialized
+    description = await generate_item_details(plan.get("destination"), kind, name, item.get("description") or "")
+    async with _trip_locks.hold(trip_id):
+        trip = await get_trip(trip_id)
+        if not trip:
+            return None
+        plan = trip["trip_plan"]
+        kind, item, current_name = resolve_trip_item(plan, path)
+        expanded = trip.get("expanded_items") or []
+        # Expanded by a concurrent request, or the item was replaced by an edit meanwhile
+        if path in expanded or current_name != name:
+            return {"path": path, "description": item.get("description"), "generated": False}
+        item["description"] = description
+        if not await update_trip(trip_id, {"trip_plan": plan, "expanded_items": expanded + [path]}):
+            logger.warning("Could not store details for %s %s", trip_id, path)
+        return {"path": path, "description": description, "generated": True}
+
+async def edit_trip(trip_id: str, change: Optional[str], days: Optional[int] = None, budget: Optional[str] = None) -> Optional[dict]:
+    """
+    Apply an edit to a stored trip and patch the document in place; only the
+    affected days/sections are regenerated (see ai_service.edit_trip_plan).
+    None if the trip doesn't exist.
+    """
+    from pydantic import ValidationError
+    from app.schemas import TripPlan
+    from app.services.ai_service import edit_trip_plan
+
+    # Shares the per-trip lock with detail expansion's write: both replace the whole plan
+    async with _trip_locks.hold(trip_id):
+        trip = await get_trip(trip_id)
+        if not trip:
+            return None
+        try:
+            trip_plan = TripPlan(**trip["trip_plan"])
+        except ValidationError as e:
+            # Legacy/partial stored plan: a server-side data problem, not a bad request
+            raise RuntimeError(f"Stored trip plan cannot be edited: {e}") from e
+        old_days = list(trip_plan.itinerary)
+        changed = await edit_trip_plan(trip_plan, change, days, budget)
+
+        # Expanded descriptions stay valid for days that were kept, at their new index
+        new_index = {id(day): d for d, day in enumerate(trip_plan.itinerary)}
+        day_map = {d: new_index[id(day)] for d, day in enumerate(old_days) if id(day) in new_index}
+        expanded = []
+        for path in trip.get("expanded_items") or []:
+            match = ITEM_PATH_RE.match(path)
+            if match and match.group(1) is not None:
+                if int(match.group(1)) in day_map:
+                    expanded.append(f"itinerary.{day_map[int(match.group(1))]}.activities.{match.group(2)}")
+            else:
+                expanded.append(path)
+
+        plan = trip_plan.dict()
+        if not await update_trip(trip_id, {"trip_plan": plan, "days": len(trip_plan.itinerary), "expanded_items": expanded}):
+            raise RuntimeError("Could not store the edited trip")
+        if _place_index.built:
+            _place_index.add_plan({"itinerary": [plan["itinerary"][int(p.split(".")[1])] for p in changed if p.startswith("itinerary.")]})
+        return {"trip_id": trip_id, "changed": changed, "trip_plan": plan}
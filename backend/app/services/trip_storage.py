@@ -0,0 +1,132 @@
+"""
+Storage format for trip plans in MongoDB.
+
+Version 2 documents differ from the raw TripPlan dict in two ways:
+- `origin_info` / `destination_info` live in the `cities` collection, keyed by a
+  content hash, and the trip only keeps the hash in `city_refs`
+- long `description` strings are zlib-compressed into {"_z": Binary(...)}
+
+Documents without `storage_version` are plain plans and pass through unpack untouched.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from bson import Binary
+
+STORAGE_VERSION = 2
+CITY_FIELDS = ("origin_info", "destination_info")
+
+# Compress descriptions at least this long (shorter text barely shrinks)
+COMPRESS_MIN_CHARS = 256
+COMPRESS_DESCRIPTIONS = os.getenv("TRIP_COMPRESS_DESCRIPTIONS", "true").lower() in ("1", "true", "yes")
+
+# City refs this worker has already written. City documents are never removed, so a
+# known ref needs no upsert; the LRU only bounds memory.
+KNOWN_CITY_REFS_SIZE = 4096
+_known_city_refs: "OrderedDict[str, None]" = OrderedDict()
+
+def city_hash(info: dict) -> str:
+    """Content address of a city info blob (stable across key order)."""
+    canonical = json.dumps(info, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def compress_descriptions(value):
+    """Return a copy of `value` with long description strings compressed."""
+    if isinstance(value, dict):
+        packed = {}
+        for key, item in value.items():
+            if key == "description" and isinstance(item, str) and len(item) >= COMPRESS_MIN_CHARS:
+                packed[key] = {"_z": Binary(zlib.compress(item.encode("utf-8"), 9))}
+            else:
+                packed[key] = compress_descriptions(item)
+        return packed
+    if isinstance(value, list):
+        return [compress_descriptions(item) for item in value]
+    return value
+
+def decompress_descriptions(value):
+    """Inverse of compress_descriptions."""
+    if isinstance(value, dict):
+        if len(value) == 1 and "_z" in value:
+            return zlib.decompress(bytes(value["_z"])).decode("utf-8")
+        return {key: decompress_descriptions(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decompress_descriptions(item) for item in value]
+    return value
+
+async def pack_trip_plan(db, plan: dict) -> Tuple[dict, Dict[str, str]]:
+    """
+    Split shared city blobs out of `plan` into the cities collection.
+    Returns (packed_plan, city_refs) to store on the trip document.
+    """
+    packed = dict(plan)
+    city_refs = {}
+    upserts = {}
+    for field in CITY_FIELDS:
+        info = packed.pop(field, None)
+        if not info:
+            continue
+        ref = city_hash(info)
+        city_refs[field] = ref
+        if ref in upserts:
+            continue
+        if ref in _known_city_refs:
+            _known_city_refs.move_to_end(ref)
+            continue
+        stored = compress_descriptions(info) if COMPRESS_DESCRIPTIONS else info
+        # Content-addressed: identical blobs collapse into one document
+        upserts[ref] = db.cities.update_one(
+            {"_id": ref},
+            {"$setOnInsert": {"info": stored, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+    if upserts:
+        await asyncio.gather(*upserts.values())
+        for ref in upserts:
+            _known_city_refs[ref] = None
+        while len(_known_city_refs) > KNOWN_CITY_REFS_SIZE:
+            _known_city_refs.popitem(last=False)
+
+    if COMPRESS_DESCRIPTIONS:
+        packed = compress_descriptions(packed)
+    return packed, city_refs
+
+async def pack_trip_document(db, trip_data: dict) -> dict:
+    """Convert a trip document carrying a plain trip_plan into the v2 format (in place)."""
+    packed, city_refs = await pack_trip_plan(db, trip_data["trip_plan"])
+    trip_data["trip_plan"] = packed
+    trip_data["city_refs"] = city_refs
+    trip_data["storage_version"] = STORAGE_VERSION
+    return trip_data
+
+async def unpack_trips(db, docs: List[dict]) -> List[dict]:
+    """Reassemble full trip plans for a batch of documents (one cities query)."""
+    refs = {
+        ref
+        for doc in docs if doc.get("storage_version") == STORAGE_VERSION
+        for ref in (doc.get("city_refs") or {}).values()
+    }
+    cities = {}
+    if refs:
+        async for city in db.cities.find({"_id": {"$in": list(refs)}}):
+            cities[city["_id"]] = decompress_descriptions(city["info"])
+
+    for doc in docs:
+        if doc.get("storage_version") != STORAGE_VERSION or "trip_plan" not in doc:
+            continue
+        plan = decompress_descriptions(doc["trip_plan"])
+        for field, ref in (doc.pop("city_refs", None) or {}).items():
+            plan[field] = cities.get(ref)
+        doc["trip_plan"] = plan
+        del doc["storage_version"]
+    return docs
+
+async def unpack_trip(db, doc: dict) -> dict:
+    """Reassemble the full trip plan of a single document."""
+    return (await unpack_trips(db, [doc]))[0]
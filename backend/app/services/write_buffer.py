@@ -0,0 +1,72 @@
+"""
+Buffered writes for append-only collections (search history, logs, ...).
+
+Records are queued in memory and flushed by a background task with unordered
+insert_many, either when a batch fills up or after a short interval. Callers
+never wait on Mongo; flush_append_buffers() drains everything at shutdown.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.config.database import get_database
+
+logger = logging.getLogger(__name__)
+
+class AppendBuffer:
+    def __init__(self, collection: str, max_batch: int = 100, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, doc: dict):
+        """Queue a document; it is written within `flush_interval` seconds."""
+        if len(self._pending) >= self.max_pending:
+            # Mongo is down or far behind: shed the oldest record rather than grow unbounded
+            self._pending.pop(0)
+            logger.warning("%s write buffer full, dropping oldest record", self.collection)
+        self._pending.append(doc)
+        if len(self._pending) >= self.max_batch:
+            self._batch_ready.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far."""
+        while self._pending:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            try:
+                await get_database()[self.collection].insert_many(batch, ordered=False)
+            except BulkWriteError as e:
+                logger.error("Error flushing %s: %d of %d records failed", self.collection, len(e.details.get('writeErrors', [])), len(batch))
+            except Exception as e:
+                logger.error("Error flushing %d %s records: %s", len(batch), self.collection, e)
+
+_buffers: Dict[str, AppendBuffer] = {}
+
+def get_append_buffer(collection: str) -> AppendBuffer:
+    """Shared buffer for an append-only collection (created on first use)."""
+    if collection not in _buffers:
+        _buffers[collection] = AppendBuffer(collection)
+    return _buffers[collection]
+
+async def flush_append_buffers():
+    """Drain all buffers (call before closing the Mongo connection)."""
+    for buffer in _buffers.values():
+        await buffer.flush()
@@ -0,0 +1,171 @@
+"""
+Synthetic, deterministic fixtures shaped like real API payloads (no network).
+"""
+import random
+
+WORDS = (
+    "fort palace temple market beach heritage colonial spice sunset lake hill garden "
+    "museum bazaar river ghat old city cuisine festival monsoon architecture dynasty "
+    "artisan courtyard stepwell lighthouse promenade cathedral sanctuary trail view"
+).split()
+
+def prose(rng: random.Random, min_chars: int) -> str:
+    sentences = []
+    length = 0
+    while length < min_chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 18))).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+def coords(rng: random.Random) -> dict:
+    return {"lat": round(rng.uniform(8, 34), 6), "lng": round(rng.uniform(68, 92), 6)}
+
+def attraction(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"Attraction {i}",
+        "description": prose(rng, 220),
+        "coordinates": coords(rng),
+        "image_url": f"https://images.pexels.com/photos/{rng.randint(10**5, 10**7)}/photo.jpeg",
+        "media_credit": "Photo by Someone",
+    }
+
+def hotel(rng: random.Random, i: int) -> dict:
+    return {
+        "name": f"Hotel {i}",
+        "description": prose(rng, 120),
+        "price_range": rng.choice(["Budget", "Mid-Range", "Luxury"]),
+        "coordinates": coords(rng),
+    }
+
+def city_info(rng: random.Random, name: str) -> dict:
+    return {
+        "city_name": name,
+        "description": prose(rng, 420),
+        "top_attractions": [attraction(rng, i) for i in range(4)],
+        "hotels": [hotel(rng, i) for i in range(3)],
+        "image_url": "https://images.pexels.com/photos/346885/pexels-photo-346885.jpeg",
+        "media_credit": "Photo by Someone",
+    }
+
+def trip_plan(seed: int = 0, days: int = 3, activities_per_day: int = 4, destination: str = "Goa") -> dict:
+    """A TripPlan-shaped dict (~18 KB of JSON for the default 3 days x 4 activities)."""
+    rng = random.Random(seed)
+    return {
+        "destination": destination,
+        "best_time_to_visit": "November to February",
+        "estimated_budget": "INR 15,000 - 25,000",
+        "currency": "INR",
+        "currency_symbol": "₹",
+        "route_info": {"distance": "1,900 km", "duration": "2h 30m flight", "map_url": None},
+        "itinerary": [
+            {
+                "day": day + 1,
+                "activities": [
+                    {
+                        "time": f"{9 + 2 * i}:00",
+                        "activity": f"Visit {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+                        "description": prose(rng, 420),
+                        "coordinates": coords(rng),
+                        "image_url": f"https://images.pexels.com/photos/{rng.randint(10**5, 10**7)}/photo.jpeg",
+                        "media_credit": "Photo by Someone",
+                        "nearby_attractions": [f"{rng.choice(WORDS).title()} Point" for _ in range(3)],
+                    }
+                    for i in range(activities_per_day)
+                ],
+            }
+            for day in range(days)
+        ],
+        "hotels": [hotel(rng, i) for i in range(4)],
+        "origin_info": city_info(rng, "Delhi"),
+        "destination_info": city_info(rng, destination),
+        "hero_image": "https://images.pexels.com/photos/1659438/pexels-photo-1659438.jpeg",
+        "hero_video": "https://videos.pexels.com/video-files/855018/855018-hd_1920_1080_30fps.mp4",
+        "media_credit": "Photo by Someone on Pexels",
+        "coordinates": coords(rng),
+        "origin_coordinates": {"lat": 28.6139, "lng": 77.209},
+    }
+
+# Provider API responses (shapes as documented by Pexels / Pixabay)
+
+VIDEO_SIZES = [(3840, 2160), (2560, 1440), (1920, 1080), (1280, 720), (960, 540), (640, 360), (426, 240)]
+
+def pexels_photos_response(seed: int = 0, count: int = 15) -> dict:
+    rng = random.Random(seed)
+    photos = []
+    for i in range(count):
+        photo_id = rng.randint(10**5, 10**7)
+        base = f"https://images.pexels.com/photos/{photo_id}/pexels-photo-{photo_id}.jpeg"
+        photos.append({
+            "id": photo_id,
+            "width": rng.choice([4000, 5472, 6000]),
+            "height": rng.choice([2667, 3648, 4000]),
+            "photographer": f"Photographer {i}",
+            "src": {
+                size: f"{base}?auto=compress&cs=tinysrgb&{size}"
+                for size in ("original", "large2x", "large", "medium", "small", "portrait", "landscape", "tiny")
+            },
+        })
+    return {"page": 1, "per_page": count, "photos": photos}
+
+def pexels_videos_response(seed: int = 0, count: int = 40) -> dict:
+    rng = random.Random(seed)
+    videos = []
+    for i in range(count):
+        video_id = rng.randint(10**5, 10**7)
+        files = [
+            {
+                "id": video_id * 10 + j,
+                "quality": "uhd" if width > 1920 else "hd" if width >= 1280 else "sd",
+                "file_type": "video/mp4",
+                "width": width,
+                "height": height,
+                "fps": rng.choice([24, 25, 29.97, 30, 50]),
+                "link": f"https://videos.pexels.com/video-files/{video_id}/{video_id}-{height}p.mp4",
+            }
+            for j, (width, height) in enumerate(rng.sample(VIDEO_SIZES, rng.randint(4, len(VIDEO_SIZES))))
+        ]
+        files.append({"id": video_id * 10 + 9, "quality": None, "file_type": "video/mp4", "width": None,
+                      "height": None, "fps": None, "link": f"https://player.vimeo.com/external/{video_id}.m3u8"})
+        videos.append({
+            "id": video_id,
+            "image": f"https://images.pexels.com/videos/{video_id}/free-video-{video_id}.jpg",
+            "user": {"name": f"Videographer {i}"},
+            "video_files": files,
+        })
+    return {"page": 1, "per_page": count, "videos": videos}
+
+def pixabay_videos_response(seed: int = 0, count: int = 40) -> dict:
+    rng = random.Random(seed)
+    hits = []
+    for i in range(count):
+        video_id = rng.randint(10**5, 10**7)
+        sizes = {"large": (3840, 2160), "medium": (1920, 1080), "small": (1280, 720), "tiny": (960, 540)}
+        videos = {
+            name: {
+                # Pixabay returns an empty entry for sizes it doesn't have
+                "url": "" if name == "large" and rng.random() < 0.5 else f"https://cdn.pixabay.com/video/{video_id}_{name}.mp4",
+                "width": width, "height": height, "size": width * height,
+                "thumbnail": f"https://cdn.pixabay.com/video/{video_id}_{name}.jpg",
+            }
+            for name, (width, height) in sizes.items()
+        }
+        hits.append({"id": video_id, "user": f"user{i}", "videos": videos})
+    return {"total": count, "totalHits": count, "hits": hits}
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_1 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Chrome/120.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36",
+]
+
+def page_view(rng: random.Random) -> dict:
+    return {
+        "url": f"/trip/{rng.randint(1, 5000)}",
+        "referrer": rng.choice([None, "https://www.google.com/", "https://www.instagram.com/"]),
+        "user_agent": rng.choice(USER_AGENTS),
+        "ip_address": f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        "country": rng.choice(["IN", "US", "GB", "AE"]),
+    }
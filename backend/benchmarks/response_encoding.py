@@ -0,0 +1,78 @@
+"""
+Bytes on the wire and CPU per response for the response-encoding layer.
+
+Compares stdlib JSON vs the FastJSONResponse encoder, and identity vs gzip/brotli
+(plus the compressed-bytes cache hit path) for a single trip plan and a full
+/trips?view=full listing page.
+
+Usage (from the backend directory):
+    python -m benchmarks.response_encoding [--repeat 200] [--json]
+"""
+import argparse
+import gzip
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse, CompressionMiddleware, brotli
+from app.schemas import TripPlan
+from benchmarks.fixtures import trip_plan
+
+def timed(fn, repeat: int) -> float:
+    """Median microseconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def bench_payload(name: str, payload, repeat: int) -> list:
+    rows = []
+    encoded = jsonable_encoder(payload)
+    body = JSONResponse(content=encoded).body
+    rows.append({"payload": name, "case": "encode stdlib json", "bytes": len(body),
+                 "us": round(timed(lambda: JSONResponse(content=jsonable_encoder(payload)), repeat), 1)})
+    rows.append({"payload": name, "case": f"encode {FastJSONResponse.__name__}",
+                 "bytes": len(FastJSONResponse(content=encoded).body),
+                 "us": round(timed(lambda: FastJSONResponse(content=jsonable_encoder(payload)), repeat), 1)})
+
+    for level in (1, 6, 9):
+        rows.append({"payload": name, "case": f"gzip level {level}",
+                     "bytes": len(gzip.compress(body, compresslevel=level)),
+                     "us": round(timed(lambda: gzip.compress(body, compresslevel=level), repeat), 1)})
+    if brotli is not None:
+        for quality in (4, 5, 11):
+            rows.append({"payload": name, "case": f"brotli quality {quality}",
+                         "bytes": len(brotli.compress(body, quality=quality)),
+                         "us": round(timed(lambda: brotli.compress(body, quality=quality), max(repeat // 10, 5)), 1)})
+
+    middleware = CompressionMiddleware(app=None)
+    encoding = "br" if brotli is not None else "gzip"
+    hit_bytes = middleware._compress(body, encoding, cacheable=True)
+    rows.append({"payload": name, "case": f"{encoding} cached (hit)", "bytes": len(hit_bytes),
+                 "us": round(timed(lambda: middleware._compress(body, encoding, cacheable=True), repeat), 1)})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Response encoding benchmark.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    plan = TripPlan(**trip_plan(seed=1))
+    listing = {"trips": [{"_id": str(i), "trip_plan": trip_plan(seed=i)} for i in range(50)], "total": 50}
+
+    rows = bench_payload("trip_plan", plan, args.repeat) + bench_payload("listing_50", listing, max(args.repeat // 10, 5))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'payload':<12}{'case':<28}{'bytes':>10}{'us/resp':>12}")
+    for row in rows:
+        print(f"{row['payload']:<12}{row['case']:<28}{row['bytes']:>10}{row['us']:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Micro-benchmarks for the service hot paths, on synthetic fixtures (no network).
+
+Groups:
+    providers   fetch_from_pexels / fetch_from_pixabay against canned API responses
+                (httpx MockTransport), plus the rendition ladder parsing on its own
+    schemas     TripPlan validation and serialization at 2/5/10-day sizes
+    analytics   single-row vs batched inserts into a scratch analytics.db
+    dashboard   get_dashboard_stats_service over synthetic analytics.db files
+                (--dashboard-rows, e.g. 1000000,10000000; files are cached in --data-dir)
+    trips       trip_service list/get against mongomock-motor (or --mongo-url)
+
+Results are written as JSON; with --baseline, each case is compared against a
+stored run and cases slower by more than --threshold are flagged.
+
+Usage (from the backend directory):
+    python -m benchmarks.suite                                   # all groups, print table
+    python -m benchmarks.suite --only providers schemas -o run.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --fail-on-regression
+    python -m benchmarks.suite --only dashboard --dashboard-rows 1000000,10000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+# app.services.ai_service refuses to import without a key; nothing here calls OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+
+from benchmarks import fixtures
+
+GROUPS = ("providers", "schemas", "analytics", "dashboard", "trips")
+
+def measure(fn, repeat: int, warmup: int = 1) -> dict:
+    """Timing summary (ms) of `repeat` calls of fn()."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p90_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.9))], 4),
+        "min_ms": round(samples[0], 4),
+        "runs": repeat,
+    }
+
+def measure_async(loop, coro_fn, repeat: int, warmup: int = 1) -> dict:
+    return measure(lambda: loop.run_until_complete(coro_fn()), repeat, warmup)
+
+# --- providers ---
+
+def _mock_client_factory(payloads: dict):
+    """httpx.AsyncClient replacement answering each request path from `payloads`."""
+    real_client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        for suffix, payload in payloads.items():
+            if request.url.path.endswith(suffix):
+                return httpx.Response(200, json=payload)
+        return httpx.Response(404, json={})
+
+    return lambda *args, **kwargs: real_client(transport=httpx.MockTransport(handler))
+
+def bench_providers(args, loop) -> dict:
+    from app.services import media_service
+
+    pexels_videos = fixtures.pexels_videos_response(count=40)
+    pexels_photos = fixtures.pexels_photos_response(count=15)
+    pixabay_videos = fixtures.pixabay_videos_response(count=40)
+    payloads = {"/videos/search": pexels_videos, "/v1/search": pexels_photos, "/api/videos/": pixabay_videos}
+
+    results = {}
+    with mock.patch.object(media_service.httpx, "AsyncClient", _mock_client_factory(payloads)), \
+            mock.patch.object(media_service, "PEXELS_API_KEY", "benchmark"), \
+            mock.patch.object(media_service, "PIXABAY_API_KEY", "benchmark"):
+        results["providers.pexels_videos_40.fetch"] = measure_async(
+            loop, lambda: media_service.fetch_from_pexels("travel", type="videos", per_page=40), args.repeat)
+        results["providers.pexels_photos_15.fetch"] = measure_async(
+            loop, lambda: media_service.fetch_from_pexels("travel", type="photos", per_page=15), args.repeat)
+        results["providers.pixabay_videos_40.fetch"] = measure_async(
+            loop, lambda: media_service.fetch_from_pixabay("travel", type="video", per_page=40), args.repeat)
+
+    # Parsing alone: the per-video ladder build and rendition pick, without HTTP
+    def parse_pexels():
+        for vid in pexels_videos["videos"]:
+            media_service.pick_video_rendition(media_service.pexels_video_renditions(vid))
+
+    def parse_pixabay():
+        for hit in pixabay_videos["hits"]:
+            media_service.pick_video_rendition(media_service.pixabay_video_renditions(hit))
+
+    results["providers.pexels_videos_40.parse"] = measure(parse_pexels, args.repeat * 5)
+    results["providers.pixabay_videos_40.parse"] = measure(parse_pixabay, args.repeat * 5)
+    return results
+
+# --- schemas ---
+
+def bench_schemas(args, loop) -> dict:
+    from app.schemas import TripPlan
+
+    results = {}
+    for days in (2, 5, 10):
+        raw = fixtures.trip_plan(seed=days, days=days)
+        plan = TripPlan(**raw)
+        results[f"schemas.trip_plan_{days}d.validate"] = measure(lambda: TripPlan(**raw), args.repeat)
+        results[f"schemas.trip_plan_{days}d.dict"] = measure(plan.dict, args.repeat)
+        results[f"schemas.trip_plan_{days}d.json"] = measure(plan.json, args.repeat)
+    return results
+
+# --- analytics ---
+
+def bench_analytics(args, loop) -> dict:
+    from app import db
+    from app.services import analytics_service
+
+    rng = random.Random(0)
+    views = [fixtures.page_view(rng) for _ in range(100)]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(db, "DB_PATH", Path(tmp) / "analytics.db"), \
+                mock.patch.object(db, "ANALYTICS_STORAGE", "single"):
+            async def one_by_one():
+                for view in views:
+                    await analytics_service.log_page_view_to_db(view)
+
+            results["analytics.insert_100.single_rows"] = measure_async(loop, one_by_one, max(args.repeat // 10, 3))
+            results["analytics.insert_100.batch"] = measure_async(
+                loop, lambda: analytics_service.log_batch_to_db(views, []), args.repeat)
+    return results
+
+# --- dashboard ---
+
+def build_dashboard_db(path: Path, rows: int):
+    """Synthetic analytics.db: `rows` page views over the last 3 days, rows/10 searches."""
+    from app import db
+
+    db.init_db(path)
+    conn = sqlite3.connect(path)
+    devices = "CASE x % 3 WHEN 0 THEN 'Mobile' ELSE 'Desktop' END"
+    oses = "CASE x % 5 WHEN 0 THEN 'Windows' WHEN 1 THEN 'MacOS' WHEN 2 THEN 'Linux' WHEN 3 THEN 'Android' ELSE 'iOS' END"
+    # Generated in SQLite itself: ~1-2 s per million rows, vs minutes through executemany
+    conn.execute(f"""
+        WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq LIMIT {int(rows)})
+        INSERT INTO page_views (url, referrer, user_agent, ip_address, country, device_type, os, timestamp)
+        SELECT '/trip/' || (x % 5000), NULL, 'Mozilla/5.0', '10.0.' || (x % 256) || '.' || ((x / 256) % 4096),
+               'IN', {devices}, {oses}, datetime('now', '-' || (x % 259200) || ' seconds')
+        FROM seq
+    """)
+    conn.execute(f"""
+        WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq LIMIT {max(int(rows) // 10, 1)})
+        INSERT INTO searches (query, origin, destination, user_agent, timestamp)
+        SELECT 'weekend trip', 'Delhi', 'Destination ' || (x % 200), 'Mozilla/5.0', datetime('now', '-' || (x % 259200) || ' seconds')
+        FROM seq
+    """)
+    conn.commit()
+    conn.close()
+
+def bench_dashboard(args, loop) -> dict:
+    from app import db
+    from app.services import analytics_service
+
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    results = {}
+    for rows in args.dashboard_rows:
+        path = data_dir / f"analytics-{rows}.db"
+        if not path.exists():
+            print(f"Building {path} ({rows:,} page views)...", file=sys.stderr)
+            build_dashboard_db(path, rows)
+        with mock.patch.object(db, "DB_PATH", path), mock.patch.object(db, "ANALYTICS_STORAGE", "single"):
+            repeat = max(3, min(args.repeat, 2_000_000 // rows))
+            results[f"dashboard.stats_{rows}_rows"] = measure_async(
+                loop, analytics_service.get_dashboard_stats_service, repeat)
+    return results
+
+# --- trips ---
+
+def bench_trips(args, loop) -> dict:
+    from app.config import database
+    from app.services import trip_service
+
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, io_loop=loop)
+        stand_in = "mongodb"
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            print("Skipping trips: install mongomock-motor or pass --mongo-url", file=sys.stderr)
+            return {}
+        client = AsyncMongoMockClient()
+        stand_in = "mongomock"
+
+    db_name = "weekendt_benchmark"
+    results = {}
+    with mock.patch.object(database.db, "client", client), \
+            mock.patch.dict(os.environ, {"MONGODB_DB_NAME": db_name}):
+        async def seed():
+            await client[db_name].trips.drop()
+            await trip_service.ensure_indexes()
+            ids = []
+            for i in range(args.trips):
+                plan = fixtures.trip_plan(seed=i, destination=f"City {i % 50}")
+                ids.append(await trip_service.save_trip({
+                    "destination": plan["destination"], "origin": "Delhi", "days": 3, "trip_plan": plan,
+                }))
+            return ids
+
+        trip_ids = loop.run_until_complete(seed())
+        first_page = loop.run_until_complete(trip_service.get_all_trips(limit=20, view="summary"))
+        cursor = trip_service.next_cursor(first_page, 20, "created_at")
+        target = trip_ids[len(trip_ids) // 2]
+
+        prefix = f"trips.{stand_in}_{args.trips}"
+        results[f"{prefix}.list_summary_20"] = measure_async(
+            loop, lambda: trip_service.get_all_trips(limit=20, view="summary"), args.repeat)
+        results[f"{prefix}.list_full_20"] = measure_async(
+            loop, lambda: trip_service.get_all_trips(limit=20, view="full"), max(args.repeat // 5, 3))
+        results[f"{prefix}.list_summary_20_cursor"] = measure_async(
+            loop, lambda: trip_service.get_all_trips(limit=20, view="summary", cursor=cursor), args.repeat)
+        results[f"{prefix}.get"] = measure_async(loop, lambda: trip_service.get_trip(target), args.repeat)
+        results[f"{prefix}.get_cached"] = measure_async(loop, lambda: trip_service.get_cached_trip(target), args.repeat)
+
+        if args.mongo_url:
+            loop.run_until_complete(client.drop_database(db_name))
+    return results
+
+# --- reporting ---
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Rows of (case, baseline ms, current ms, ratio, regressed) for cases in both runs."""
+    rows = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else 1.0
+        rows.append((case, previous["median_ms"], current["median_ms"], ratio, ratio > 1 + threshold))
+    return rows
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def main():
+    parser = argparse.ArgumentParser(description="Service hot-path micro-benchmarks.")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="Benchmark groups to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--dashboard-rows", default="100000",
+                        type=lambda value: [int(v) for v in value.split(",")],
+                        help="Comma-separated page_views row counts, e.g. 1000000,10000000")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "weekendt-bench"),
+                        help="Where synthetic dashboard databases are kept between runs")
+    parser.add_argument("--trips", type=int, default=500, help="Trips seeded for the trips group")
+    parser.add_argument("--mongo-url", help="Benchmark trips against a real MongoDB instead of mongomock")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument("--save-baseline", help="Also write results to this path as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    benches = {
+        "providers": bench_providers,
+        "schemas": bench_schemas,
+        "analytics": bench_analytics,
+        "dashboard": bench_dashboard,
+        "trips": bench_trips,
+    }
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    results = {}
+    for group in args.only or GROUPS:
+        print(f"Running {group}...", file=sys.stderr)
+        results.update(benches[group](args, loop))
+    loop.close()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        rows = compare(results, baseline, args.threshold)
+        print(f"{'case':<52}{'base ms':>12}{'now ms':>12}{'change':>10}")
+        for case, before, now, ratio, regressed in rows:
+            print(f"{case:<52}{before:>12.3f}{now:>12.3f}{(ratio - 1) * 100:>+9.1f}%{'  REGRESSION' if regressed else ''}")
+        regressions = [row[0] for row in rows if row[4]]
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+    else:
+        print(f"{'case':<52}{'median ms':>12}{'p90 ms':>12}")
+        for case, timing in results.items():
+            print(f"{case:<52}{timing['median_ms']:>12.3f}{timing['p90_ms']:>12.3f}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
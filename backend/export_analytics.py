@@ -0,0 +1,32 @@
+"""
+Stream raw analytics rows out of analytics.db as NDJSON or CSV.
+
+Usage (from the backend directory):
+    python export_analytics.py events --format csv --start 2025-01-01 > events.csv
+    python export_analytics.py page_views --start 2025-01-01T00:00 --end 2025-02-01T00:00
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from app.services.analytics_service import EXPORT_COLUMNS, stream_export
+
+def main():
+    parser = argparse.ArgumentParser(description="Export raw analytics rows.")
+    parser.add_argument("table", choices=sorted(EXPORT_COLUMNS))
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Inclusive ISO timestamp (UTC)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Exclusive ISO timestamp (UTC)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for chunk in stream_export(args.table, args.format, args.start, args.end):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
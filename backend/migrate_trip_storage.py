@@ -0,0 +1,55 @@
+"""
+Convert existing trips to the normalized storage format (see app/services/trip_storage.py).
+
+Shared origin/destination info moves into the content-addressed `cities` collection
+and long descriptions are compressed. Safe to re-run: converted trips are skipped.
+
+Usage (from the backend directory):
+    python migrate_trip_storage.py [--dry-run] [--batch-size 100]
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env")
+
+from app.config.database import connect_to_mongo, close_mongo_connection, get_database
+from app.services.trip_storage import STORAGE_VERSION, pack_trip_document
+
+async def migrate(dry_run: bool, batch_size: int):
+    await connect_to_mongo()
+    db = get_database()
+    converted = 0
+    try:
+        cursor = db.trips.find(
+            {"storage_version": {"$ne": STORAGE_VERSION}, "trip_plan": {"$type": "object"}},
+            batch_size=batch_size
+        )
+        async for trip in cursor:
+            if dry_run:
+                converted += 1
+                continue
+            await pack_trip_document(db, trip)
+            await db.trips.update_one(
+                {"_id": trip["_id"]},
+                {"$set": {
+                    "trip_plan": trip["trip_plan"],
+                    "city_refs": trip["city_refs"],
+                    "storage_version": STORAGE_VERSION
+                }}
+            )
+            converted += 1
+            if converted % batch_size == 0:
+                print(f"Converted {converted} trips...")
+    finally:
+        await close_mongo_connection()
+    print(f"{'Would convert' if dry_run else 'Converted'} {converted} trips.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate trips to normalized storage.")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(migrate(args.dry_run, args.batch_size))
@@ -0,0 +1,53 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+@pytest.fixture
+def mongo():
+    """Point app.config.database at an in-memory Mongo and reset trip_service's caches."""
+    from mongomock_motor import AsyncMongoMockClient
+    from app.config import database
+    from app.services import trip_service, trip_storage
+
+    database.db.client = AsyncMongoMockClient()
+    trip_service._trip_cache.clear()
+    trip_storage._known_city_refs.clear()
+    yield database.db.client
+    database.db.client = None
+    trip_service._trip_cache.clear()
+    trip_storage._known_city_refs.clear()
+
+@pytest.fixture
+def make_plan():
+    def make(destination="Goa", days=2, activities_per_day=2, detail_level=None):
+        return {
+            "destination": destination,
+            "best_time_to_visit": "Winter",
+            "estimated_budget": "100",
+            "itinerary": [
+                {
+                    "day": d + 1,
+                    "activities": [
+                        {
+                            "time": f"{9 + 3 * a}:00",
+                            "activity": f"Activity {d}.{a}",
+                            "description": f"Summary of activity {d}.{a}",
+                            "coordinates": {"lat": 15.5 + 0.01 * a, "lng": 73.8 + 0.01 * d},
+                        }
+                        for a in range(activities_per_day)
+                    ],
+                }
+                for d in range(days)
+            ],
+            "coordinates": {"lat": 15.5, "lng": 73.8},
+            "origin_coordinates": {"lat": 28.6, "lng": 77.2},
+            "origin_info": {"city_name": "Delhi", "description": "Capital"},
+            "destination_info": {"city_name": destination, "description": "Beaches"},
+            "detail_level": detail_level,
+        }
+    return make
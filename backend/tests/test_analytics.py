@@ -0,0 +1,101 @@
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import db
+from app.routers import analytics
+from app.services import analytics_service
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+@pytest.fixture
+def sharded(tmp_path, monkeypatch):
+    """Sharded analytics storage under tmp_path, with no shard claimed yet."""
+    monkeypatch.setattr(db, "ANALYTICS_STORAGE", "sharded")
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "analytics.db")
+    monkeypatch.setattr(db, "SHARD_DIR", tmp_path / "analytics_shards")
+    monkeypatch.setattr(db, "_initialized_paths", set())
+    monkeypatch.setattr(db, "_shard_path", None)
+    monkeypatch.setattr(db, "_shard_pid", None)
+    monkeypatch.setattr(db, "_shard_lock", None)
+    yield tmp_path
+    if db._shard_lock is not None:
+        db._shard_lock.close()
+
+def _page_view(url):
+    return {"url": url, "referrer": None, "user_agent": "pytest", "ip_address": "127.0.0.1"}
+
+def test_importing_in_sharded_mode_claims_no_shard():
+    script = "import app.db as db; print(db._shard_path is None and db._shard_lock is None and not db._initialized_paths)"
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, env={"ANALYTICS_STORAGE": "sharded", "PATH": ""},
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "True"
+
+def test_export_rows_are_keyed_by_shard(sharded, monkeypatch):
+    asyncio.run(analytics_service.log_page_view_to_db(_page_view("/a")))
+    first_shard = db._shard_path
+    # A second worker process: same row ids, different shard file
+    monkeypatch.setattr(db, "_shard_pid", None)
+    asyncio.run(analytics_service.log_page_view_to_db(_page_view("/b")))
+    assert db._shard_path != first_shard
+
+    rows = [json.loads(line) for line in "".join(analytics_service.stream_export("page_views")).splitlines()]
+    assert [(row["shard"], row["id"], row["url"]) for row in rows] == [
+        ("worker-0", 1, "/a"),
+        ("worker-1", 1, "/b"),
+    ]
+
+    csv_lines = "".join(analytics_service.stream_export("page_views", "csv")).splitlines()
+    assert csv_lines[0].startswith("shard,id,url")
+    assert csv_lines[1].startswith("worker-0,1,/a")
+
+def test_batch_accepts_beacon_payloads(sharded):
+    app = FastAPI()
+    app.include_router(analytics.router)
+    client = TestClient(app)
+    batch = [
+        {"type": "pageview", "url": "/", "referrer": "https://example.com"},
+        {"type": "event", "event_name": "search", "event_data": {"q": "goa"}, "url": "/"},
+    ]
+
+    # sendBeacon posts text/plain
+    response = client.post("/analytics/batch", content=json.dumps(batch), headers={"Content-Type": "text/plain"})
+    assert response.json() == {"status": "ok", "accepted": 2}
+    exported = "".join(analytics_service.stream_export("events"))
+    assert json.loads(exported)["event_data"] == '{"q": "goa"}'
+    assert "https://example.com" in "".join(analytics_service.stream_export("page_views"))
+
+    assert client.post("/analytics/batch", content="not json").status_code == 422
+    assert client.post("/analytics/batch", json=[{"type": "click", "url": "/"}]).status_code == 422
+    too_many = [{"type": "pageview", "url": "/"}] * (analytics.MAX_BATCH_ITEMS + 1)
+    assert client.post("/analytics/batch", json=too_many).status_code == 413
+
+def test_export_endpoint_streams_a_time_range(sharded):
+    app = FastAPI()
+    app.include_router(analytics.router)
+    client = TestClient(app)
+    assert client.get("/analytics/export", params={"table": "searches"}).status_code == 404
+
+    conn = db.get_db_connection()
+    conn.executemany(
+        "INSERT INTO searches (query, origin, timestamp) VALUES (?, ?, ?)",
+        [("goa", "Delhi", "2026-01-01 10:00:00"), ("jaipur", "Mumbai", "2026-02-01 10:00:00")]
+    )
+    conn.commit()
+    conn.close()
+
+    response = client.get("/analytics/export", params={"table": "searches", "format": "csv", "start": "2026-01-15T00:00:00"})
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "shard,id,query,origin,destination,user_agent,timestamp"
+    assert lines[1:] == ["worker-0,2,jaipur,Mumbai,,,2026-02-01 10:00:00"]
+
+    assert client.get("/analytics/export", params={"table": "users"}).status_code == 422
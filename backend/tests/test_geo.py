@@ -0,0 +1,49 @@
+from app.schemas import TripPlan
+from app.services import geo
+
+def test_haversine_matches_a_known_distance():
+    # Delhi -> Mumbai is about 1,150 km great-circle
+    km = geo.haversine_km([28.6139], [77.2090], [19.0760], [72.8777])[0]
+    assert 1140 < km < 1160
+
+def test_route_and_legs_come_from_coordinates(make_plan):
+    plan = make_plan(days=2, activities_per_day=3)
+    plan["itinerary"][1]["activities"][1]["coordinates"] = None
+    trip_plan = geo.apply_route_metrics(TripPlan(**plan), "train")
+
+    route = trip_plan.route_info
+    assert route.mode == "train"
+    assert route.duration.endswith(" train")
+    assert "travelmode=transit" in route.map_url
+    assert 1800 < route.distance_km < 1900  # ~1,450 km great-circle times the rail detour
+
+    day_one, day_two = trip_plan.itinerary
+    assert [(leg.from_activity, leg.to_activity) for leg in day_one.legs] == [
+        ("Activity 0.0", "Activity 0.1"), ("Activity 0.1", "Activity 0.2")
+    ]
+    # ~1.1 km apart: walkable
+    assert all(leg.mode == "walk" and leg.distance_km < 2 for leg in day_one.legs)
+    # The middle activity has no coordinates, so no leg touches it
+    assert day_two.legs == []
+
+def test_missing_coordinates_leave_the_route_unknown(make_plan):
+    plan = make_plan(days=1, activities_per_day=1)
+    plan["coordinates"] = None
+    route = geo.apply_route_metrics(TripPlan(**plan)).route_info
+    assert (route.distance, route.duration) == ("Unknown", "Unknown")
+
+    # A route the model wrote itself is not kept when it can't be checked
+    plan = make_plan(days=1, activities_per_day=2)
+    plan["origin_coordinates"] = None
+    plan["route_info"] = {"distance": "12 km", "duration": "15 min drive"}
+    trip_plan = geo.apply_route_metrics(TripPlan(**plan))
+    assert (trip_plan.route_info.distance, trip_plan.route_info.duration) == ("Unknown", "Unknown")
+    assert trip_plan.itinerary[0].legs
+
+def test_formatting():
+    assert geo.format_distance(0.42) == "420 m"
+    assert geo.format_distance(3.25) == "3.2 km"
+    assert geo.format_distance(1234) == "1,234 km"
+    assert geo.format_duration(45) == "45 min"
+    assert geo.format_duration(120) == "2h"
+    assert geo.format_duration(135) == "2h 15m"
@@ -0,0 +1,42 @@
+from starlette.requests import Request
+
+from app import client_hints
+from app.schemas import TripPlan
+from app.services import media_service
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+def test_pexels_sizes_become_an_ascending_srcset():
+    photo = {"width": 6000, "height": 4000, "src": {
+        "tiny": "t", "small": "s", "medium": "m", "large": "l", "large2x": "l2", "original": "o"
+    }}
+    srcset = media_service.pexels_photo_renditions(photo)
+    assert [r["url"] for r in srcset] == ["s", "t", "m", "l", "l2", "o"]
+    assert [r["width"] for r in srcset] == [195, 280, 525, 940, 1880, 6000]
+
+def test_images_are_sized_for_the_client_display(make_plan):
+    srcset = [{"url": f"w{w}", "width": w} for w in (200, 400, 1080, 3000)]
+    plan = make_plan(days=1, activities_per_day=1)
+    plan["hero_image"] = "w3000"
+    plan["hero_image_srcset"] = srcset
+    plan["itinerary"][0]["activities"][0]["image_srcset"] = srcset
+    plan["destination_info"]["top_attractions"] = [{"name": "Fort", "description": "Old", "image_srcset": srcset}]
+    trip_plan = TripPlan(**plan)
+
+    media_service.select_plan_images(trip_plan, viewport_width=390, dpr=3)
+    assert trip_plan.hero_image == "w3000"  # 390 * 3 = 1170 px
+    assert trip_plan.itinerary[0].activities[0].image_url == "w400"  # 96 * 3 thumbnail
+    assert trip_plan.destination_info.top_attractions[0].image_url == "w3000"
+
+    media_service.select_plan_images(trip_plan, viewport_width=1440, dpr=1)
+    assert trip_plan.hero_image == "w3000"
+    assert trip_plan.itinerary[0].activities[0].image_url == "w200"
+    assert trip_plan.destination_info.top_attractions[0].image_url == "w1080"  # cards cap at 640
+
+def test_display_hints_prefer_the_sec_ch_headers():
+    request = _request(sec_ch_viewport_width="390", viewport_width="1024", dpr="2", sec_ch_dpr="bogus")
+    assert client_hints.viewport_width(request) == 390
+    assert client_hints.device_pixel_ratio(request) == 2
+    assert client_hints.viewport_width(_request()) is None
@@ -0,0 +1,103 @@
+import asyncio
+
+from app.services import ai_service, trip_service
+
+def _save(plan):
+    return trip_service.save_trip({"destination": plan["destination"], "origin": "Delhi", "days": len(plan["itinerary"]), "trip_plan": plan})
+
+def test_concurrent_expansions_generate_in_parallel_and_all_land(mongo, make_plan, monkeypatch):
+    running = {"now": 0, "peak": 0}
+
+    async def fake_details(destination, kind, name, summary):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.05)
+        running["now"] -= 1
+        return f"Long text about {name}"
+
+    monkeypatch.setattr(ai_service, "generate_item_details", fake_details)
+
+    async def scenario():
+        trip_id = await _save(make_plan(days=1, activities_per_day=3, detail_level="summary"))
+
+        async def expand(a, delay):
+            await asyncio.sleep(delay)
+            return await trip_service.get_item_details(trip_id, f"itinerary.0.activities.{a}")
+
+        # All three generations overlap; their plan writes are serialized
+        results = await asyncio.gather(expand(0, 0), expand(1, 0.01), expand(2, 0.02))
+        return results, await trip_service.get_trip(trip_id)
+
+    results, trip = asyncio.run(scenario())
+    assert running["peak"] == 3
+    assert all(result["generated"] for result in results)
+    assert sorted(trip["expanded_items"]) == [f"itinerary.0.activities.{a}" for a in range(3)]
+    activities = trip["trip_plan"]["itinerary"][0]["activities"]
+    assert [a["description"] for a in activities] == [f"Long text about Activity 0.{a}" for a in range(3)]
+    assert len(trip_service._trip_locks) == 0
+
+def test_edit_during_an_expansion_keeps_both_writes(mongo, make_plan, monkeypatch):
+    async def fake_details(destination, kind, name, summary):
+        await asyncio.sleep(0.05)
+        return f"Long text about {name}"
+
+    async def fake_edit(trip_plan, change, days=None, budget=None):
+        trip_plan.estimated_budget = "250"
+        return ["estimated_budget"]
+
+    monkeypatch.setattr(ai_service, "generate_item_details", fake_details)
+    monkeypatch.setattr(ai_service, "edit_trip_plan", fake_edit)
+
+    async def scenario():
+        trip_id = await _save(make_plan(days=1, detail_level="summary"))
+        expand = asyncio.create_task(trip_service.get_item_details(trip_id, "itinerary.0.activities.0"))
+        await asyncio.sleep(0.01)
+        await trip_service.edit_trip(trip_id, None, budget="250")
+        # The edit did not wait for the model call
+        assert not expand.done()
+        await expand
+        return await trip_service.get_trip(trip_id)
+
+    trip = asyncio.run(scenario())
+    # Neither write undid the other
+    assert trip["trip_plan"]["estimated_budget"] == "250"
+    assert trip["trip_plan"]["itinerary"][0]["activities"][0]["description"] == "Long text about Activity 0.0"
+    assert trip["expanded_items"] == ["itinerary.0.activities.0"]
+
+def test_item_replaced_during_generation_keeps_the_edit(mongo, make_plan, monkeypatch):
+    async def fake_details(destination, kind, name, summary):
+        await asyncio.sleep(0.05)
+        return f"Long text about {name}"
+
+    monkeypatch.setattr(ai_service, "generate_item_details", fake_details)
+
+    async def scenario():
+        trip_id = await _save(make_plan(days=1, detail_level="summary"))
+        expand = asyncio.create_task(trip_service.get_item_details(trip_id, "itinerary.0.activities.0"))
+        await asyncio.sleep(0.01)
+        trip = await trip_service.get_trip(trip_id)
+        plan = trip["trip_plan"]
+        plan["itinerary"][0]["activities"][0] = {"time": "9:00", "activity": "Kayaking", "description": "Paddle"}
+        await trip_service.update_trip(trip_id, {"trip_plan": plan})
+        return await expand, await trip_service.get_trip(trip_id)
+
+    result, trip = asyncio.run(scenario())
+    assert result == {"path": "itinerary.0.activities.0", "description": "Paddle", "generated": False}
+    assert trip["trip_plan"]["itinerary"][0]["activities"][0]["description"] == "Paddle"
+    assert "expanded_items" not in trip
+
+def test_details_endpoint_is_rate_limited(mongo, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app import rate_limit
+    from app.routers import trips
+
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.MemoryBucketStore())
+    app = FastAPI()
+    app.include_router(trips.router)
+    client = TestClient(app)
+    capacity, _ = rate_limit.get_limit("details")
+    url = "/trips/64b000000000000000000000/items/itinerary.0.activities.0/details"
+    statuses = [client.get(url).status_code for _ in range(capacity + 1)]
+    assert statuses[:capacity] == [404] * capacity
+    assert statuses[-1] == 429
@@ -0,0 +1,35 @@
+import json
+import logging
+
+from app import logging_config
+
+def _record(msg="Upstream failed for %s", level=logging.WARNING, *args, **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args or ("x",), None)
+    record.__dict__.update(extra)
+    return record
+
+def test_sampling_passes_a_burst_then_reports_what_it_dropped(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+    sampler = logging_config.SamplingFilter(burst=2, interval=10)
+
+    passed = [sampler.filter(_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Other templates and levels have their own budget / are never sampled
+    assert sampler.filter(_record("Other warning %s"))
+    assert all(sampler.filter(_record(level=logging.ERROR)) for _ in range(5))
+
+    now[0] += 10
+    record = _record()
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+
+def test_json_records_carry_request_id_and_extra_fields():
+    record = _record("Fetched %s", logging.INFO, "goa", duration_ms=12.5, request_id="abc123", suppressed=2)
+    entry = json.loads(logging_config.JsonFormatter().format(record))
+    assert entry["msg"] == "Fetched goa"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc123"
+    assert entry["duration_ms"] == 12.5
+    assert entry["suppressed"] == 2
+    assert "args" not in entry and "pathname" not in entry
@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import loop_monitor
+
+def _app(monkeypatch):
+    monkeypatch.setattr(loop_monitor, "LOOP_MONITOR_ENABLED", True)
+    monkeypatch.setattr(loop_monitor, "LOOP_BLOCK_THRESHOLD_MS", 50)
+    app = FastAPI(on_startup=[loop_monitor.start_loop_monitor], on_shutdown=[loop_monitor.stop_loop_monitor])
+    app.add_middleware(loop_monitor.LoopMonitorMiddleware)
+
+    @app.get("/blocking")
+    async def blocking_handler():
+        time.sleep(0.3)
+        return {}
+
+    @app.get("/awaiting")
+    async def awaiting_handler():
+        await asyncio.sleep(0.3)
+        return {}
+
+    return app
+
+def test_strict_mode_fails_the_request_that_blocked(monkeypatch):
+    with TestClient(_app(monkeypatch)) as client:
+        assert client.get("/awaiting").status_code == 200
+        with pytest.raises(loop_monitor.LoopBlockedError, match="blocking_handler"):
+            client.get("/blocking")
+
+        stats = loop_monitor.get_loop_monitor().stats()
+        assert stats["blocked"] == 1
+        assert stats["slow_callbacks"][0]["task"] is not None
+    assert loop_monitor.get_loop_monitor() is None
+
+def test_monitor_does_not_start_unless_enabled(monkeypatch):
+    monkeypatch.setattr(loop_monitor, "LOOP_MONITOR_ENABLED", False)
+
+    async def scenario():
+        loop_monitor.start_loop_monitor()
+        return loop_monitor.get_loop_monitor()
+
+    assert asyncio.run(scenario()) is None
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 11)]
+    assert loop_monitor.percentile(values, 50) == 5.0
+    assert loop_monitor.percentile(values, 95) == 10.0
+    assert loop_monitor.percentile([1.0, 2.0], 50) == 1.0
+    assert loop_monitor.percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+    assert loop_monitor.percentile([], 50) == 0.0
+
+def test_stats_endpoint_has_its_own_token(monkeypatch):
+    from app.routers import loop
+    monkeypatch.setattr(loop_monitor, "LOOP_MONITOR_TOKEN", "loop-secret")
+    app = _app(monkeypatch)
+    app.include_router(loop.router)
+
+    with TestClient(app) as client:
+        assert client.get("/internal/loop").status_code == 403
+        assert client.get("/internal/loop", headers={"X-Loop-Token": "wrong"}).status_code == 403
+        response = client.get("/internal/loop", headers={"X-Loop-Token": "loop-secret"})
+        assert response.status_code == 200 and "blocked" in response.json()
@@ -0,0 +1,115 @@
+import asyncio
+import functools
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import media
+from app.services import media_cache, media_service
+
+UPSTREAM = "https://images.example.com/photo.jpg?w=640"
+BODY = b"\xff\xd8jpeg-bytes" * 100
+
+@pytest.fixture
+def upstream(tmp_path, monkeypatch):
+    """Isolated cache dir and a fake CDN; returns the list of upstream requests."""
+    monkeypatch.setattr(media_cache, "MEDIA_CACHE_DIR", tmp_path)
+    monkeypatch.setattr(media_cache, "_initialized", False)
+    monkeypatch.setattr(media_cache, "_secret", None)
+    monkeypatch.setattr(media_cache, "_fetch_locks", media_cache.KeyedLocks())
+    requests = []
+
+    async def handler(request):
+        requests.append(str(request.url))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=BODY, headers={"content-type": "image/jpeg"})
+
+    client_class = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(media_cache.httpx, "AsyncClient", client_class)
+    return requests
+
+@pytest.fixture
+def client(upstream):
+    app = FastAPI()
+    app.include_router(media.router)
+    return TestClient(app)
+
+def test_keys_name_their_url_and_reject_tampering(upstream):
+    key = media_cache.source_key(UPSTREAM)
+    assert media_cache.source_url(key) == UPSTREAM
+    signature, payload = key.split(".")
+    forged = media_cache._b64encode(b"https://evil.example.com/x")
+    assert media_cache.source_url(f"{signature}.{forged}") is None
+    assert media_cache.source_url(payload) is None
+
+def test_cache_miss_is_refilled_even_after_index_reset(client, upstream, tmp_path):
+    key = media_cache.source_key(UPSTREAM)
+    first = client.get(f"/media/{key}")
+    assert first.status_code == 200 and first.content == BODY
+    assert client.get(f"/media/{key}", headers={"Range": "bytes=0-3"}).content == BODY[:4]
+    assert len(upstream) == 1
+
+    (tmp_path / "index.db").unlink()
+    media_cache._initialized = False
+    assert client.get(f"/media/{key}").content == BODY
+    assert len(upstream) == 2
+
+    assert client.get("/media/not-a-key").status_code == 404
+
+def test_blob_evicted_after_lookup_is_fetched_again(client, upstream, monkeypatch):
+    key = media_cache.source_key(UPSTREAM)
+    client.get(f"/media/{key}")
+
+    def lookup_then_evict(key):
+        cached = media_cache.lookup(key)
+        cached[1].unlink()
+        return cached
+    monkeypatch.setattr(media, "lookup", lookup_then_evict)
+
+    response = client.get(f"/media/{key}")
+    assert response.status_code == 200 and response.content == BODY
+    assert len(upstream) == 2
+
+def test_blob_evicted_after_open_is_still_served(client, upstream, monkeypatch):
+    key = media_cache.source_key(UPSTREAM)
+    client.get(f"/media/{key}")
+
+    real_open = media._open_blob
+
+    def open_then_evict(path):
+        opened = real_open(path)
+        path.unlink()
+        return opened
+    monkeypatch.setattr(media, "_open_blob", open_then_evict)
+
+    assert client.get(f"/media/{key}").content == BODY
+    # The next request finds the blob gone, refetches it, and loses it again mid-response
+    response = client.get(f"/media/{key}", headers={"Range": "bytes=2-5"})
+    assert response.status_code == 206 and response.content == BODY[2:6]
+    assert len(upstream) == 2
+
+def test_concurrent_misses_share_one_fetch(upstream):
+    key = media_cache.source_key(UPSTREAM)
+
+    async def scenario():
+        return await asyncio.gather(*[media_cache.fetch_and_store(key, UPSTREAM) for _ in range(4)])
+
+    results = asyncio.run(scenario())
+    assert len(upstream) == 1
+    assert len({digest for _, digest, _ in results}) == 1
+    assert len(media_cache._fetch_locks) == 0
+
+def test_proxy_urls_use_the_request_origin(upstream, monkeypatch):
+    monkeypatch.setattr(media_service, "MEDIA_PROXY_ENABLED", True)
+    monkeypatch.setattr(media_service, "MEDIA_PROXY_BASE_URL", "")
+    app = FastAPI()
+    app.add_middleware(media_service.MediaProxyBaseMiddleware)
+
+    @app.get("/images")
+    async def images():
+        return await media_service.proxy_media_urls([{"url": UPSTREAM, "credit": "x"}])
+
+    url = TestClient(app, base_url="https://api.example.com").get("/images").json()[0]["url"]
+    assert url == f"https://api.example.com/media/{media_cache.source_key(UPSTREAM)}"
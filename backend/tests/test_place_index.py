@@ -0,0 +1,65 @@
+import asyncio
+
+from app.services import trip_service
+from app.services.place_index import PlaceIndex
+
+def _reset(monkeypatch):
+    monkeypatch.setattr(trip_service, "_place_index", PlaceIndex())
+    monkeypatch.setattr(trip_service, "_place_index_task", None)
+    monkeypatch.setattr(trip_service, "_place_index_failed_at", float("-inf"))
+
+def test_index_is_built_from_stored_trips(mongo, make_plan, monkeypatch):
+    _reset(monkeypatch)
+
+    async def scenario():
+        plan = make_plan(days=1, activities_per_day=2)
+        await trip_service.save_trip({"destination": "Goa", "origin": "Delhi", "days": 1, "trip_plan": plan})
+        index = await trip_service.get_place_index()
+        return index.nearby(15.5, 73.8, radius_km=5)
+
+    names = {place["name"] for place in asyncio.run(scenario())}
+    assert {"Goa", "Activity 0.0", "Activity 0.1"} <= names
+
+def test_request_path_never_waits_for_a_build(monkeypatch):
+    _reset(monkeypatch)
+    builds = []
+
+    async def slow_build():
+        builds.append(1)
+        await asyncio.sleep(0.2)
+        index = PlaceIndex()
+        index.built = True
+        monkeypatch.setattr(trip_service, "_place_index", index)
+
+    monkeypatch.setattr(trip_service, "_build_place_index", slow_build)
+
+    async def scenario():
+        # Cold: /search gets no index straight away, and the build starts once
+        assert trip_service.current_place_index() is None
+        assert trip_service.current_place_index() is None
+        # Endpoints that need the index share the running build
+        indexes = await asyncio.gather(*(trip_service.get_place_index() for _ in range(5)))
+        return indexes
+
+    indexes = asyncio.run(scenario())
+    assert len(builds) == 1
+    assert all(index is indexes[0] and index.built for index in indexes)
+
+def test_failed_build_is_not_retried_on_every_request(monkeypatch):
+    _reset(monkeypatch)
+    builds = []
+
+    async def failing_build():
+        builds.append(1)
+        raise ConnectionError("mongo unreachable")
+
+    monkeypatch.setattr(trip_service, "_build_place_index", failing_build)
+
+    async def scenario():
+        trip_service.current_place_index()
+        await asyncio.sleep(0.01)
+        for _ in range(3):
+            assert trip_service.current_place_index() is None
+
+    asyncio.run(scenario())
+    assert len(builds) == 1
@@ -0,0 +1,50 @@
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import profiler
+from app.routers import profiles
+
+def test_frame_key_falls_back_to_co_name():
+    # Python 3.9/3.10 code objects have no co_qualname
+    code = SimpleNamespace(co_name="handler", co_filename="app/x.py", co_firstlineno=12)
+    assert profiler.frame_key(code) == ("handler", "app/x.py", 12)
+
+    profile = profiler.Profile("p", "GET", "/")
+    profile.add("wall", [SimpleNamespace(f_code=code), profiler.AWAITING_FRAME], 1.0)
+    assert profile.frames == [("handler", "app/x.py", 12), profiler.AWAITING_FRAME]
+
+def test_profiled_request_records_the_blocking_handler(monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER_TOKEN", "secret")
+    monkeypatch.setattr(profiler, "PROFILER_INTERVAL_MS", 2)
+    monkeypatch.setattr(profiler, "_profiles", profiler.OrderedDict())
+
+    app = FastAPI()
+    app.add_middleware(profiler.ProfilerMiddleware)
+    app.include_router(profiles.router)
+
+    @app.get("/slow")
+    async def slow_handler():
+        time.sleep(0.1)  # blocks the loop, so it shows up in both views
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert "X-Profile-Id" not in client.get("/slow").headers
+
+        response = client.get("/slow", headers={"X-Profile-Token": "secret"})
+        profile_id = response.headers["X-Profile-Id"]
+        assert client.get(f"/internal/profiles/{profile_id}").status_code == 403
+
+        data = client.get(f"/internal/profiles/{profile_id}", headers={"X-Profile-Token": "secret"}).json()
+        names = {frame["name"] for frame in data["shared"]["frames"]}
+        assert any(name.endswith("slow_handler") for name in names)
+        wall, cpu = data["profiles"]
+        assert wall["samples"] and cpu["samples"]
+
+        folded = client.get(
+            f"/internal/profiles/{profile_id}", params={"format": "collapsed", "view": "cpu"},
+            headers={"X-Profile-Token": "secret"}
+        ).text
+        assert "slow_handler" in folded
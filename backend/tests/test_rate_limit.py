@@ -0,0 +1,72 @@
+import sqlite3
+
+from app import rate_limit
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_memory_store_prunes_full_buckets_on_a_timer(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    store = rate_limit.MemoryBucketStore()
+
+    assert store.take("search:a", 2, 1.0)[0]
+    assert store.take("search:a", 2, 1.0)[0]
+    allowed, _, retry_after = store.take("search:a", 2, 1.0)
+    assert not allowed and retry_after == 1.0
+    store.take("search:b", 2, 1.0)
+
+    clock.now += 5  # both refilled, but the prune timer hasn't fired
+    store.take("search:c", 2, 1.0)
+    assert len(store.buckets) == 3
+
+    clock.now += rate_limit.PRUNE_INTERVAL_SECONDS
+    store.take("search:c", 2, 1.0)
+    assert list(store.buckets) == ["search:c"]
+
+def test_memory_store_scans_amortized_past_the_size_cap(monkeypatch):
+    monkeypatch.setattr(rate_limit.MemoryBucketStore, "MAX_BUCKETS", 10)
+    store = rate_limit.MemoryBucketStore()
+    scans = []
+    real_prune = store.prune
+    monkeypatch.setattr(store, "prune", lambda now: scans.append(now) or real_prune(now))
+
+    # None of these buckets refill within the test, so every prune keeps them all
+    for i in range(100):
+        store.take(f"search:{i}", 5, 0.001)
+    assert len(store.buckets) == 100
+    assert len(scans) <= 5
+
+def test_file_store_shares_buckets_and_prunes_idle_ones(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, "time", clock)
+    path = str(tmp_path / "ratelimit.db")
+    worker_a, worker_b = rate_limit.FileBucketStore(path), rate_limit.FileBucketStore(path)
+
+    assert worker_a.take("edits:a", 1, 0.5)[0]
+    assert not worker_b.take("edits:a", 1, 0.5)[0]
+    worker_b.take("edits:b", 1, 0.5)
+
+    clock.now += rate_limit.PRUNE_INTERVAL_SECONDS
+    worker_a.take("edits:c", 1, 0.5)
+    with sqlite3.connect(path) as conn:
+        assert [key for key, in conn.execute("SELECT key FROM buckets")] == ["edits:c"]
+
+def test_file_store_fails_open_while_locked(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limit.FileBucketStore, "BUSY_TIMEOUT_SECONDS", 0.05)
+    path = str(tmp_path / "ratelimit.db")
+    store = rate_limit.FileBucketStore(path)
+    assert store.take("edits:a", 1, 0.01)[0]
+
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN EXCLUSIVE")
+    try:
+        assert store.take("edits:a", 1, 0.01)[0]
+    finally:
+        holder.execute("ROLLBACK")
+        holder.close()
+    assert not store.take("edits:a", 1, 0.01)[0]
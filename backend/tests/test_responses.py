@@ -0,0 +1,63 @@
+import gzip
+
+import brotli
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.responses import CompressionMiddleware, negotiate_encoding
+
+PAYLOAD = {"itinerary": ["A long day of sightseeing in Goa"] * 200}
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return PAYLOAD
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/tagged")
+    def tagged():
+        return Response(content=b"x" * 4096, media_type="text/plain", headers={"ETag": '"abc"'})
+
+    return TestClient(app)
+
+def test_negotiation_prefers_brotli_and_honours_q_values():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip;q=0") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+def test_large_bodies_are_compressed_and_small_ones_left_alone():
+    client = _client()
+    # httpx decodes br/gzip transparently; the wire format shows in the headers
+    br = client.get("/big", headers={"Accept-Encoding": "br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.headers["vary"] == "Accept-Encoding"
+    assert br.json() == PAYLOAD
+
+    gz = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert int(gz.headers["content-length"]) < len(gz.content)
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+def test_strong_etags_become_weak_when_encoded():
+    response = _client().get("/tagged", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc"'
+
+def test_compressed_bytes_decode_to_the_original():
+    middleware = CompressionMiddleware(app=None)
+    body = b'{"a": "' + b"b" * 5000 + b'"}'
+    assert gzip.decompress(middleware._compress(body, "gzip", cacheable=True)) == body
+    assert brotli.decompress(middleware._compress(body, "br", cacheable=True)) == body
+    # Second call is served from the LRU
+    assert middleware._compress(body, "gzip", cacheable=True) is middleware._compress(body, "gzip", cacheable=True)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.schemas import SearchRequest
+from app.services import ai_service
+
+def test_enrichment_returns_what_missed_the_deadline():
+    finished = []
+
+    async def lookup(path, seconds):
+        await asyncio.sleep(seconds)
+        finished.append(path)
+
+    async def scenario():
+        deadline = ai_service.Deadline(0.1)
+        jobs = {
+            "hero_image": lookup("hero_image", 0.01),
+            "hero_video": lookup("hero_video", 5),
+            "itinerary[0].activities[0].image_url": lookup("itinerary[0].activities[0].image_url", 5),
+        }
+        pending = await ai_service._run_enrichment(jobs, deadline)
+        return pending, deadline.remaining()
+
+    pending, remaining = asyncio.run(scenario())
+    assert pending == ["hero_video", "itinerary[0].activities[0].image_url"]
+    assert finished == ["hero_image"]
+    assert remaining < 0.05
+
+def test_plan_generation_is_bounded_by_the_request_budget(monkeypatch):
+    async def slow_parse(**kwargs):
+        await asyncio.sleep(5)
+
+    async def no_analytics(**kwargs):
+        pass
+
+    monkeypatch.setattr(ai_service.client.beta.chat.completions, "parse", slow_parse)
+    monkeypatch.setattr("app.services.analytics_service.log_search_to_db", no_analytics)
+    monkeypatch.setattr(ai_service, "_get_place_index", lambda: None)
+
+    request = SearchRequest(query="Weekend in Goa", deadline_seconds=0.1)
+    with pytest.raises(TimeoutError, match="0.1s time budget"):
+        asyncio.run(ai_service.generate_trip_plan(request))
+
+def test_media_lookups_never_outlive_the_deadline():
+    assert ai_service.Deadline(0.5).media_timeout() <= 0.5
+    assert ai_service.Deadline(0).media_timeout() == 0.1  # floor: a lookup always gets a chance
+    assert ai_service.Deadline(60).media_timeout() == ai_service.MEDIA_LOOKUP_TIMEOUT_SECONDS
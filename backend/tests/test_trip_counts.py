@@ -0,0 +1,20 @@
+import asyncio
+
+from app.config.database import get_database
+from app.services import trip_service
+
+def test_counter_tracks_saves_and_deletes(mongo, make_plan):
+    async def scenario():
+        ids = [
+            await trip_service.save_trip({"destination": d, "origin": "Delhi", "days": 2, "trip_plan": make_plan(d)})
+            for d in ("Goa", "Jaipur", "Goa")
+        ]
+        await trip_service.delete_trip(ids[1])
+        await trip_service.delete_trip(ids[1])  # already gone: no double decrement
+        await trip_service.flush_trip_counts()
+        total = await trip_service.get_trip_count()
+        # Removed behind the counter's back: only exact=True notices
+        await get_database().trips.delete_many({"destination": "Goa"})
+        return total, await trip_service.get_trip_count(), await trip_service.get_trip_count(exact=True)
+
+    assert asyncio.run(scenario()) == (2, 2, 0)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import rate_limit
+from app.routers import trips
+from app.schemas import TripPlan, TripPlanPatch
+from app.services import ai_service, trip_service
+
+def _no_place_index():
+    return None
+
+async def _no_images(*args, **kwargs):
+    return []
+
+@pytest.fixture
+def client(mongo, monkeypatch):
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.MemoryBucketStore())
+    monkeypatch.setattr(ai_service, "_get_place_index", _no_place_index)
+    monkeypatch.setattr(ai_service, "fetch_destination_images", _no_images)
+    app = FastAPI()
+    app.include_router(trips.router)
+    return TestClient(app)
+
+def _patch_with(monkeypatch, patch: TripPlanPatch):
+    async def fake_patch(trip_plan, change, target_days, budget, deadline):
+        return patch
+    monkeypatch.setattr(ai_service, "_generate_plan_patch", fake_patch)
+
+def _save(client, plan):
+    return client.post("/trips", json={"trip_plan": plan, "origin": "Delhi", "days": len(plan["itinerary"])}).json()["trip_id"]
+
+def _day(number, name):
+    return {"day": number, "activities": [{"time": "10:00", "activity": name, "description": "New", "coordinates": {"lat": 15.6, "lng": 73.9}}]}
+
+def test_edit_adds_only_the_new_day(client, make_plan, monkeypatch):
+    _patch_with(monkeypatch, TripPlanPatch(days=[_day(3, "Spice Farm")]))
+    trip_id = _save(client, make_plan(days=2))
+    response = client.patch(f"/trips/{trip_id}", json={"change": "add a day", "days": 3})
+    assert response.status_code == 200
+    assert response.json()["changed"] == ["itinerary.2"]
+    trip = client.get(f"/trips/{trip_id}").json()
+    assert trip["days"] == 3
+    assert [d["activities"][0]["activity"] for d in trip["trip_plan"]["itinerary"]] == ["Activity 0.0", "Activity 1.0", "Spice Farm"]
+
+def test_patch_with_the_wrong_number_of_days_is_rejected(client, make_plan, monkeypatch):
+    # Asked for 4 days, the model only added one
+    _patch_with(monkeypatch, TripPlanPatch(days=[_day(3, "Spice Farm")]))
+    trip_id = _save(client, make_plan(days=2))
+    response = client.patch(f"/trips/{trip_id}", json={"change": "make it longer", "days": 4})
+    assert response.status_code == 502
+    assert client.get(f"/trips/{trip_id}").json()["days"] == 2
+
+def test_invalid_stored_plan_is_a_server_error(client, make_plan, monkeypatch):
+    trip_id = _save(client, make_plan(days=2))
+
+    async def legacy_trip(trip_id):
+        return {"_id": trip_id, "trip_plan": {"destination": "Goa"}}
+
+    monkeypatch.setattr(trip_service, "get_trip", legacy_trip)
+    response = client.patch(f"/trips/{trip_id}", json={"change": "anything"})
+    assert response.status_code == 500
+
+def test_edit_timeout_reports_the_deadline_budget(make_plan, monkeypatch):
+    class SlowCompletions:
+        async def parse(self, **kwargs):
+            await asyncio.sleep(1)
+
+    monkeypatch.setattr(ai_service.client.beta.chat, "completions", SlowCompletions())
+    monkeypatch.setattr(ai_service, "_get_place_index", _no_place_index)
+    with pytest.raises(TimeoutError, match="0.05s"):
+        asyncio.run(ai_service._generate_plan_patch(TripPlan(**make_plan()), "x", 2, None, ai_service.Deadline(0.05)))
+
+def test_edits_are_rate_limited(client):
+    capacity, _ = rate_limit.get_limit("edits")
+    statuses = [client.patch("/trips/64b000000000000000000000", json={"days": 1}).status_code for _ in range(capacity + 1)]
+    assert statuses[:capacity] == [404] * capacity
+    assert statuses[-1] == 429
@@ -0,0 +1,94 @@
+import asyncio
+
+from pymongo.errors import OperationFailure
+
+from app.services import trip_service
+from app.services.search_index import TripSearchIndex
+
+def _reset(monkeypatch):
+    monkeypatch.setattr(trip_service, "TRIP_SEARCH_BACKEND", "auto")
+    monkeypatch.setattr(trip_service, "_use_memory_search", False)
+    monkeypatch.setattr(trip_service, "_mongo_search_failed_at", float("-inf"))
+    monkeypatch.setattr(trip_service, "_search_index", TripSearchIndex())
+    monkeypatch.setattr(trip_service, "_search_index_task", None)
+    monkeypatch.setattr(trip_service, "_search_index_journal", None)
+
+def _failing_mongo(monkeypatch, error):
+    calls = []
+
+    async def search(db, query, filters, limit):
+        calls.append(query)
+        raise error
+    monkeypatch.setattr(trip_service, "_search_trips_mongo", search)
+    return calls
+
+async def _save(make_plan, destination):
+    plan = make_plan(destination)
+    return await trip_service.save_trip({"destination": destination, "origin": "Delhi", "days": 2, "trip_plan": plan})
+
+def test_missing_text_index_switches_to_memory_for_good(mongo, make_plan, monkeypatch):
+    _reset(monkeypatch)
+    calls = _failing_mongo(monkeypatch, OperationFailure("text index required for $text query", 27))
+
+    async def scenario():
+        await _save(make_plan, "Goa")
+        first = await trip_service.search_trips("goa")
+        second = await trip_service.search_trips("goa")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["backend"] == second["backend"] == "memory"
+    assert [r["destination"] for r in second["results"]] == ["Goa"]
+    assert len(calls) == 1
+
+def test_transient_failure_retries_mongo_after_cooldown(mongo, make_plan, monkeypatch):
+    _reset(monkeypatch)
+    calls = _failing_mongo(monkeypatch, OperationFailure("interrupted", 11601))
+
+    async def scenario():
+        await _save(make_plan, "Goa")
+        assert (await trip_service.search_trips("goa"))["backend"] == "memory"
+        await trip_service.search_trips("goa")
+        assert len(calls) == 1
+        monkeypatch.setattr(trip_service, "_mongo_search_failed_at", float("-inf"))
+        await trip_service.search_trips("goa")
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert trip_service._use_memory_search is False
+
+def test_rebuild_is_shared_and_keeps_writes_made_meanwhile(mongo, make_plan, monkeypatch):
+    _reset(monkeypatch)
+    monkeypatch.setattr(trip_service, "_use_memory_search", True)
+    builds = []
+    real_build = trip_service._build_search_index
+
+    class SlowScan:
+        """The real database, but the rebuild's scan takes a while per trip."""
+        def __init__(self, db):
+            self.collection = db.trips
+            self.trips = self
+
+        async def find(self, query, projection):
+            async for doc in self.collection.find(query, projection):
+                await asyncio.sleep(0.05)
+                yield doc
+
+    async def slow_build(db):
+        builds.append(1)
+        await real_build(SlowScan(db))
+    monkeypatch.setattr(trip_service, "_build_search_index", slow_build)
+
+    async def scenario():
+        await _save(make_plan, "Goa")
+        searches = [asyncio.ensure_future(trip_service.search_trips("jaipur goa")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await _save(make_plan, "Jaipur")
+        assert trip_service._search_index_journal
+        results = await asyncio.gather(*searches)
+        return results, await trip_service.search_trips("jaipur")
+
+    results, later = asyncio.run(scenario())
+    assert len(builds) == 1
+    assert all(r["total"] >= 1 for r in results)
+    assert [r["destination"] for r in later["results"]] == ["Jaipur"]
@@ -0,0 +1,98 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.config.database import get_database
+from app.services import trip_service, trip_storage
+
+LONG = "Golden beaches, spice farms and Portuguese churches. " * 10
+
+def test_plans_round_trip_through_the_packed_format(mongo, make_plan):
+    plan = make_plan()
+    plan["destination_info"]["description"] = LONG
+    plan["itinerary"][0]["activities"][0]["description"] = LONG
+
+    async def scenario():
+        for _ in range(2):
+            await trip_service.save_trip({"destination": "Goa", "origin": "Delhi", "days": 2, "trip_plan": make_plan()})
+        trip_id = await trip_service.save_trip({"destination": "Goa", "origin": "Delhi", "days": 2, "trip_plan": plan})
+        db = get_database()
+        raw = await db.trips.find_one({"_id": ObjectId(trip_id)})
+        cities = await db.cities.count_documents({})
+        return raw, cities, await trip_service.get_trip(trip_id)
+
+    raw, cities, trip = asyncio.run(scenario())
+    assert raw["storage_version"] == trip_storage.STORAGE_VERSION
+    assert set(raw["city_refs"]) == {"origin_info", "destination_info"}
+    assert "destination_info" not in raw["trip_plan"]
+    assert "_z" in raw["trip_plan"]["itinerary"][0]["activities"][0]["description"]
+    # Delhi is shared by all three trips; Goa has two variants
+    assert cities == 3
+
+    assert trip["trip_plan"] == plan
+    assert "city_refs" not in trip and "storage_version" not in trip
+
+def test_unversioned_documents_pass_through():
+    doc = {"trip_plan": {"destination": "Goa", "origin_info": {"description": "x"}}}
+    assert asyncio.run(trip_storage.unpack_trip(None, dict(doc))) == doc
+
+def test_short_descriptions_stay_plain():
+    packed = trip_storage.compress_descriptions({"description": "short", "items": [{"description": LONG}]})
+    assert packed["description"] == "short"
+    assert trip_storage.decompress_descriptions(packed) == {"description": "short", "items": [{"description": LONG}]}
+
+class RoundTrips:
+    """The real database, counting sequential write round trips (overlapping writes share one)."""
+    WRITES = ("insert_one", "update_one")
+
+    def __init__(self, db):
+        self.db = db
+        self.rounds = []
+        self.in_flight = 0
+
+    def __getattr__(self, name):
+        return _CountedCollection(self, name)
+
+class _CountedCollection:
+    def __init__(self, counter, name):
+        self.counter = counter
+        self.collection = counter.db[name]
+        self.name = name
+
+    def __getattr__(self, method):
+        call = getattr(self.collection, method)
+        if method not in RoundTrips.WRITES:
+            return call
+
+        async def write(*args, **kwargs):
+            if self.counter.in_flight == 0:
+                self.counter.rounds.append([])
+            self.counter.rounds[-1].append(self.name)
+            self.counter.in_flight += 1
+            try:
+                await asyncio.sleep(0.01)
+                return await call(*args, **kwargs)
+            finally:
+                self.counter.in_flight -= 1
+        return write
+
+def test_save_waits_on_the_trip_insert_and_new_cities_only(mongo, make_plan, monkeypatch):
+    counted = RoundTrips(get_database())
+    monkeypatch.setattr(trip_service, "get_database", lambda: counted)
+
+    async def scenario():
+        await trip_service.save_trip({"destination": "Goa", "origin": "Delhi", "days": 2, "trip_plan": make_plan()})
+        first = list(counted.rounds)
+        await trip_service.flush_trip_counts()
+        counted.rounds.clear()
+        await trip_service.save_trip({"destination": "Goa", "origin": "Delhi", "days": 2, "trip_plan": make_plan()})
+        second = list(counted.rounds)
+        await trip_service.flush_trip_counts()
+        return first, second, await counted.db.counters.find_one({"_id": "trips"})
+
+    first, second, counter = asyncio.run(scenario())
+    # Both city upserts in one round, then the insert; the counter is not awaited
+    assert first == [["cities", "cities"], ["trips"]]
+    # Cities already written by this worker are skipped
+    assert second == [["trips"]]
+    assert counter["count"] == 2
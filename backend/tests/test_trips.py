@@ -0,0 +1,49 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import trips
+
+@pytest.fixture
+def client(mongo):
+    app = FastAPI()
+    app.include_router(trips.router)
+    return TestClient(app)
+
+def _save(client, plan):
+    return client.post("/trips", json={"trip_plan": plan, "origin": "Delhi", "days": len(plan["itinerary"])}).json()["trip_id"]
+
+def test_listing_views_leave_out_internal_fields(client, make_plan):
+    for destination in ("Goa", "Jaipur", "Manali"):
+        _save(client, make_plan(destination))
+
+    summary = client.get("/trips", params={"limit": 2}).json()
+    assert [t["destination"] for t in summary["trips"]] == ["Manali", "Jaipur"]
+    assert "trip_plan" not in summary["trips"][0]
+    assert summary["trips"][0]["origin"] == "Delhi"
+
+    second = client.get("/trips", params={"limit": 2, "cursor": summary["next"]}).json()
+    assert [t["destination"] for t in second["trips"]] == ["Goa"]
+
+    full = client.get("/trips", params={"view": "full"}).json()["trips"]
+    assert full[0]["trip_plan"]["itinerary"][0]["activities"][0]["activity"] == "Activity 0.0"
+    assert all("summary" not in t and "etag" not in t for t in full)
+
+    assert client.get("/trips", params={"view": "everything"}).status_code == 422
+
+def test_single_trip_revalidates_with_its_etag(client, make_plan):
+    trip_id = _save(client, make_plan())
+
+    response = client.get(f"/trips/{trip_id}")
+    body = response.json()
+    assert body["trip_plan"]["destination"] == "Goa"
+    assert "summary" not in body and "etag" not in body
+
+    etag = response.headers["ETag"]
+    assert client.get(f"/trips/{trip_id}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert client.get(f"/trips/{trip_id}", headers={"If-None-Match": '"stale"'}).status_code == 200
+    last_modified = response.headers["Last-Modified"]
+    assert client.get(f"/trips/{trip_id}", headers={"If-Modified-Since": last_modified}).status_code == 304
+    naive_zone = last_modified.replace("GMT", "-0000")
+    assert client.get(f"/trips/{trip_id}", headers={"If-Modified-Since": naive_zone}).status_code == 304
+    assert client.get(f"/trips/{trip_id}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 -0000"}).status_code == 200
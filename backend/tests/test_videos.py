@@ -0,0 +1,59 @@
+import asyncio
+import functools
+
+import httpx
+from starlette.requests import Request
+
+from app import client_hints
+from app.services import media_service
+
+LADDER = [
+    {"url": "640", "width": 640},
+    {"url": "1280", "width": 1280},
+    {"url": "1920", "width": 1920},
+    {"url": "3840", "width": 3840},
+]
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+def test_network_hints_pick_a_quality():
+    assert client_hints.video_quality(_request(save_data="on", downlink="10")) == "low"
+    assert client_hints.video_quality(_request(ect="3g")) == "low"
+    assert client_hints.video_quality(_request(ect="4g", downlink="1.2")) == "low"
+    assert client_hints.video_quality(_request(downlink="3.5")) == "medium"
+    assert client_hints.video_quality(_request(ect="4g")) == "high"
+    assert client_hints.video_quality(_request()) is None
+
+def test_renditions_never_exceed_the_quality_and_default_to_720p():
+    assert media_service.pick_video_rendition(LADDER, "low") == "640"
+    assert media_service.pick_video_rendition(LADDER, "high") == "1920"
+    assert media_service.pick_video_rendition(LADDER) == "1280"
+    assert media_service.pick_video_rendition([{"url": "4k", "width": 3840}], "low") == "4k"
+    assert media_service.pick_video_rendition([], "low") is None
+
+def test_pexels_ladder_keeps_progressive_files_and_the_higher_frame_rate():
+    video = {"video_files": [
+        {"link": "hls", "file_type": "video/hls"},
+        {"link": "hd24", "width": 1280, "height": 720, "fps": 24, "file_type": "video/mp4"},
+        {"link": "hd30", "width": 1280, "height": 720, "fps": 30, "file_type": "video/mp4"},
+        {"link": "sd", "width": 640, "height": 360, "fps": 30, "file_type": "video/mp4"},
+    ]}
+    ladder = media_service.pexels_video_renditions(video)
+    assert [r["url"] for r in ladder] == ["sd", "hd30"]
+
+    selected = media_service.select_video_quality([{"url": "hd30", "renditions": ladder}], "low")
+    assert selected[0]["url"] == "sd"
+
+def test_videos_fetched_without_hints_default_to_720p(monkeypatch):
+    files = [{"link": str(width), "width": width, "height": width * 9 // 16, "fps": 30, "file_type": "video/mp4"} for width in (640, 1280, 1920, 3840)]
+
+    def handler(request):
+        return httpx.Response(200, json={"videos": [{"video_files": files, "user": {"name": "x"}, "image": "poster"}]})
+
+    monkeypatch.setattr(media_service, "PEXELS_API_KEY", "test")
+    monkeypatch.setattr(media_service.httpx, "AsyncClient", functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler)))
+    videos = asyncio.run(media_service.fetch_from_pexels("goa", "videos"))
+    assert client_hints.video_quality(_request()) is None
+    assert videos[0]["url"] == "1280"
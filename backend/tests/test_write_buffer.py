@@ -0,0 +1,29 @@
+import asyncio
+
+from app.config.database import get_database
+from app.services import trip_service, write_buffer
+
+def test_history_is_written_in_batches_off_the_request_path(mongo, monkeypatch):
+    monkeypatch.setattr(write_buffer, "_buffers", {})
+
+    async def scenario():
+        for i in range(3):
+            await trip_service.save_search_history(f"trip {i}", origin="Delhi", days=2)
+        db = get_database()
+        before = await db.search_history.count_documents({})
+        await write_buffer.flush_append_buffers()
+        return before, await trip_service.get_search_history(limit=2)
+
+    before, latest = asyncio.run(scenario())
+    assert before == 0
+    assert [item["query"] for item in latest] == ["trip 2", "trip 1"]
+
+def test_full_buffer_sheds_the_oldest_record(mongo):
+    async def scenario():
+        buffer = write_buffer.AppendBuffer("search_history", max_batch=10, flush_interval=0.01, max_pending=2)
+        for i in range(3):
+            buffer.add({"query": str(i)})
+        await buffer._task
+        return [doc["query"] async for doc in get_database().search_history.find({})]
+
+    assert sorted(asyncio.run(scenario())) == ["1", "2"]
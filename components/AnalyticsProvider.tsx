@@ -8,26 +8,10 @@ function AnalyticsTracker() {
     const searchParams = useSearchParams();
 
     useEffect(() => {
-        const url = `${pathname}?${searchParams.toString()}`;
-
-        // Use sendBeacon if available for reliability during navigation, fallback to fetch
-        const data = JSON.stringify({
-            url: url,
-            referrer: document.referrer
-        });
-
-        // We use fetch with keepalive: true effectively acting like sendBeacon
-        // fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/analytics/track`, {
-        //     method: "POST",
-        //     headers: {
-        //         "Content-Type": "application/json"
-        //     },
-        //     body: JSON.stringify({
-        //         url: url,
-        //         referrer: document.referrer
-        //     }),
-        //     keepalive: true
-        // }).catch(err => console.error("Analytics error:", err));
+        // Backend page views are off (GA records them). To turn them on, queue them
+        // with the other events for the single /analytics/batch beacon:
+        // trackBackendPageView(`${pathname}?${searchParams.toString()}`, document.referrer);
+        // (import { trackBackendPageView } from "@/lib/analytics")
 
     }, [pathname, searchParams]);
 
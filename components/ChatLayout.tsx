@@ -153,7 +153,9 @@ export default function ChatLayout({ initialQuery, initialTripId, onBack }: Chat
                 days: 2,
             };
 
-            const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || '/api'}/search`, {
+            // Viewport size lets the API pick image renditions that fit this screen
+            const viewport = `vw=${window.innerWidth}&dpr=${window.devicePixelRatio || 1}`;
+            const response = await fetch(`${process.env.NEXT_PUBLIC_API_URL || '/api'}/search?${viewport}`, {
                 method: "POST",
                 headers: { "Content-Type": "application/json" },
                 body: JSON.stringify(request),
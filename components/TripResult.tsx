@@ -1,6 +1,6 @@
 import { useEffect } from "react";
 import ShareButton from "./ShareButton";
-import { TripPlan } from "../types";
+import { ImageRendition, TripPlan } from "../types";
 import { MapPin, Clock, DollarSign, Navigation } from "lucide-react";
 import TypewriterText from "./TypewriterText";
 import AdSense from "./AdSense";
@@ -9,6 +9,11 @@ interface TripResultProps {
     plan: TripPlan;
 }
 
+// "url 640w, url 1080w" for the browser to pick from when the API returned renditions
+function toSrcSet(renditions?: ImageRendition[]) {
+    return renditions?.length ? renditions.map(r => `${r.url} ${r.width}w`).join(", ") : undefined;
+}
+
 export default function TripResult({ plan }: TripResultProps) {
     useEffect(() => {
         if (plan.destination) {
@@ -60,6 +65,7 @@ export default function TripResult({ plan }: TripResultProps) {
                     {plan.hero_video ? (
                         <video
                             src={plan.hero_video}
+                            poster={plan.hero_video_poster}
                             autoPlay
                             muted
                             loop
@@ -69,6 +75,8 @@ export default function TripResult({ plan }: TripResultProps) {
                     ) : (
                         <img
                             src={plan.hero_image || "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800?ixlib=rb-4.0.3&auto=format&fit=crop&w=2021&q=80"}
+                            srcSet={toSrcSet(plan.hero_image_srcset)}
+                            sizes="100vw"
                             alt={plan.destination}
                             className="absolute inset-0 w-full h-full object-cover opacity-90"
                         />
@@ -139,6 +147,9 @@ export default function TripResult({ plan }: TripResultProps) {
                                             <div className="h-48 overflow-hidden bg-gray-100 relative">
                                                 <img
                                                     src={attraction.image_url}
+                                                    srcSet={toSrcSet(attraction.image_srcset)}
+                                                    sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                                                    loading="lazy"
                                                     alt={attraction.name}
                                                     className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-700"
                                                 />
@@ -201,6 +212,9 @@ export default function TripResult({ plan }: TripResultProps) {
                                                             <div className="w-24 h-24 sm:w-24 sm:h-24 rounded-xl overflow-hidden shadow-md bg-gray-200 mt-0 sm:mt-2">
                                                                 <img
                                                                     src={activity.image_url}
+                                                                    srcSet={toSrcSet(activity.image_srcset)}
+                                                                    sizes="96px"
+                                                                    loading="lazy"
                                                                     alt={activity.activity}
                                                                     className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-700 ease-out"
                                                                 />
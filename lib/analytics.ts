@@ -1,36 +1,98 @@
 "use client";
 
+const ANALYTICS_BATCH_URL = `${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/analytics/batch`;
+const MAX_QUEUE_SIZE = 20;
+const FLUSH_INTERVAL_MS = 5000;
+
+type AnalyticsItem =
+    | { type: "pageview"; url: string; referrer?: string }
+    | { type: "event"; event_name: string; event_data?: Record<string, any>; url: string };
+
+let queue: AnalyticsItem[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let listenersAttached = false;
+
 /**
- * Track a custom event to the backend analytics.
- * @param eventName Name of the event (e.g., 'share_trip', 'book_hotel')
- * @param eventData Additional data object (optional)
+ * Send everything queued so far to /analytics/batch in a single request.
+ * sendBeacon posts a text/plain body (no CORS preflight) and survives page unload.
  */
-export const trackEvent = (eventName: string, eventData?: Record<string, any>) => {
-    try {
-        const url = window.location.href;
+export const flushAnalytics = () => {
+    if (flushTimer) {
+        clearTimeout(flushTimer);
+        flushTimer = null;
+    }
+    if (queue.length === 0) return;
 
-        // Use sendBeacon if available for critical events, otherwise fetch
-        // For custom events we prefer fetch to ensure JSON body is handled correctly by simple backends,
-        // but keepalive helps it survive navigation.
+    const body = JSON.stringify(queue);
+    queue = [];
 
-        fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/analytics/event`, {
+    try {
+        if (typeof navigator !== "undefined" && navigator.sendBeacon && navigator.sendBeacon(ANALYTICS_BATCH_URL, body)) {
+            return;
+        }
+        fetch(ANALYTICS_BATCH_URL, {
             method: "POST",
             headers: {
-                "Content-Type": "application/json"
+                "Content-Type": "text/plain"
             },
-            body: JSON.stringify({
-                event_name: eventName,
-                event_data: eventData,
-                url: url
-            }),
+            body,
             keepalive: true
-        }).catch(err => console.error("Event tracking error:", err));
+        }).catch(err => console.error("Analytics batch error:", err));
+    } catch (e) {
+        console.error("Failed to flush analytics", e);
+    }
+};
+
+const enqueue = (item: AnalyticsItem) => {
+    queue.push(item);
 
+    if (!listenersAttached) {
+        // Flush whatever is pending when the tab is hidden or closed
+        document.addEventListener("visibilitychange", () => {
+            if (document.visibilityState === "hidden") flushAnalytics();
+        });
+        window.addEventListener("pagehide", flushAnalytics);
+        listenersAttached = true;
+    }
+
+    if (queue.length >= MAX_QUEUE_SIZE) {
+        flushAnalytics();
+    } else if (!flushTimer) {
+        flushTimer = setTimeout(flushAnalytics, FLUSH_INTERVAL_MS);
+    }
+};
+
+/**
+ * Track a custom event to the backend analytics.
+ * @param eventName Name of the event (e.g., 'share_trip', 'book_hotel')
+ * @param eventData Additional data object (optional)
+ */
+export const trackEvent = (eventName: string, eventData?: Record<string, any>) => {
+    try {
+        enqueue({
+            type: "event",
+            event_name: eventName,
+            event_data: eventData,
+            url: window.location.href
+        });
     } catch (e) {
         console.error("Failed to track event", e);
     }
 };
 
+/**
+ * Track a page view to the backend analytics (batched with events).
+ * @param url The page URL
+ * @param referrer Document referrer (optional)
+ */
+export const trackBackendPageView = (url: string, referrer?: string) => {
+    try {
+        enqueue({ type: "pageview", url, referrer });
+    } catch (e) {
+        console.error("Failed to track page view", e);
+    }
+};
+
 // ============================================
 // Google Analytics (GA4) Tracking Functions
 // ============================================
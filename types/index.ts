@@ -5,6 +5,19 @@ export interface SearchRequest {
     budget?: string;
     days?: number;
     travel_mode?: 'flight' | 'drive' | 'train';
+    detail_level?: 'full' | 'summary';
+}
+
+export interface ImageRendition {
+    url: string;
+    width: number;
+}
+
+export interface VideoRendition {
+    url: string;
+    width: number;
+    height?: number;
+    fps?: number;
 }
 
 export interface Sightseeing {
@@ -12,20 +25,33 @@ export interface Sightseeing {
     activity: string;
     description: string;
     image_url?: string;
+    image_srcset?: ImageRendition[];
     coordinates?: { lat: number; lng: number };
     media_credit?: string;
     nearby_attractions?: string[];
 }
 
+export interface Leg {
+    from_activity: string;
+    to_activity: string;
+    mode: 'walk' | 'taxi';
+    distance_km: number;
+    duration_minutes: number;
+}
+
 export interface DayPlan {
     day: number;
     activities: Sightseeing[];
+    legs?: Leg[]; // Travel between consecutive activities, computed from coordinates
 }
 
 export interface RouteInfo {
     distance: string;
     duration: string;
     map_url?: string;
+    mode?: 'flight' | 'drive' | 'train';
+    distance_km?: number;
+    duration_minutes?: number;
 }
 
 export interface Hotel {
@@ -40,6 +66,7 @@ export interface Attraction {
     description: string;
     coordinates?: { lat: number; lng: number };
     image_url?: string;
+    image_srcset?: ImageRendition[];
     media_credit?: string;
 }
 
@@ -64,8 +91,13 @@ export interface TripPlan {
     destination_info?: OriginInfo; // Reuse OriginInfo structure for destination
     origin_info?: OriginInfo;
     hero_image?: string;
+    hero_image_srcset?: ImageRendition[];
     hero_video?: string;
+    hero_video_poster?: string;
+    hero_video_renditions?: VideoRendition[];
     media_credit?: string;
     coordinates?: { lat: number; lng: number };
     origin_coordinates?: { lat: number; lng: number };
+    partial_fields?: string[]; // Media fields still missing when the search deadline hit
+    detail_level?: 'full' | 'summary'; // 'summary': fetch long descriptions from /trips/{id}/items/{path}/details
 }